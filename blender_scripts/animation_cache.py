@@ -0,0 +1,49 @@
+'''
+Select scene passed in commandline arguments and export the animation of its
+first armature twice with the cache and the hierarchy error enabled, moving
+the first object parented to a bone of the armature between the exports.
+Saves the cache keys of the animation after both of the exports to the JSON
+file passed in arguments.
+
+This script should be executed after opening testing file with a model that
+have animation.
+'''
+import json
+import sys
+import bpy
+
+
+# Collect arguments after "--"
+argv = sys.argv
+argv = argv[argv.index("--") + 1:]
+
+
+def get_cache_keys(target_path: str) -> list:
+    '''Returns the keys of the entries of the cache of the target file.'''
+    directory, name = target_path.rsplit('/', 1)
+    with open(f'{directory}/.{name}.mcblend-cache', 'r') as f:
+        return [entry['key'] for entry in json.load(f)['entries'].values()]
+
+def main(scene_name: str, target_path: str, keys_path: str):
+    '''Main function.'''
+    bpy.context.window.scene = bpy.data.scenes[scene_name]
+    for obj in bpy.context.scene.objects:
+        if obj.type == 'ARMATURE':
+            bpy.context.view_layer.objects.active = obj
+            break
+    armature = bpy.context.object
+    animations = armature.mcblend.animations
+    animations[armature.mcblend.active_animation].use_hierarchy_error = True
+    bpy.ops.mcblend.export_animation(filepath=target_path, use_cache=True)
+    keys = [get_cache_keys(target_path)]
+    for child in armature.children:
+        if child.parent_type == 'BONE':
+            child.location.z += 1.0
+            break
+    bpy.ops.mcblend.export_animation(filepath=target_path, use_cache=True)
+    keys.append(get_cache_keys(target_path))
+    with open(keys_path, 'w') as f:
+        json.dump(keys, f)
+
+if __name__ == "__main__":
+    main(*argv[:3])
@@ -1,6 +1,9 @@
 '''
 Run batch export operator for all animations of the first armature found in a
 specified scene.
+
+Optionally, the number of worker processes used by the operator can be passed
+as the third argument.
 '''
 import sys
 import bpy
@@ -8,7 +11,7 @@ import bpy
 argv = sys.argv
 argv = argv[argv.index("--") + 1:]
 
-def main(scene_name: str, target_path: str):
+def main(scene_name: str, target_path: str, workers: str = '1'):
     """Switch to *scene_name* then run the batch-export operator."""
     bpy.context.window.scene = bpy.data.scenes[scene_name]
     for obj in bpy.context.scene.objects:
@@ -16,8 +19,9 @@ def main(scene_name: str, target_path: str):
             bpy.context.view_layer.objects.active = obj
             break
 
-    bpy.ops.mcblend.batch_export_animation(filepath=target_path)
+    bpy.ops.mcblend.batch_export_animation(
+        filepath=target_path, workers=int(workers))
 
 
 if __name__ == "__main__":
-    main(argv[0], argv[1])
+    main(*argv[:3])
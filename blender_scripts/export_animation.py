@@ -4,6 +4,9 @@ to path passed in arguments.
 
 This script should be executed after opening testing file with a model that
 have animation.
+
+Optionally, the pose sampling mode of the exported animation ('PRECISE' or
+'BULK') can be passed as the third argument.
 '''
 import sys
 import bpy
@@ -14,14 +17,19 @@ argv = sys.argv
 argv = argv[argv.index("--") + 1:]
 
 
-def main(scene_name: str, target_path: str):
+def main(scene_name: str, target_path: str, pose_sampling_mode: str = ''):
     '''Main function.'''
     bpy.context.window.scene = bpy.data.scenes[scene_name]
     for obj in bpy.context.scene.objects:
         if obj.type == 'ARMATURE':
             bpy.context.view_layer.objects.active = obj
             break
+    if pose_sampling_mode != '':
+        obj = bpy.context.object
+        animations = obj.mcblend.animations
+        animations[obj.mcblend.active_animation].pose_sampling_mode = (
+            pose_sampling_mode)
     bpy.ops.mcblend.export_animation(filepath=target_path)
 
 if __name__ == "__main__":
-    main(argv[0], argv[1])
+    main(*argv[:3])
@@ -0,0 +1,38 @@
+'''
+Select scene passed in commandline arguments and export the animation of its
+first armature without the animation name, optimized for the whole animation
+file, to path passed in arguments.
+
+The third argument is the keyframe budget of the optimization. If it's 0, the
+animation is optimized with the default error margin instead.
+
+This script should be executed after opening testing file with a model that
+have animation.
+'''
+import sys
+import bpy
+
+
+# Collect arguments after "--"
+argv = sys.argv
+argv = argv[argv.index("--") + 1:]
+
+
+def main(scene_name: str, target_path: str, budget: str):
+    '''Main function.'''
+    bpy.context.window.scene = bpy.data.scenes[scene_name]
+    for obj in bpy.context.scene.objects:
+        if obj.type == 'ARMATURE':
+            bpy.context.view_layer.objects.active = obj
+            break
+    obj = bpy.context.object
+    anim_data = obj.mcblend.animations[obj.mcblend.active_animation]
+    anim_data.name = ""
+    anim_data.optimize_animation = True
+    if int(budget) > 0:
+        anim_data.optimization_budget_mode = 'KEYFRAMES'
+        anim_data.optimization_budget = int(budget)
+    bpy.ops.mcblend.export_animation(filepath=target_path)
+
+if __name__ == "__main__":
+    main(*argv[:3])
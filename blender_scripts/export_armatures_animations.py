@@ -0,0 +1,52 @@
+'''
+Select scene passed in commandline arguments, select all armatures and export
+their active animations to the directory passed in arguments (one file per
+armature). After that, export the animation of every armature alone to the
+existing "single" subdirectory of that directory for comparison.
+
+Optionally, the number of copies of every armature added to the scene before
+the export (to test the scenes with multiple armatures) can be passed as the
+third argument.
+
+This script should be executed after opening testing file with a model that
+have animation.
+'''
+import sys
+import bpy
+
+
+# Collect arguments after "--"
+argv = sys.argv
+argv = argv[argv.index("--") + 1:]
+
+
+def main(scene_name: str, target_directory: str, copies: str = '0'):
+    '''Main function.'''
+    bpy.context.window.scene = bpy.data.scenes[scene_name]
+    scene = bpy.context.scene
+    armatures = [obj for obj in scene.objects if obj.type == 'ARMATURE']
+    for i in range(int(copies)):
+        for armature in armatures:
+            copy = armature.copy()
+            copy.location.x += 2.0 * (i + 1)
+            scene.collection.objects.link(copy)
+    armatures = [
+        obj for obj in scene.objects
+        if obj.type == 'ARMATURE' and len(obj.mcblend.animations) > 0]
+
+    bpy.ops.object.select_all(action='DESELECT')
+    for armature in armatures:
+        armature.select_set(True)
+        bpy.context.view_layer.objects.active = armature
+    bpy.ops.mcblend.export_armatures_animations(directory=target_directory)
+
+    for armature in armatures:
+        bpy.ops.object.select_all(action='DESELECT')
+        armature.select_set(True)
+        bpy.context.view_layer.objects.active = armature
+        bpy.ops.mcblend.export_animation(
+            filepath=f'{target_directory}/single/{armature.name}'
+            '.animation.json')
+
+if __name__ == "__main__":
+    main(*argv[:3])
@@ -0,0 +1,251 @@
+'''
+Optimize all animation files from the animations folder of a resource pack
+with the animation optimizer of Mcblend. Unlike the other scripts, this one
+doesn't use Blender. Run it with:
+```
+python blender_scripts/optimize_animations.py <rp-path> [options]
+```
+The files are optimized in parallel by a pool of processes. Every file is
+replaced atomically (the result is written to a temporary file which then
+replaces the original), so an interrupted run never leaves broken files. The
+script prints the number of keyframes and bytes saved in every file.
+
+Use --help to see the list of options.
+'''
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, NamedTuple, Optional
+
+SRC_PATH = Path(__file__).resolve().parent.parent / 'mcblend/operator_func'
+
+
+def _load_module(name: str, path: Path) -> ModuleType:
+    '''
+    Loads a module directly from its file. Importing the modules through the
+    mcblend package requires Blender.
+    '''
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+animation_optimization = _load_module(
+    'animation_optimization', SRC_PATH / 'animation_optimization.py')
+better_json_tools = _load_module(
+    'better_json_tools',
+    SRC_PATH / 'sqlite_bedrock_packs/better_json_tools.py')
+
+
+class OptimizationSettings(NamedTuple):
+    '''The settings of the optimizer (see get_optimizer).'''
+    error_margin: float
+    '''The maximum allowed error margin in percents.'''
+    strategy: str
+    '''The optimization strategy ('GREEDY' or 'DOUGLAS_PEUCKER').'''
+    rotation_error_degrees: float
+    '''The angular rotation error in degrees (0 - use the error margin).'''
+    position_error_absolute: float
+    '''The absolute threshold of the position errors (0 - disabled).'''
+    scale_error_absolute: float
+    '''The absolute threshold of the scale errors (0 - disabled).'''
+    dry_run: bool
+    '''Whether the results should be reported without saving them.'''
+
+
+class FileReport(NamedTuple):
+    '''The result of optimizing a single animation file.'''
+    path: str
+    keyframes_before: int = 0
+    keyframes_after: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    error: Optional[str] = None
+    '''The error message if the file couldn't be optimized.'''
+
+
+def get_optimizer(settings: OptimizationSettings) -> Any:
+    '''
+    Creates the AnimationOptimizer that optimizes all of the animations of a
+    file. The settings have the same meaning as the optimization properties
+    of the animations in Blender.
+    '''
+    ErrorTolerance = animation_optimization.ErrorTolerance
+    error_margin = settings.error_margin / 100.0
+    return animation_optimization.AnimationOptimizer(
+        error_margin=error_margin,
+        strategy=settings.strategy,
+        tolerances={
+            'position': ErrorTolerance(
+                error_margin, absolute=settings.position_error_absolute),
+            'rotation': ErrorTolerance(
+                error_margin, angular=settings.rotation_error_degrees),
+            'scale': ErrorTolerance(
+                error_margin, absolute=settings.scale_error_absolute),
+        })
+
+
+def count_keyframes(data: Any) -> int:
+    '''Counts the keyframes of all of the animations of an animation file.'''
+    if not isinstance(data, dict) or not isinstance(
+            data.get('animations'), dict):
+        return 0
+    result = 0
+    for animation in data['animations'].values():
+        if not isinstance(animation, dict):
+            continue
+        for _, timeline in animation_optimization.walk_bone_timelines(
+                animation):
+            result += len(timeline)
+    return result
+
+
+def write_atomic(path: Path, text: str):
+    '''
+    Writes the text to a file by replacing it with a temporary file from the
+    same directory.
+    '''
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def optimize_file(path: str, settings: OptimizationSettings) -> FileReport:
+    '''
+    Optimizes all of the animations of an animation file. The file is
+    saved only if some of its keyframes were removed.
+    '''
+    file_path = Path(path)
+    try:
+        original = file_path.read_text(encoding='utf8')
+        data = json.loads(original, cls=better_json_tools.JSONCDecoder)
+        keyframes_before = count_keyframes(data)
+        data = get_optimizer(settings).optimize_animation(data)
+        keyframes_after = count_keyframes(data)
+        bytes_before = len(original.encode('utf8'))
+        if keyframes_after == keyframes_before:
+            return FileReport(
+                path, keyframes_before, keyframes_after, bytes_before,
+                bytes_before)
+        result = json.dumps(data, cls=better_json_tools.CompactEncoder)
+        if not settings.dry_run:
+            write_atomic(file_path, result)
+        return FileReport(
+            path, keyframes_before, keyframes_after, bytes_before,
+            len(result.encode('utf8')))
+    except Exception as e:  # pylint: disable=broad-except
+        return FileReport(path, error=f'{type(e).__name__}: {e}')
+
+
+def optimize_resource_pack(
+        rp_path: Path, settings: OptimizationSettings,
+        workers: Optional[int] = None) -> List[FileReport]:
+    '''
+    Optimizes all of the animation files from the animations folder of a
+    resource pack (including the subfolders) using a pool of processes.
+
+    :param rp_path: the path to the resource pack.
+    :param settings: the settings of the optimizer.
+    :param workers: the number of processes (the number of CPUs by
+        default).
+    :returns: the reports of the files sorted by their paths.
+    '''
+    paths = sorted(
+        str(p) for p in (rp_path / 'animations').rglob('*.json')
+        if p.is_file())
+    if len(paths) == 0:
+        return []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            optimize_file, paths, [settings] * len(paths)))
+
+
+def print_report(reports: List[FileReport], rp_path: Path):
+    '''Prints the numbers of keyframes and bytes saved in every file.'''
+    keyframes_saved = 0
+    bytes_saved = 0
+    for report in reports:
+        name = os.path.relpath(report.path, rp_path)
+        if report.error is not None:
+            print(f'{name}: ERROR {report.error}')
+            continue
+        saved_keyframes = report.keyframes_before - report.keyframes_after
+        saved_bytes = report.bytes_before - report.bytes_after
+        keyframes_saved += saved_keyframes
+        bytes_saved += saved_bytes
+        print(
+            f'{name}: {report.keyframes_before} -> {report.keyframes_after} '
+            f'keyframes ({saved_keyframes} saved), {report.bytes_before} -> '
+            f'{report.bytes_after} bytes ({saved_bytes} saved)')
+    errors = sum(1 for r in reports if r.error is not None)
+    print(
+        f'Total: {len(reports)} files ({errors} failed), {keyframes_saved} '
+        f'keyframes saved, {bytes_saved} bytes saved')
+
+
+def main(argv: List[str]) -> int:
+    '''Main function.'''
+    parser = argparse.ArgumentParser(
+        description=(
+            'Optimize the animation files of a resource pack without '
+            'Blender.'))
+    parser.add_argument('rp_path', type=Path, help='The resource pack path.')
+    parser.add_argument(
+        '--error-margin', type=float, default=5.0,
+        help='The maximum allowed error margin in percents (default: 5).')
+    parser.add_argument(
+        '--strategy', choices=('GREEDY', 'DOUGLAS_PEUCKER'),
+        default='GREEDY', help='The optimization strategy.')
+    parser.add_argument(
+        '--rotation-error', type=float, default=0.0,
+        help=(
+            'The maximum angle between the original and the optimized '
+            'rotations in degrees. Replaces the error margin of the '
+            'rotations (default: 0 - disabled).'))
+    parser.add_argument(
+        '--position-error', type=float, default=0.0,
+        help=(
+            'The position errors smaller than this distance are always '
+            'allowed (default: 0 - disabled).'))
+    parser.add_argument(
+        '--scale-error', type=float, default=0.0,
+        help=(
+            'The scale errors smaller than this value are always allowed '
+            '(default: 0 - disabled).'))
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help='The number of processes (default: the number of CPUs).')
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Print the report without saving the files.')
+    args = parser.parse_args(argv)
+    settings = OptimizationSettings(
+        error_margin=args.error_margin,
+        strategy=args.strategy,
+        rotation_error_degrees=args.rotation_error,
+        position_error_absolute=args.position_error,
+        scale_error_absolute=args.scale_error,
+        dry_run=args.dry_run)
+    reports = optimize_resource_pack(args.rp_path, settings, args.workers)
+    print_report(reports, args.rp_path)
+    return 1 if any(r.error is not None for r in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -210,6 +210,24 @@ class MCBLEND_AnimationProperties(PropertyGroup):
         description='Control how keyframes are interpolated',
         default='AUTO'
     )
+    pose_sampling_mode: EnumProperty(
+        items=(
+            (
+                'PRECISE', 'Precise',
+                'Read the transformations of the bones one by one'
+            ),
+            (
+                'BULK', 'Bulk',
+                'Read the pose matrices of all bones at once and calculate '
+                'their transformations together. Faster for rigs with many '
+                'bones. The results may differ from the "Precise" mode '
+                'slightly due to the floating point precision'
+            )
+        ),
+        name='Pose Sampling',
+        description='Control how the poses of the bones are sampled',
+        default='PRECISE'
+    )
     loop: EnumProperty(
         items=(
             (
@@ -268,6 +286,111 @@ class MCBLEND_AnimationProperties(PropertyGroup):
         min=0.0,
         max=100.0,
     )
+    optimization_strategy: EnumProperty(
+        items=(
+            (
+                'GREEDY', 'Greedy',
+                'Repeatedly remove the keyframes that can be interpolated '
+                'from their neighbors. The error of the removed keyframes is '
+                'checked only against their neighbors at the time of removing '
+                'them'
+            ),
+            (
+                'DOUGLAS_PEUCKER', 'Douglas-Peucker',
+                'Remove the keyframes with the Douglas-Peucker algorithm. The '
+                'error of every removed keyframe is checked against the '
+                'final animation, so it never exceeds the error margin'
+            )
+        ),
+        name='Optimization Strategy',
+        description='The algorithm used for removing the keyframes',
+        default='GREEDY'
+    )
+    optimization_budget_mode: EnumProperty(
+        items=(
+            (
+                'NONE', 'None',
+                'Use the error settings'
+            ),
+            (
+                'KEYFRAMES', 'Keyframes',
+                'Scale all of the error settings by the smallest factor that '
+                'keeps the number of the keyframes of the animation within '
+                'the budget'
+            ),
+            (
+                'BYTES', 'Bytes',
+                'Scale all of the error settings by the smallest factor that '
+                'keeps the size of the animation in the file within the '
+                'budget'
+            )
+        ),
+        name='Budget',
+        description=(
+            'Scale the error settings automatically to meet a size budget '
+            'of the animation'),
+        default='NONE'
+    )
+    optimization_budget: IntProperty(
+        name="Budget Size",
+        description=(
+            "The maximum number of the keyframes or bytes of the optimized "
+            "animation"),
+        default=1000,
+        min=1,
+    )
+    use_angular_rotation_error: BoolProperty(
+        name="Angular Rotation Error",
+        description=(
+            "Measure the error of the rotations as the angle between the "
+            "original and the optimized rotation instead of using the "
+            "error margin"),
+        default=False,
+    )
+    rotation_error_degrees: FloatProperty(
+        name="Rotation Error (°)",
+        description=(
+            "Maximum allowed angle between the original and the optimized "
+            "rotation in degrees"),
+        default=1.0,
+        min=0.0,
+        max=180.0,
+    )
+    position_error_absolute: FloatProperty(
+        name="Position Error",
+        description=(
+            "Errors of the positions smaller than this distance (in "
+            "Minecraft units) are always allowed, even if they exceed the "
+            "error margin. 0 disables this threshold"),
+        default=0.0,
+        min=0.0,
+    )
+    scale_error_absolute: FloatProperty(
+        name="Scale Error",
+        description=(
+            "Errors of the scales smaller than this value are always "
+            "allowed, even if they exceed the error margin. 0 disables this "
+            "threshold"),
+        default=0.0,
+        min=0.0,
+    )
+    use_hierarchy_error: BoolProperty(
+        name="Hierarchy Error",
+        description=(
+            "Derive the allowed errors of the bones from the displacement "
+            "of the pivots of their descendants instead of using the other "
+            "error settings. The bones close to the root of the hierarchy "
+            "are kept accurate and the leaf bones are optimized more"),
+        default=False,
+    )
+    hierarchy_error_distance: FloatProperty(
+        name="Max Displacement",
+        description=(
+            "Maximum allowed displacement of the descendants of the "
+            "optimized bones in Minecraft units"),
+        default=0.1,
+        min=0.001,
+    )
     nla_tracks: CollectionProperty(
         type=MCBLEND_JustName
     )
@@ -295,6 +418,32 @@ class MCBLEND_AnimationProperties(PropertyGroup):
         default="",
         maxlen=1024
     )
+    use_adaptive_sampling: BoolProperty(
+        name="Adaptive Sampling",
+        description=(
+            "Sample additional subframes between the keyframes where the "
+            "pose of the armature deviates from the linear interpolation of "
+            "the neighboring keyframes"),
+        default=False,
+    )
+    adaptive_sampling_error: FloatProperty(
+        name="Max Deviation",
+        description=(
+            "Maximum allowed deviation from the linear interpolation. The "
+            "positions are measured in Minecraft units, the rotations in "
+            "degrees and the scales in percents"),
+        default=0.1,
+        min=0.001,
+    )
+    adaptive_sampling_min_step: FloatProperty(
+        name="Min Step",
+        description=(
+            "The smallest distance between the sampled frames. The "
+            "sampling stops splitting the space between the frames when "
+            "the distance would be smaller than this value"),
+        default=0.25,
+        min=0.01,
+    )
     action: StringProperty(
         name="Action",
         description="The action active when using this animation.",
@@ -49,6 +49,7 @@ class MCBLEND_AnimationProperties(PropertyGroup):
     override_previous_animation: bool
     anim_time_update: str
     interpolation_mode: str
+    pose_sampling_mode: str
     loop: str
     frame_start: int
     frame_current: int
@@ -58,7 +59,19 @@ class MCBLEND_AnimationProperties(PropertyGroup):
     optimize_animation: bool
     exclude_from_batch_exports: bool
     optimization_error: float
+    optimization_strategy: str
+    optimization_budget_mode: str
+    optimization_budget: int
+    use_angular_rotation_error: bool
+    rotation_error_degrees: float
+    position_error_absolute: float
+    scale_error_absolute: float
+    use_hierarchy_error: bool
+    hierarchy_error_distance: float
     frame_slice_pattern: str
+    use_adaptive_sampling: bool
+    adaptive_sampling_error: float
+    adaptive_sampling_min_step: float
     action: str
     action_slot: int
 
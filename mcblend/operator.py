@@ -8,7 +8,7 @@ from json.decoder import JSONDecodeError
 from typing import List, Optional, Dict, Any, Set, TYPE_CHECKING, cast
 
 import bpy
-from bpy.types import Operator, Context, Event
+from bpy.types import Operator, Context, Event, Object
 from bpy.props import (
     StringProperty, FloatProperty, EnumProperty, BoolProperty,  # type: ignore
     IntProperty  # type: ignore
@@ -31,11 +31,16 @@ from .uv_data import get_unused_uv_group_name
 from .operator_func.material import MATERIALS_MAP
 
 from .operator_func import (
-    export_model, export_animation, fix_uvs, separate_mesh_cubes, set_uvs,
+    export_model, export_animation, export_animations, fix_uvs, separate_mesh_cubes, set_uvs,
     import_model, inflate_objects, load_rp_to_mcblned, unload_rps,
     import_model_form_project, apply_materials, prepare_physics_simulation,
     merge_models)
 from .operator_func.rp_importer import get_pks_for_model_improt
+from .operator_func.parallel_export import (
+    WorkerResult, export_animations_in_parallel, merge_animation_dicts)
+from .operator_func.animation_cache import (
+    AnimationCache, get_animation_cache_key, get_cache_path)
+from .operator_func.profiling import profile_stage, profiled_execute
 from .operator_func.sqlite_bedrock_packs.better_json_tools import (
     CompactEncoder, JSONCDecoder)
 from .operator_func.exception import NotEnoughTextureSpace, ImporterException
@@ -81,6 +86,7 @@ class MCBLEND_OT_ExportModel(  # pyright: ignore[reportIncompatibleMethodOverrid
             return False
         return obj.type == 'ARMATURE'
 
+    @profiled_execute('export_model')
     def execute(self, context: Context):
         bpy.ops.screen.animation_cancel()  # pyright: ignore[reportUnknownMemberType]
         original_frame = context.scene.frame_current
@@ -104,7 +110,8 @@ class MCBLEND_OT_ExportModel(  # pyright: ignore[reportIncompatibleMethodOverrid
         finally:
             context.scene.frame_set(original_frame)
 
-        with open(self.filepath, 'w', encoding='utf8') as f:
+        with profile_stage('json_dump'), open(
+                self.filepath, 'w', encoding='utf8') as f:
             json.dump(result, f, cls=CompactEncoder)
         if warnings_counter > 1:
             self.report(
@@ -145,6 +152,18 @@ class MCBLEND_OT_ExportAnimation(  # pyright: ignore[reportIncompatibleMethodOve
         maxlen=1000
     )
 
+    use_cache: BoolProperty(  # type: ignore
+        name="Use cache",
+        description=(
+            "Store the exported animation in a cache file next to the "
+            "exported file and reuse it in the next exports if the "
+            "animation didn't change"),
+        default=False
+    )
+
+    if TYPE_CHECKING:
+        use_cache: bool
+
     @classmethod
     def poll(cls, context: Context) -> bool:
         if context.mode != 'OBJECT':
@@ -163,23 +182,32 @@ class MCBLEND_OT_ExportAnimation(  # pyright: ignore[reportIncompatibleMethodOve
             return False
         return True
 
+    @profiled_execute('export_animation')
     def execute(self, context: Context):
         # Read and validate old animation file
         old_dict: Optional[Dict[str, Any]] = None
         filepath: str = self.filepath  # type: ignore
         try:
-            with open(filepath, 'r', encoding='utf8') as f:  # type: ignore
+            with profile_stage('json_load'), open(
+                    filepath, 'r', encoding='utf8') as f:
                 old_dict = json.load(f, cls=JSONCDecoder)
         except (json.JSONDecodeError, OSError):
             pass
-        animation_dict, warnings_generator = export_animation(context, old_dict)
+        cache: Optional[AnimationCache] = None
+        if self.use_cache:
+            cache = AnimationCache(get_cache_path(filepath))
+        animation_dict, warnings_generator = export_animation(
+            context, old_dict, cache)
         warnings_counter = 0
         for warning in warnings_generator:
             self.report({'WARNING'}, warning)
             warnings_counter += 1
+        if cache is not None:
+            cache.save()
 
         # Save file and finish
-        with open(filepath, 'w', encoding='utf8') as f:  # type: ignore
+        with profile_stage('json_dump'), open(
+                filepath, 'w', encoding='utf8') as f:
             json.dump(animation_dict, f, cls=CompactEncoder)
         if warnings_counter > 1:
             self.report(
@@ -221,8 +249,28 @@ class MCBLEND_OT_BatchExportAnimation(  # pyright: ignore[reportIncompatibleMeth
         maxlen=1000
     )
 
+    workers: IntProperty(  # type: ignore
+        name="Worker processes",
+        description=(
+            "The number of background Blender processes used for exporting "
+            "the animations in parallel. With 1 the animations are exported "
+            "one by one in this Blender instance"),
+        default=1, min=1, max=64
+    )
+
+    use_cache: BoolProperty(  # type: ignore
+        name="Use cache",
+        description=(
+            "Store the exported animations in a cache file next to the "
+            "exported file and reuse them in the next exports if the "
+            "animations didn't change"),
+        default=False
+    )
+
     if TYPE_CHECKING:
         filepath: str
+        workers: int
+        use_cache: bool
 
     @classmethod
     def poll(cls, context: Context) -> bool:
@@ -238,6 +286,7 @@ class MCBLEND_OT_BatchExportAnimation(  # pyright: ignore[reportIncompatibleMeth
             return False
         return True
 
+    @profiled_execute('batch_export_animation')
     def execute(self, context: Context):
         obj = context.object
         if obj is None or obj.type != 'ARMATURE':
@@ -263,7 +312,8 @@ class MCBLEND_OT_BatchExportAnimation(  # pyright: ignore[reportIncompatibleMeth
         old_dict: Optional[Dict[str, Any]] = None
         filepath: str = self.filepath
         try:
-            with open(filepath, 'r', encoding='utf8') as f:
+            with profile_stage('json_load'), open(
+                    filepath, 'r', encoding='utf8') as f:
                 old_dict = json.load(f, cls=JSONCDecoder)
         except (json.JSONDecodeError, OSError):
             pass
@@ -272,30 +322,104 @@ class MCBLEND_OT_BatchExportAnimation(  # pyright: ignore[reportIncompatibleMeth
 
         exported_count = 0
 
+        # Skip animations excluded from batch exports
+        animation_indices = [
+            i for i, animation in enumerate(animations)
+            if not animation.exclude_from_batch_exports]
+        # The optimization of animations without names affects all of the
+        # animations in the file, so the result depends on the order of
+        # exporting. Such animations are exported serially.
+        use_workers = self.workers > 1 and len(animation_indices) > 1 and all(
+            animations[i].name != "" or not animations[i].optimize_animation
+            for i in animation_indices)
+
+        cache: Optional[AnimationCache] = None
+        if self.use_cache:
+            cache = AnimationCache(get_cache_path(filepath))
+
         # Export each animation
         total_warnings_counter = 0
-        for i, animation in enumerate(animations):
-            # Skip animations excluded from batch exports
-            if animation.exclude_from_batch_exports:
-                continue
-            # Load and append animation to dict
-            mcblend_data.active_animation = i
-            load_animation_properties(animation, context)
-            animation_dict, warnings_generator = export_animation(context, old_dict)
-            old_dict = animation_dict
-            for warning in warnings_generator:
-                self.report({'WARNING'}, f'Animation "{animation.name}": {warning}')
-                total_warnings_counter += 1
-            exported_count += 1
-
-        # Open the originally opened animation
-        mcblend_data.active_animation = original_animation_id
-        load_animation_properties(animations[original_animation_id], context)
+        try:
+            if use_workers:
+                results: List[WorkerResult] = []
+                missing_indices = animation_indices
+                cache_keys: Dict[int, str] = {}
+                if cache is not None:
+                    # Only the animations missing from the cache are sent to
+                    # the workers
+                    missing_indices = []
+                    for i in animation_indices:
+                        animation = animations[i]
+                        mcblend_data.active_animation = i
+                        load_animation_properties(animation, context)
+                        cache_key = get_animation_cache_key(context)
+                        cached = None
+                        if cache_key is not None:
+                            cache_keys[i] = cache_key
+                            cached = cache.get(animation.name, cache_key)
+                        if cached is None:
+                            missing_indices.append(i)
+                        else:
+                            anim_key = f"animation.{animation.name}"
+                            results.append(WorkerResult(
+                                i, {anim_key: cached.animation},
+                                cached.warnings))
+                if len(missing_indices) > 0:
+                    try:
+                        with profile_stage('parallel_export'):
+                            exported = export_animations_in_parallel(
+                                context, obj, missing_indices, self.workers)
+                    except RuntimeError as e:
+                        self.report({'ERROR'}, str(e))
+                        return {'CANCELLED'}
+                    for result in exported:
+                        name = animations[result.animation_index].name
+                        cache_key = cache_keys.get(result.animation_index)
+                        if cache is not None and cache_key is not None:
+                            cache.set(
+                                name, cache_key,
+                                result.animations[f"animation.{name}"],
+                                result.warnings)
+                    results = sorted(
+                        results + exported, key=lambda r: r.animation_index)
+                old_dict = merge_animation_dicts(old_dict, results)
+                for result in results:
+                    animation = animations[result.animation_index]
+                    for warning in result.warnings:
+                        self.report(
+                            {'WARNING'},
+                            f'Animation "{animation.name}": {warning}')
+                        total_warnings_counter += 1
+                    exported_count += 1
+            else:
+                for i in animation_indices:
+                    animation = animations[i]
+                    # Load and append animation to dict
+                    mcblend_data.active_animation = i
+                    load_animation_properties(animation, context)
+                    with profile_stage('export_animation'):
+                        animation_dict, warnings_generator = export_animation(
+                            context, old_dict, cache)
+                    old_dict = animation_dict
+                    for warning in warnings_generator:
+                        self.report(
+                            {'WARNING'},
+                            f'Animation "{animation.name}": {warning}')
+                        total_warnings_counter += 1
+                    exported_count += 1
+        finally:
+            # Open the originally opened animation
+            mcblend_data.active_animation = original_animation_id
+            load_animation_properties(
+                animations[original_animation_id], context)
 
         # Save file
         if exported_count > 0:
-            with open(filepath, 'w', encoding='utf8') as f:
+            with profile_stage('json_dump'), open(
+                    filepath, 'w', encoding='utf8') as f:
                 json.dump(old_dict, f, cls=CompactEncoder)
+            if cache is not None:
+                cache.save()
             
             if total_warnings_counter > 1:
                 self.report(
@@ -333,6 +457,9 @@ class MCBLEND_OT_BatchExportAnimation(  # pyright: ignore[reportIncompatibleMeth
             return
         animations = get_mcblend(obj).animations
         total_pages = (len(animations) + 15) // 16
+
+        layout.prop(self, "workers")
+        layout.prop(self, "use_cache")
         page = get_mcblend_animation_page(context.scene)
         start = page * 16
         end = min(start + 16, len(animations))
@@ -376,6 +503,119 @@ def menu_func_mcblend_batch_export_animation(self: Any, context: Context):
     # pylint: disable=unused-argument
     self.layout.operator(MCBLEND_OT_BatchExportAnimation.bl_idname)
 
+
+def get_selected_animated_armatures(context: Context) -> List[Object]:
+    '''
+    Returns the selected armatures with valid active animations (in the
+    order of their names).
+    '''
+    result: List[Object] = []
+    for obj in context.selected_objects:
+        if obj.type != 'ARMATURE':
+            continue
+        mcblend_data = get_mcblend(obj)
+        if 0 <= mcblend_data.active_animation < len(mcblend_data.animations):
+            result.append(obj)
+    return sorted(result, key=lambda obj: obj.name)
+
+
+# Multiple armatures animation exporter
+class MCBLEND_OT_ExportArmaturesAnimations(Operator):
+    '''
+    Operator used for exporting the active animations of multiple armatures
+    to separate files. All of the animations use the frame range of the
+    scene. The operator doesn't use the animation cache or the worker
+    processes of the batch export.
+    '''
+    # pylint: disable=unused-argument, no-member
+    bl_idname = "mcblend.export_armatures_animations"
+    bl_label = "Export Bedrock Animations of Selected Armatures"
+    bl_options = {'REGISTER'}
+    bl_description = (
+        "Export the active animations of all selected armatures (e.g. an "
+        "entity and its attachables) as Minecraft Bedrock Edition "
+        "animations. The frames of the scene are evaluated once for all of "
+        "the armatures. Every armature is saved to a separate file named "
+        "after the armature")
+
+    directory: StringProperty(  # type: ignore
+        name="Directory",
+        subtype='DIR_PATH'
+    )
+
+    if TYPE_CHECKING:
+        directory: str
+
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        if context.mode != 'OBJECT':
+            return False
+        return len(get_selected_animated_armatures(context)) > 0
+
+    def invoke(self, context: Context, event: Event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    @profiled_execute('export_armatures_animations')
+    def execute(self, context: Context):
+        armatures = get_selected_animated_armatures(context)
+        if len(armatures) == 0:
+            self.report({'ERROR'}, "No armatures with animations selected")
+            return {'CANCELLED'}
+        directory = Path(self.directory)
+        filepaths = [
+            directory / f'{armature.name}.animation.json'
+            for armature in armatures]
+        # Read and validate old animation files
+        old_dicts: List[Optional[Dict[str, Any]]] = []
+        for filepath in filepaths:
+            old_dict: Optional[Dict[str, Any]] = None
+            try:
+                with profile_stage('json_load'), open(
+                        filepath, 'r', encoding='utf8') as f:
+                    old_dict = json.load(f, cls=JSONCDecoder)
+            except (json.JSONDecodeError, OSError):
+                pass
+            old_dicts.append(old_dict)
+        results = export_animations(context, armatures, old_dicts)
+
+        total_warnings_counter = 0
+        for armature, filepath, (animation_dict, warnings_generator) in zip(
+                armatures, filepaths, results):
+            for warning in warnings_generator:
+                self.report(
+                    {'WARNING'}, f'Armature "{armature.name}": {warning}')
+                total_warnings_counter += 1
+            with profile_stage('json_dump'), open(
+                    filepath, 'w', encoding='utf8') as f:
+                json.dump(animation_dict, f, cls=CompactEncoder)
+        if total_warnings_counter > 1:
+            self.report(
+                {'WARNING'},
+                f'Successfully exported {len(armatures)} animations to '
+                f'{directory} with a total of {total_warnings_counter} '
+                'warnings. See logs for more details.')
+        elif total_warnings_counter == 1:
+            self.report(
+                {'WARNING'},
+                f'Successfully exported {len(armatures)} animations to '
+                f'{directory} with 1 warning. See logs for more details.')
+        else:
+            self.report(
+                {'INFO'},
+                f'Successfully exported {len(armatures)} animations to '
+                f'{directory}.')
+        return {'FINISHED'}
+
+def menu_func_mcblend_export_armatures_animations(
+        self: Any, context: Context):
+    '''
+    Used to register the operator for exporting the animations of multiple
+    armatures in the file export menu.
+    '''
+    # pylint: disable=unused-argument
+    self.layout.operator(MCBLEND_OT_ExportArmaturesAnimations.bl_idname)
+
 # UV mapper
 class MCBLEND_OT_MapUv(Operator):
     '''
@@ -400,6 +640,7 @@ class MCBLEND_OT_MapUv(Operator):
             return False
         return obj.type == 'ARMATURE'
 
+    @profiled_execute('set_uvs')
     def execute(self, context: Context):
         bpy.ops.screen.animation_cancel()  # pyright: ignore[reportUnknownMemberType]
         original_frame = context.scene.frame_current
@@ -651,9 +892,11 @@ class MCBLEND_OT_ImportModel(  # pyright: ignore[reportIncompatibleMethodOverrid
     if TYPE_CHECKING:
         filepath: str
 
+    @profiled_execute('import_model')
     def execute(self, context: Context):
         # Save file and finish
-        with open(self.filepath, 'r', encoding='utf8') as f:
+        with profile_stage('json_load'), open(
+                self.filepath, 'r', encoding='utf8') as f:
             data = json.load(f, cls=JSONCDecoder)
         try:
             warnings = import_model(
@@ -1887,6 +2130,7 @@ class MCBLEND_OT_ImportRpEntity(Operator):
     def poll(cls, context: Context):
         return len(get_mcblend_project(context.scene).entities) > 0
 
+    @profiled_execute('import_model_form_project')
     def execute(self, context: Context):
         try:
             query_data = get_pks_for_model_improt(context, 'entity')
@@ -1920,6 +2164,7 @@ class MCBLEND_OT_ImportAttachable(Operator):
     def poll(cls, context: Context):
         return len(get_mcblend_project(context.scene).attachables) > 0
 
+    @profiled_execute('import_model_form_project')
     def execute(self, context: Context):
         try:
             query_data = get_pks_for_model_improt(context, 'attachable')
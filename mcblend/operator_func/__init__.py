@@ -3,9 +3,12 @@ Functions used directly by the blender operators.
 '''
 from __future__ import annotations
 
+import copy
+import json
 from pathlib import Path
 from typing import (
-    Dict, Iterable, List, Literal, Optional, Tuple, cast, Callable, Any)
+    Dict, Iterable, List, Literal, Optional, Tuple, cast, Callable, Any,
+    TYPE_CHECKING)
 from dataclasses import dataclass, field
 from collections import defaultdict
 
@@ -13,19 +16,24 @@ import bpy
 from bpy.types import Image, Material, Context, Object, Armature, Mesh
 from mathutils import Matrix
 import numpy as np
+import numpy.typing as npt
 
 from .typed_bpy_access import (
     get_mcblend_project,
     get_mcblend_events,
     get_mcblend)
 
-from .sqlite_bedrock_packs.better_json_tools import load_jsonc
+from .sqlite_bedrock_packs.better_json_tools import (
+    CompactEncoder, load_jsonc)
 
-from .animation import AnimationExport, InterpolationMode
+from .animation import (
+    AnimationExport, InterpolationMode, get_animation_file_dict,
+    load_poses_of_animations)
+from .animation_cache import AnimationCache, get_animation_cache_key
 from .common import (
     ModelOriginType, MINECRAFT_SCALE_FACTOR, CubePolygon, McblendObject, McblendObjectGroup, MeshType,
     apply_obj_transform_keep_origin, fix_cube_rotation, star_pattern_match,
-    MCObjType)
+    MCObjType, ObjectId)
 from .extra_types import Vector2di
 from .importer import ImportGeometry, ModelLoader
 from .material import create_bone_material
@@ -33,7 +41,17 @@ from .model import ModelExport
 from .uv import CoordinatesConverter, UvMapper, UvModelMerger
 from .db_handler import get_db_handler
 from .rp_importer import PksForModelImport
-from .animation_optimization import AnimationOptimizer
+from .animation_optimization import (
+    MAX_TOLERANCE_SCALE, AnimationOptimizer, ErrorTolerance, count_keyframes,
+    find_error_margin, get_bones_hierarchy_tolerances, get_chain_lengths,
+    get_lever_lengths, optimization_strategy_type, scale_tolerance,
+    timeline_type)
+from .profiling import profile_stage
+
+if TYPE_CHECKING:
+    from ..object_data import MCBLEND_AnimationProperties
+else:
+    MCBLEND_AnimationProperties = Any
 
 def export_model(
         context: Context) -> Tuple[Dict[str, Any], Iterable[str]]:
@@ -55,7 +73,8 @@ def export_model(
         armature).model_origin == ModelOriginType.ARMATURE.value
     if use_armature_origin:
         origin = armature
-    mcblend_obj_group = McblendObjectGroup(armature, origin)
+    with profile_stage('load_objects'):
+        mcblend_obj_group = McblendObjectGroup(armature, origin)
     model_properties = get_mcblend(armature)
 
     model = ModelExport(
@@ -67,24 +86,236 @@ def export_model(
         visible_bounds_height=model_properties.visible_bounds_height,
         model_name=model_properties.model_name,
     )
-    model.load(mcblend_obj_group)
-    result['minecraft:geometry'].append(model.json_inner())
+    with profile_stage('load_model'):
+        model.load(mcblend_obj_group)
+    with profile_stage('model_json'):
+        result['minecraft:geometry'].append(model.json_inner())
     return result, model.yield_warnings()
 
-def export_animation(
-        context: Context, old_dict: Optional[Dict[str, Any]]
-    ) -> Tuple[Dict[str, Any], Iterable[str]]:
+def get_error_tolerances(
+        anim_data: MCBLEND_AnimationProperties,
+        tolerance_scale: float = 1.0
+    ) -> Dict[timeline_type, ErrorTolerance]:
     '''
-    Creates a Minecraft animation (dictionary) from selected objects.
+    Returns the error tolerances of the timelines of the animation based on
+    its optimization settings.
+
+    :param anim_data: the properties of the animation.
+    :param tolerance_scale: optional - the factor of all of the error
+        settings (see :func:`scale_tolerance`), used by the search of the
+        error margin for a size budget.
+    '''
+    error_margin = anim_data.optimization_error / 100.0
+    angular = 0.0
+    if anim_data.use_angular_rotation_error:
+        angular = anim_data.rotation_error_degrees
+    tolerances: Dict[timeline_type, ErrorTolerance] = {
+        'position': ErrorTolerance(
+            error_margin, absolute=anim_data.position_error_absolute),
+        'rotation': ErrorTolerance(error_margin, angular=angular),
+        'scale': ErrorTolerance(
+            error_margin, absolute=anim_data.scale_error_absolute),
+    }
+    return {
+        key: scale_tolerance(tolerance, tolerance_scale)
+        for key, tolerance in tolerances.items()
+    }
+
+def get_rest_matrix(objprop: McblendObject) -> Matrix:
+    '''
+    Returns the matrix of a mcblend object in the space of its armature in
+    the rest pose of the armature. Unlike the world matrix, it doesn't
+    depend on the current frame of the scene.
+
+    The bones use their :code:`matrix_local`. The objects parented to bones
+    are placed at the tails of the rest bones, the same way as Blender does
+    with the posed bones. The objects use their own local transformations
+    (:code:`matrix_basis`).
+
+    :param objprop: the mcblend object.
+    '''
+    obj = objprop.thisobj
+    if obj.type == 'ARMATURE':
+        armature_data = cast(Armature, obj.data)
+        return armature_data.bones[objprop.thisobj_id.bone_name].matrix_local
+    # The path from the object to the object parented to the bone
+    matrix = Matrix.Identity(4)
+    while obj is not None and obj.type != 'ARMATURE':
+        matrix = obj.matrix_parent_inverse @ obj.matrix_basis @ matrix
+        if obj.parent_type == 'BONE':
+            parent = obj.parent
+            if parent is None:
+                break
+            bone = cast(Armature, parent.data).bones[obj.parent_bone]
+            return (
+                bone.matrix_local @
+                Matrix.Translation((0.0, bone.length, 0.0)) @ matrix)
+        obj = obj.parent
+    return matrix
+
+def get_bone_levers(
+        object_properties: McblendObjectGroup
+    ) -> Tuple[Dict[str, float], Dict[str, int]]:
+    '''
+    Returns the lever lengths and the chain lengths of the bones (keyed by
+    their names) used for deriving their error tolerances from the
+    displacement of their descendants (see
+    :func:`get_bones_hierarchy_tolerances`). The levers reach the pivots of
+    the bones, cubes and locators and the corners of the cubes in the rest
+    pose (see :func:`get_rest_matrix`), so they don't depend on the current
+    frame of the scene.
+
+    :param object_properties: group of mcblend objects.
+    '''
+    pivots: Dict[ObjectId, npt.NDArray[np.float64]] = {}
+    points: Dict[ObjectId, npt.NDArray[np.float64]] = {}
+    for objid, objprop in object_properties.items():
+        rest_matrix = np.array(get_rest_matrix(objprop))
+        pivots[objid] = rest_matrix[:3, 3] * MINECRAFT_SCALE_FACTOR
+        if objprop.mctype == MCObjType.CUBE:
+            corners = np.array(objprop.thisobj.bound_box)
+            points[objid] = (
+                corners @ rest_matrix[:3, :3].T + rest_matrix[:3, 3]
+            ) * MINECRAFT_SCALE_FACTOR
+    parents = {
+        objid: objprop.parentobj_id
+        for objid, objprop in object_properties.items()
+    }
+    lever_lengths = get_lever_lengths(pivots, parents, points)
+    chain_lengths = get_chain_lengths({
+        objid: objprop.parentobj_id
+        for objid, objprop in object_properties.items()
+        if objprop.mctype == MCObjType.BONE
+    })
+    return (
+        {
+            objid.bone_name: lever_lengths[objid]
+            for objid in chain_lengths
+        },
+        {
+            objid.bone_name: chain_length
+            for objid, chain_length in chain_lengths.items()
+        }
+    )
+
+def get_animation_size(
+        animation_dict: Dict[str, Any], anim_key: str, budget_mode: str
+    ) -> int:
+    '''
+    Returns the size of an animation from an animation file measured in the
+    units of the optimization budget.
+
+    :param animation_dict: the JSON dict of the animation file.
+    :param anim_key: the key of the animation in the file.
+    :param budget_mode: 'KEYFRAMES' for the number of keyframes or 'BYTES'
+        for the size of the animation saved in the file.
+    '''
+    animation_data = animation_dict["animations"][anim_key]
+    if budget_mode == 'KEYFRAMES':
+        return count_keyframes(animation_data)
+    return len(
+        json.dumps({anim_key: animation_data}, cls=CompactEncoder).encode(
+            'utf8'))
+
+@dataclass
+class _AnimationExportTask:
+    '''
+    The export of the active animation of a single armature, split into the
+    preparation (see :func:`_prepare_animation_export`), loading the poses
+    and creating the JSON dict (see :meth:`finish`), so that the poses of
+    multiple armatures can be loaded together.
+    '''
+    anim_data: MCBLEND_AnimationProperties
+    '''The properties of the exported animation.'''
+    animation: AnimationExport
+    '''The exported animation.'''
+    object_properties: McblendObjectGroup
+    '''The group of mcblend objects of the armature.'''
+    create_optimizer: Callable[[float], AnimationOptimizer]
+    '''
+    Creates the optimizer of the animation with all of its error settings
+    multiplied by given factor.
+    '''
+    optimizer: Optional[AnimationOptimizer]
+    '''The optimizer of the animation (None if it's not optimized).'''
+
+    @property
+    def anim_key(self) -> str:
+        '''The key of the animation in the animation file.'''
+        return f"animation.{self.anim_data.name}"
+
+    def finish(self, old_dict: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        '''
+        Creates the JSON dict with the animation after loading its poses.
+
+        :param old_dict: optional - JSON dict with animation to write into.
+        :returns: JSON dict of Minecraft animations.
+        '''
+        anim_data = self.anim_data
+        animation = self.animation
+        optimizer = self.optimizer
+        budget_mode = anim_data.optimization_budget_mode
+        if optimizer is None:
+            budget_mode = 'NONE'
+        # The optimizer without the animation name optimizes all of the
+        # animations in the file, so it can't be a part of the export of this
+        # animation
+        in_export_optimizer = optimizer if anim_data.name != "" else None
+        if budget_mode != 'NONE':
+            # The search exports the loaded poses with different factors of
+            # all of the active error settings and doesn't sample the scene
+            # again. The sizes are measured on the results of the same
+            # optimization as the final export.
+            unoptimized_dict: Optional[Dict[str, Any]] = None
+            if in_export_optimizer is None:
+                animation.optimizer = None
+                unoptimized_dict = animation.json(
+                    skip_rest_poses=anim_data.skip_rest_poses)
+
+            def get_size(tolerance_scale: float) -> int:
+                size_optimizer = self.create_optimizer(tolerance_scale)
+                if unoptimized_dict is not None:
+                    size_dict = size_optimizer.optimize_animation(
+                        copy.deepcopy(unoptimized_dict))
+                else:
+                    animation.optimizer = size_optimizer
+                    size_dict = animation.json(
+                        skip_rest_poses=anim_data.skip_rest_poses)
+                return get_animation_size(
+                    size_dict, self.anim_key, budget_mode)
+            with profile_stage('error_margin_search'):
+                tolerance_scale = find_error_margin(
+                    get_size, anim_data.optimization_budget,
+                    max_error_margin=MAX_TOLERANCE_SCALE)
+            optimizer = self.create_optimizer(tolerance_scale)
+            in_export_optimizer = optimizer if anim_data.name != "" else None
+            animation.optimizer = in_export_optimizer
+        with profile_stage('animation_json'):
+            animation_dict = animation.json(
+                old_json=old_dict, skip_rest_poses=anim_data.skip_rest_poses)
+
+        if optimizer is not None and in_export_optimizer is None:
+            with profile_stage('optimize_animation'):
+                animation_dict = optimizer.optimize_animation(animation_dict)
+        if budget_mode != 'NONE':
+            size = get_animation_size(
+                animation_dict, self.anim_key, budget_mode)
+            if size > anim_data.optimization_budget:
+                animation.warnings.append(
+                    f"The size of the optimized animation ({size}) exceeds the "
+                    f"budget ({anim_data.optimization_budget}) even with the "
+                    f"error settings increased {MAX_TOLERANCE_SCALE:g} times.")
+        return animation_dict
+
+def _prepare_animation_export(
+        context: Context, armature: Object) -> _AnimationExportTask:
+    '''
+    Prepares the export of the active animation of the armature (without
+    loading its poses).
 
     :param context: the context of running the operator.
-    :param old_dict: optional - JSON dict with animation to write into.
-    :returns: JSON dict of Minecraft animations.
+    :param armature: the armature.
     '''
-    armature = context.object  # an armature
-    if armature is None or armature.type != 'ARMATURE':
-        # Should never happen (checked in the operator)
-        raise ValueError("Selected object is not an armature")
     model_properties = get_mcblend(armature)
     anim_id = model_properties.active_animation
     anim_data = model_properties.animations[anim_id]
@@ -96,7 +327,8 @@ def export_animation(
         world_origin = armature
 
     # Check and create object properties
-    object_properties = McblendObjectGroup(armature, world_origin)
+    with profile_stage('load_objects'):
+        object_properties = McblendObjectGroup(armature, world_origin)
 
     effective_fps = context.scene.render.fps/context.scene.render.fps_base
     # Create forced interpolation mode from string
@@ -108,6 +340,30 @@ def export_animation(
     elif anim_data.interpolation_mode == 'STEP':
         forced_interpolation = InterpolationMode.STEP
 
+    bone_levers: Optional[Tuple[Dict[str, float], Dict[str, int]]] = None
+    if anim_data.use_hierarchy_error:
+        bone_levers = get_bone_levers(object_properties)
+
+    def create_optimizer(tolerance_scale: float) -> AnimationOptimizer:
+        tolerances = get_error_tolerances(anim_data, tolerance_scale)
+        bone_tolerances = None
+        if bone_levers is not None:
+            bone_tolerances = get_bones_hierarchy_tolerances(
+                *bone_levers,
+                anim_data.hierarchy_error_distance * tolerance_scale)
+        return AnimationOptimizer(
+            error_margin=tolerances['position'].relative,
+            animation_name=anim_data.name,
+            strategy=cast(
+                optimization_strategy_type, anim_data.optimization_strategy),
+            tolerances=tolerances,
+            bone_tolerances=bone_tolerances
+        )
+
+    optimizer: Optional[AnimationOptimizer] = None
+    if anim_data.optimize_animation:
+        optimizer = create_optimizer(1.0)
+
     animation = AnimationExport(
         name=anim_data.name,
         length=(context.scene.frame_end-1)/effective_fps,
@@ -121,22 +377,100 @@ def export_animation(
             for event in get_mcblend_events(context.scene)
         },
         forced_interpolation=forced_interpolation,
-        frame_slice_pattern=anim_data.frame_slice_pattern
+        frame_slice_pattern=anim_data.frame_slice_pattern,
+        bulk_pose_sampling=anim_data.pose_sampling_mode == 'BULK',
+        adaptive_sampling_error=(
+            anim_data.adaptive_sampling_error
+            if anim_data.use_adaptive_sampling else 0.0),
+        adaptive_sampling_min_step=anim_data.adaptive_sampling_min_step,
+        # The optimizer without the animation name optimizes all of the
+        # animations in the file, so it can't be a part of the export of
+        # this animation
+        optimizer=optimizer if anim_data.name != "" else None
     )
-    animation.load_poses_and_bone_states(object_properties, context)
-    animation_dict = animation.json(
-        old_json=old_dict, skip_rest_poses=anim_data.skip_rest_poses)
-    
-    # Apply animation optimization if enabled
-    if anim_data.optimize_animation:
-        optimizer = AnimationOptimizer(
-            error_margin=anim_data.optimization_error / 100.0,
-            animation_name=anim_data.name
-        )
-        animation_dict = optimizer.optimize_animation(animation_dict)
-        
+    return _AnimationExportTask(
+        anim_data, animation, object_properties, create_optimizer, optimizer)
+
+def export_animation(
+        context: Context, old_dict: Optional[Dict[str, Any]],
+        cache: Optional[AnimationCache] = None
+    ) -> Tuple[Dict[str, Any], Iterable[str]]:
+    '''
+    Creates a Minecraft animation (dictionary) from selected objects.
+
+    :param context: the context of running the operator.
+    :param old_dict: optional - JSON dict with animation to write into.
+    :param cache: optional - the cache of the exported animations. If the
+        animation didn't change since it was added to the cache, the cached
+        result is used instead of exporting the animation again.
+    :returns: JSON dict of Minecraft animations.
+    '''
+    armature = context.object  # an armature
+    if armature is None or armature.type != 'ARMATURE':
+        # Should never happen (checked in the operator)
+        raise ValueError("Selected object is not an armature")
+    model_properties = get_mcblend(armature)
+    anim_id = model_properties.active_animation
+    anim_data = model_properties.animations[anim_id]
+    anim_key = f"animation.{anim_data.name}"
+
+    cache_key: Optional[str] = None
+    # The optimizer without the animation name optimizes all of the
+    # animations from the old_dict, so the result can't be cached
+    if cache is not None and (
+            anim_data.name != "" or not anim_data.optimize_animation):
+        with profile_stage('cache_key'):
+            cache_key = get_animation_cache_key(context)
+    if cache is not None and cache_key is not None:
+        cached = cache.get(anim_data.name, cache_key)
+        if cached is not None:
+            animation_dict = get_animation_file_dict(old_dict)
+            animation_dict["animations"][anim_key] = cached.animation
+            return animation_dict, iter(cached.warnings)
+
+    task = _prepare_animation_export(context, armature)
+    animation = task.animation
+    with profile_stage('load_poses'):
+        animation.load_poses_and_bone_states(task.object_properties, context)
+    animation_dict = task.finish(old_dict)
+
+    if cache is not None and cache_key is not None:
+        warnings = list(animation.yield_warnings())
+        cache.set(
+            anim_data.name, cache_key, animation_dict["animations"][anim_key],
+            warnings)
+        return animation_dict, iter(warnings)
     return animation_dict, animation.yield_warnings()
 
+def export_animations(
+        context: Context, armatures: List[Object],
+        old_dicts: List[Optional[Dict[str, Any]]]
+    ) -> List[Tuple[Dict[str, Any], Iterable[str]]]:
+    '''
+    Creates the Minecraft animations (dictionaries) of the active animations
+    of multiple armatures from the same scene. Works like
+    :func:`export_animation` for every armature, but the poses of all of the
+    armatures are sampled in a single pass over the frames of the scene
+    (see :func:`load_poses_of_animations`).
+
+    :param context: the context of running the operator.
+    :param armatures: the armatures.
+    :param old_dicts: the JSON dicts with animations to write into (one for
+        every armature, None for new files).
+    :returns: JSON dicts of Minecraft animations and the generators of the
+        warnings in the order of the armatures.
+    '''
+    tasks = [
+        _prepare_animation_export(context, armature)
+        for armature in armatures]
+    with profile_stage('load_poses'):
+        load_poses_of_animations(
+            [(task.animation, task.object_properties) for task in tasks],
+            context)
+    return [
+        (task.finish(old_dict), task.animation.yield_warnings())
+        for task, old_dict in zip(tasks, old_dicts)]
+
 def set_uvs(context: Context):
     '''
     Maps the UV for selected objects.
@@ -162,10 +496,12 @@ def set_uvs(context: Context):
         armature).model_origin == ModelOriginType.ARMATURE.value
     if use_armature_origin:
         origin = armature
-    mcblend_obj_group = McblendObjectGroup(armature, origin)
-    mapper = UvMapper(width, height)
-    mapper.append_for_uv_mapping(mcblend_obj_group)
-    mapper.plan_uv(allow_expanding)
+    with profile_stage('load_objects'):
+        mcblend_obj_group = McblendObjectGroup(armature, origin)
+    with profile_stage('plan_uv'):
+        mapper = UvMapper(width, height)
+        mapper.append_for_uv_mapping(mcblend_obj_group)
+        mapper.plan_uv(allow_expanding)
 
     # Replace old mappings
     for objprop in mapper.uv_boxes:
@@ -203,18 +539,20 @@ def set_uvs(context: Context):
         # DIM0:up axis DIM1:right axis DIM2:rgba axis
         arr = np.zeros([image.size[1], image.size[0], 4])
 
-        for uv_cube in mapper.uv_boxes:
-            uv_cube.paint_texture(arr, resolution)
-        image.pixels = arr.ravel()  # Apply texture pixels values
+        with profile_stage('paint_texture'):
+            for uv_cube in mapper.uv_boxes:
+                uv_cube.paint_texture(arr, resolution)
+            image.pixels = arr.ravel()  # Apply texture pixels values
 
     # Set blender UVs
     converter = CoordinatesConverter(
         np.array([[0, width], [0, height]]),
         np.array([[0, 1], [1, 0]])
     )
-    for curr_uv in mapper.uv_boxes:
-        curr_uv.new_uv_layer()
-        curr_uv.set_blender_uv(converter)
+    with profile_stage('set_blender_uv'):
+        for curr_uv in mapper.uv_boxes:
+            curr_uv.new_uv_layer()
+            curr_uv.set_blender_uv(converter)
 
 def fix_uvs(context: Context) -> Vector2di:
     '''
@@ -312,9 +650,11 @@ def import_model(
 
     :returns: list of warnings
     '''
-    model_loader = ModelLoader(data, geometry_name)
-    geometry = ImportGeometry(model_loader)
-    armature = geometry.build_with_armature(context)
+    with profile_stage('load_model'):
+        model_loader = ModelLoader(data, geometry_name)
+        geometry = ImportGeometry(model_loader)
+    with profile_stage('build_model'):
+        armature = geometry.build_with_armature(context)
     model_properties = get_mcblend(armature)
 
     model_properties.texture_width = geometry.texture_width
@@ -518,44 +858,45 @@ def import_model_form_project(
     db_handler = get_db_handler()
     pk = query_data['pk']
     geo_rc_stacks: Dict[int, List[RcStackItem]] = defaultdict(list)
-    for render_controller_data in query_data['render_controllers']:
-        try:
-            # texture - Optional[Image] (bpy.types.Image)
-            texture_file_path = db_handler.get_texture_file_path(
-                render_controller_data['texture_file_pk'])
-            texture = bpy.data.images.load(
-                texture_file_path.as_posix())
-        except RuntimeError:
-            texture = None
-        new_rc_stack_item = RcStackItem(texture)
-        geo_rc_stacks[render_controller_data['geometry_pk']].append(
-            new_rc_stack_item)
-        material_pks = render_controller_data[
-            'render_controller_materials_field_pks']
-        if import_type == 'attachable':
-            get_material_pattern_and_material: Callable[
-                [int, int], tuple[str, str]
-            ] = db_handler.get_attachable_material_pattern_and_material
-        elif import_type == 'entity':
-            get_material_pattern_and_material = (
-                db_handler.get_entity_material_pattern_and_material)
-        else:
-            raise ValueError("Expected 'entity' or 'attachable'")
-        if len(material_pks) > 0:
-            for rc_material_field_pk in material_pks:
-                pattern, material_full_name = (
-                    get_material_pattern_and_material(
-                        pk, rc_material_field_pk)
-                )
-                new_rc_stack_item.materials[pattern] = material_full_name
-        else:
-            # Pull materials from the attachable/entity it's a fake render
-            # controller
-            ce_material_field_pk = render_controller_data[
-                'source_entity_material_field_pk']
-            material_full_name = db_handler.get_full_material_identifier(
-                ce_material_field_pk)
-            new_rc_stack_item.materials['*'] = material_full_name
+    with profile_stage('load_render_controllers'):
+        for render_controller_data in query_data['render_controllers']:
+            try:
+                # texture - Optional[Image] (bpy.types.Image)
+                texture_file_path = db_handler.get_texture_file_path(
+                    render_controller_data['texture_file_pk'])
+                texture = bpy.data.images.load(
+                    texture_file_path.as_posix())
+            except RuntimeError:
+                texture = None
+            new_rc_stack_item = RcStackItem(texture)
+            geo_rc_stacks[render_controller_data['geometry_pk']].append(
+                new_rc_stack_item)
+            material_pks = render_controller_data[
+                'render_controller_materials_field_pks']
+            if import_type == 'attachable':
+                get_material_pattern_and_material: Callable[
+                    [int, int], tuple[str, str]
+                ] = db_handler.get_attachable_material_pattern_and_material
+            elif import_type == 'entity':
+                get_material_pattern_and_material = (
+                    db_handler.get_entity_material_pattern_and_material)
+            else:
+                raise ValueError("Expected 'entity' or 'attachable'")
+            if len(material_pks) > 0:
+                for rc_material_field_pk in material_pks:
+                    pattern, material_full_name = (
+                        get_material_pattern_and_material(
+                            pk, rc_material_field_pk)
+                    )
+                    new_rc_stack_item.materials[pattern] = material_full_name
+            else:
+                # Pull materials from the attachable/entity it's a fake render
+                # controller
+                ce_material_field_pk = render_controller_data[
+                    'source_entity_material_field_pk']
+                material_full_name = db_handler.get_full_material_identifier(
+                    ce_material_field_pk)
+                new_rc_stack_item.materials['*'] = material_full_name
 
     # 2. Load every geometry
     # blender_materials - Prevents creating same material multiple times
@@ -567,14 +908,17 @@ def import_model_form_project(
     warnings: List[str] = []
     for geo_pk, rc_stack in geo_rc_stacks.items():
         geo_path, geo_identifier = db_handler.get_geometry(geo_pk)
-        geo_data = load_jsonc(geo_path).data
-        if not isinstance(geo_data, dict):
-            raise ValueError(f"File {geo_path} is not a valid geometry file")
-        # # Import model
-        model_loader = ModelLoader(geo_data, geo_identifier)
-        warnings.extend(model_loader.warnings)
-        geometry = ImportGeometry(model_loader)
-        armature = geometry.build_with_armature(context)
+        with profile_stage('load_model'):
+            geo_data = load_jsonc(geo_path).data
+            if not isinstance(geo_data, dict):
+                raise ValueError(
+                    f"File {geo_path} is not a valid geometry file")
+            # # Import model
+            model_loader = ModelLoader(geo_data, geo_identifier)
+            warnings.extend(model_loader.warnings)
+            geometry = ImportGeometry(model_loader)
+        with profile_stage('build_model'):
+            armature = geometry.build_with_armature(context)
 
         # 2.1. Set proper textures resolution and model bounds
         model_properties = get_mcblend(armature)
@@ -606,43 +950,46 @@ def import_model_form_project(
                 armature_rc_material.pattern = pattern
                 armature_rc_material.material = material_name
 
-        # 2.3. For every bone of geometry, create blender material from.
-        # Materials are created from a list of pairs:
-        # (Image, minecraft material)
-        for bone_name, bone in geometry.bones.items():
-            # Create a list of materials applicable for this bone
-            bone_materials: List[Tuple[Optional[Image], str]] = []
-            bone_materials_id: List[Tuple[Optional[str], str]] = []
-            for rc_stack_item in reversed(rc_stack):
-                matched_material: Optional[str] = None
-                for pattern, material_name in rc_stack_item.materials.items():
-                    if star_pattern_match(bone_name, pattern):
-                        matched_material = material_name
-                # Add material to bone_materials only if something matched
-                if matched_material is not None:
-                    bone_materials.append(
-                        (rc_stack_item.texture, matched_material))
-                    if rc_stack_item.texture is None:
-                        bone_materials_id.append(
-                            (None, matched_material))
-                    else:
-                        bone_materials_id.append(
-                            (rc_stack_item.texture.name, matched_material))
-            if len(bone_materials) == 0:  # No material for this bone!
-                continue
-            try:  # try to use existing material
-                material = blender_materials[tuple(bone_materials_id)]
-            except: # pylint: disable=bare-except
-                # create material
-                material = create_bone_material("MC_Material", bone_materials)
-                blender_materials[tuple(bone_materials_id)] = material
-            for c in bone.cubes:
-                if c.blend_cube is None:
-                    continue
-                if not isinstance(c.blend_cube.data, Mesh):
+        with profile_stage('create_materials'):
+            # 2.3. For every bone of geometry, create blender material from.
+            # Materials are created from a list of pairs:
+            # (Image, minecraft material)
+            for bone_name, bone in geometry.bones.items():
+                # Create a list of materials applicable for this bone
+                bone_materials: List[Tuple[Optional[Image], str]] = []
+                bone_materials_id: List[Tuple[Optional[str], str]] = []
+                for rc_stack_item in reversed(rc_stack):
+                    matched_material: Optional[str] = None
+                    for pattern, material_name in (
+                            rc_stack_item.materials.items()):
+                        if star_pattern_match(bone_name, pattern):
+                            matched_material = material_name
+                    # Add material to bone_materials only if something matched
+                    if matched_material is not None:
+                        bone_materials.append(
+                            (rc_stack_item.texture, matched_material))
+                        if rc_stack_item.texture is None:
+                            bone_materials_id.append(
+                                (None, matched_material))
+                        else:
+                            bone_materials_id.append(
+                                (rc_stack_item.texture.name, matched_material))
+                if len(bone_materials) == 0:  # No material for this bone!
                     continue
-                c.blend_cube.data.materials.append(
-                    blender_materials[tuple(bone_materials_id)])
+                try:  # try to use existing material
+                    material = blender_materials[tuple(bone_materials_id)]
+                except: # pylint: disable=bare-except
+                    # create material
+                    material = create_bone_material(
+                        "MC_Material", bone_materials)
+                    blender_materials[tuple(bone_materials_id)] = material
+                for c in bone.cubes:
+                    if c.blend_cube is None:
+                        continue
+                    if not isinstance(c.blend_cube.data, Mesh):
+                        continue
+                    c.blend_cube.data.materials.append(
+                        blender_materials[tuple(bone_materials_id)])
     return warnings
 
 def apply_materials(context: Context):
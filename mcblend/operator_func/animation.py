@@ -3,27 +3,38 @@ Functions related to exporting animations.
 '''
 from __future__ import annotations
 
-from typing import NamedTuple, Dict, Optional, List, Tuple, cast, Any, Iterable
+from typing import (
+    NamedTuple, Dict, Optional, List, Tuple, Any, Iterable, Sequence,
+    TypeAlias, Callable)
 import math # pyright: ignore[reportShadowedImports]
-import re
-import bisect
 from enum import Enum
 from dataclasses import dataclass, field
-from itertools import tee, islice  # pyright: ignore[reportShadowedImports]
+from itertools import chain  # pyright: ignore[reportShadowedImports]
 from decimal import Decimal
 
 import bpy
 from bpy.types import Action, ActionSlot, Context, Object
 
 import numpy as np
+import numpy.typing as npt
 
 from .json_tools import get_vect_json
 from .frame_range import get_frames_from_frame_ranges
 from .common import (
     AnimationLoopType, MINECRAFT_SCALE_FACTOR, MCObjType, McblendObjectGroup,
+    McblendObject, get_local_rotation,
     ANIMATION_TIMESTAMP_PRECISION, NumpyTable
 )
+from .pose_evaluation import (
+    BONE_TRANSFORMATION_PATTERN, FCurvePoseEvaluator, get_moving_bones)
+from .profiling import profile_stage
+from .animation_optimization import (
+    AnimationOptimizer, Keyframes, timeline_type)
 from bpy_extras import anim_utils
+from mathutils import Matrix
+
+InterpolationTable: TypeAlias = npt.NDArray[np.uint8]
+'''Array with the values of :class:`InterpolationMode`.'''
 
 class InterpolationMode(Enum):
     '''
@@ -53,10 +64,16 @@ class TransformationType(Enum):
 class Timeline:
     '''
     Represents a timeline of a single bone, with the keyframe numbers and
-    the corresponding interpolation modes - "linear" or "step".
+    the corresponding interpolation modes - "linear" or "step". The
+    keyframes are stored in arrays sorted by the keyframe numbers and the
+    values of the interpolation modes.
     '''
     def __init__(self):
-        self._keyframes: List[tuple[float,InterpolationMode]] = []
+        self._keyframes: NumpyTable = np.empty(0, dtype=np.float64)
+        self._modes: InterpolationTable = np.empty(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self._keyframes)
 
     def add_keyframe(self, keyframe: float, mode: InterpolationMode):
         '''
@@ -65,88 +82,133 @@ class Timeline:
         :param keyframe: the keyframe number.
         :param mode: the interpolation mode of the keyframe.
         '''
-        bisect.insort(self._keyframes, (keyframe, mode))
+        self.add_keyframes([keyframe], np.array([mode.value], dtype=np.uint8))
 
-    def get_state(self, timestamp: float) ->InterpolationMode:
+    def add_keyframes(
+            self, keyframes: Sequence[float], modes: InterpolationTable):
+        '''
+        Adds multiple keyframes to the timeline. The keyframes are sorted
+        once after adding all of them.
+
+        :param keyframes: the keyframe numbers.
+        :param modes: the values of the interpolation modes of the keyframes.
+        '''
+        all_keyframes = np.concatenate(
+            [self._keyframes, np.asarray(keyframes, dtype=np.float64)])
+        all_modes = np.concatenate(
+            [self._modes, np.asarray(modes, dtype=np.uint8)])
+        order = np.lexsort((all_modes, all_keyframes))
+        self._keyframes = all_keyframes[order]
+        self._modes = all_modes[order]
+
+    def get_state(self, timestamp: float) -> InterpolationMode:
         '''
         Returns the interpolation mode of the keyframe at the given timestamp.
 
         :param timestamp: the timestamp of the keyframe.
         :returns: the interpolation mode of the keyframe.
         '''
+        states = self.get_states(np.array([timestamp], dtype=np.float64))
+        return InterpolationMode(int(states[0]))
+
+    def get_states(self, timestamps: NumpyTable) -> InterpolationTable:
+        '''
+        Returns the values of the interpolation modes of the keyframes at
+        the given timestamps. Every timestamp uses the first keyframe at or
+        after it (the last keyframe for the timestamps after the end of the
+        timeline).
+
+        :param timestamps: the timestamps of the keyframes.
+        :returns: the values of the interpolation modes.
+        '''
         if len(self._keyframes) == 0:
-            return InterpolationMode.LINEAR
-        # We are using 'bisect_left' here. Note that bisect_right would give
-        # the same result in this case, because we're compering:
-        # (timestamp, mode) with (timestamp,). When comparing tuples in Python
-        # and the first elements are equal, if one tuple is shorter, it's
-        # considered smaller.
-        index = bisect.bisect_left(
-            self._keyframes, (timestamp,))
+            return np.full(
+                len(timestamps), InterpolationMode.LINEAR.value,
+                dtype=np.uint8)
+        # The keyframes with the same numbers are sorted by their modes, so
+        # 'left' picks the smallest mode
+        indices = np.searchsorted(self._keyframes, timestamps, side='left')
         # Prevent index out of bounds
-        index = min(index, len(self._keyframes) - 1)
-        return self._keyframes[index][1]
+        indices = np.minimum(indices, len(self._keyframes) - 1)
+        return self._modes[indices]
 
-def _pick_closest_rotation(
-        base: NumpyTable, close_to: NumpyTable,
+def _wrap_rotation_offsets(difference: NumpyTable) -> NumpyTable:
+    '''
+    Returns the number of full turns (360 degrees) that have to be
+    subtracted from every element of the difference between two euler
+    rotations to move it into the [-180, 180) range.
+    '''
+    return np.floor((difference + 180.0) / 360.0)
+
+def _pick_closest_rotations(
+        rotations: NumpyTable,
         original_rotation: Optional[NumpyTable] = None
     ) -> NumpyTable:
     '''
-    Takes two arrays with euler rotations in degrees. Looks for rotations
-    that result in same orientation ad the base rotation. Picks the vector
-    which is the closest to the :code:`close_to` using euclidean distance.
+    Takes an array with euler rotations in degrees (one row per frame) and
+    changes every rotation into an equivalent rotation (same orientation)
+    which is the closest to the rotation from the previous frame using
+    euclidean distance. The rotation of the first frame is compared to the
+    zero vector.
+
+    Every rotation has two euler solutions. All of their representations
+    differ by full turns on the axes, so the closest one is found by
+    rounding the difference instead of stepping by 360 degrees. The chosen
+    solution depends only on the solution chosen for the previous frame,
+    so the distances for all of the pairs of solutions are computed at once
+    and only the choice between two states is done frame by frame.
 
     *The :code:`original_rotation` is added specifically to fix some issues with
     bones rotated before the animation. Issue #25 on Github describes the
     problem in detail.
 
-    :base: NumpyTable: the base rotation. Function is looking for different
-        representations of this orientation.
-    :param close_to: target rotation. Function returns the result as close
-        as possible to this vector.
+    :param rotations: the rotations, an array with shape (n, 3).
     :param original_rotation: optional - the original rotation of the object
         before the start of the animation.
-    :returns: another euler angle that represents the same rotation as the base
-        rotation.
+    :returns: an array with shape (n, 3) with rotations that represent the
+        same orientations as the input rotations.
     '''
     if original_rotation is None:
         original_rotation = np.array([0.0, 0.0, 0.0])
-
-    def _pick_closest_location(
-            base: NumpyTable, close_to: NumpyTable
-    ) -> Tuple[float, NumpyTable]:
-        choice: NumpyTable = base
-        distance = np.linalg.norm(choice - close_to)
-
-        for i in range(3):  # Adds removes 360 to all 3 axis (picks the best)
-            arr = np.zeros(3)
-            arr[i] = 360
-            while choice[i] < close_to[i]:
-                new_choice = choice + arr
-                new_distance = np.linalg.norm(new_choice - close_to)
-                if new_distance > distance:  # type: ignore
-                    break
-                distance, choice = new_distance, new_choice
-            while choice[i] > close_to[i]:
-                new_choice = choice - arr
-                new_distance = np.linalg.norm(new_choice - close_to)
-                if new_distance > distance:  # type: ignore
-                    break
-                distance, choice = new_distance, new_choice
-        return cast(float, distance), choice
-
-    distance1, choice1 = _pick_closest_location(base, close_to)
-    distance2, choice2 = _pick_closest_location(  # Counterintuitive but works
+    n = len(rotations)
+    if n == 0:
+        return rotations.copy()
+    # Solutions of every frame (n, 2, 3). Counterintuitive but works
+    solutions = np.stack([
+        rotations,
         (
-            base +
+            rotations +
             np.array([180, 180 + original_rotation[1] * 2, 180])) *
             np.array([1, -1, 1]
-        ),
-        close_to
-    )
-    if distance2 < distance1:
-        return choice2
-    return choice1
+        )
+    ], axis=1)
+    # The first frame is compared to the zero vector
+    first = solutions[0] - 360.0 * _wrap_rotation_offsets(solutions[0])
+    first_distances = np.linalg.norm(first, axis=1)
+    states = np.zeros(n, dtype=np.intp)
+    states[0] = 1 if first_distances[1] < first_distances[0] else 0
+    if n > 1:
+        # differences[i, p, q] - solution q of frame i+1 minus solution p of
+        # frame i
+        differences = (
+            solutions[1:, np.newaxis, :, :] - solutions[:-1, :, np.newaxis, :])
+        wrapped = differences - 360.0 * _wrap_rotation_offsets(differences)
+        distances = np.linalg.norm(wrapped, axis=3)
+        # next_states[i, p] - the solution picked for frame i+1 if solution
+        # p was picked for frame i
+        next_states = (distances[:, :, 1] < distances[:, :, 0]).tolist()
+        state = int(states[0])
+        for i, transitions in enumerate(next_states, start=1):
+            state = int(transitions[state])
+            states[i] = state
+    frames = np.arange(n)
+    chosen = solutions[frames, states]
+    # The number of full turns subtracted from every rotation accumulates
+    # from frame to frame
+    offsets = np.empty_like(chosen)
+    offsets[0] = _wrap_rotation_offsets(chosen[0])
+    offsets[1:] = _wrap_rotation_offsets(chosen[1:] - chosen[:-1])
+    return chosen - 360.0 * np.cumsum(offsets, axis=0)
 
 def frame_to_t(frame: float, fps: float) -> str:
     '''
@@ -159,13 +221,79 @@ def frame_to_t(frame: float, fps: float) -> str:
     return str(round(timestamp, ANIMATION_TIMESTAMP_PRECISION).normalize())
 
 
-'''
-Alias used internally in some funcitons. It's a tuple of data of a keyframe:
-- timestamp
-- Optionally: (bone name, transformation type, interpolation mode)
-'''
-TimeNameTypeInterpolation = Tuple[
-    float, None | Tuple[str, TransformationType, InterpolationMode]]
+class FCurveKeyframes(NamedTuple):
+    '''
+    The keyframes of a single F-curve read with :code:`foreach_get`.
+    '''
+    frames: NumpyTable
+    '''The frame numbers of the keyframes.'''
+    interpolations: InterpolationTable
+    '''The values of the interpolation modes of the keyframes.'''
+    owner: tuple[str, TransformationType] | None
+    '''
+    The bone and the transformation animated by the F-curve or None if the
+    F-curve doesn't animate a bone.
+    '''
+
+def _get_fcurve_owner(
+        data_path: str) -> tuple[str, TransformationType] | None:
+    '''
+    Returns the bone and the transformation animated by an F-curve based on
+    its data path or None if the F-curve doesn't animate a bone.
+    '''
+    match = BONE_TRANSFORMATION_PATTERN.match(data_path)
+    if match is None:
+        return None
+    bone_name = match.group(1)
+    purpose = match.group(2)
+    if purpose == 'location':
+        return (bone_name, TransformationType.LOCATION)
+    if "rotation" in purpose: # rotation_euler, rotation_quaternion
+        return (bone_name, TransformationType.ROTATION)
+    if purpose == 'scale':
+        return (bone_name, TransformationType.SCALE)
+    return None
+
+def _transform_strip_frames(
+        frames: NumpyTable, offset: float, limit_down: float,
+        limit_up: float, scale: float, repeat: float, frame_end: float
+    ) -> Tuple[NumpyTable, npt.NDArray[np.intp]]:
+    '''
+    Transforms the keyframe numbers of an action with the transformations
+    of an NLA strip. The keyframes outside of the limits of the strip are
+    skipped and the other keyframes are scaled and repeated. The repeats
+    that start after the fractional repeat count of the strip are cut off.
+    The results are moved by the offset of the strip and clamped to its end.
+
+    :param frames: the keyframe numbers of the action.
+    :param offset: the frame_start of the strip.
+    :param limit_down: the action_frame_start of the strip.
+    :param limit_up: the action_frame_end of the strip.
+    :param scale: the scale of the strip.
+    :param repeat: the repeat count of the strip.
+    :param frame_end: the frame_end of the strip.
+    :returns: the transformed keyframe numbers (ordered by the source
+        keyframes and then by the repeats) and the indices of their source
+        keyframes.
+    '''
+    source_indices = np.flatnonzero(
+        (frames >= limit_down) & (frames <= limit_up))
+    scaled_cycle_length = (limit_up - limit_down) * scale
+    cycles = np.arange(math.ceil(repeat), dtype=np.float64)
+    # transformed[i, j] - the source keyframe i in the repeat j
+    transformed = (
+        (cycles * scaled_cycle_length)[np.newaxis, :] +
+        (frames[source_indices] * scale)[:, np.newaxis])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Can happen when we've got for example 4th repeat but we only need
+        # 3.5. The repeats after the first one that exceeds the repeat count
+        # are skipped too
+        kept = np.logical_and.accumulate(
+            ~(transformed / scaled_cycle_length > repeat), axis=1)
+    result = np.minimum(transformed[kept] + offset, frame_end)
+    rows = np.broadcast_to(
+        source_indices[:, np.newaxis], transformed.shape)[kept]
+    return result, rows
 
 class ObjectKeyframesInfo:
     def __init__(
@@ -209,6 +337,42 @@ class ObjectKeyframesInfo:
             return InterpolationMode.LINEAR
         return self.timelines[timelines_key].get_state(timestamp)
 
+    def get_bone_states(
+            self, bone_names: Sequence[str],
+            transformation_type: TransformationType,
+            timestamps: Sequence[float]) -> InterpolationTable:
+        '''
+        Returns the values of the interpolation modes of multiple bones at
+        multiple timestamps. Works like :meth:`get_bone_state` but resolves
+        the states of every bone with a single search in its timeline.
+
+        :param bone_names: the names of the bones.
+        :param transformation_type: the type of the transformation.
+        :param timestamps: the timestamps of the keyframes.
+        :returns: array with shape (timestamps, bones) with the values of the
+            interpolation modes.
+        '''
+        if self.forced_interpolation != InterpolationMode.AUTO:
+            return np.full(
+                (len(timestamps), len(bone_names)),
+                self.forced_interpolation.value, dtype=np.uint8)
+        timestamps_array = np.asarray(timestamps, dtype=np.float64)
+        result = np.full(
+            (len(timestamps), len(bone_names)),
+            InterpolationMode.LINEAR.value, dtype=np.uint8)
+        for i, bone_name in enumerate(bone_names):
+            timelines_key = (bone_name, transformation_type)
+            if timelines_key in self.timelines:
+                result[:, i] = self.timelines[timelines_key].get_states(
+                    timestamps_array)
+        # Additional keyframes always use the LINEAR interpolation
+        if len(self.extra_keyframes) > 0:
+            is_extra = np.isin(
+                timestamps_array,
+                np.array(sorted(self.extra_keyframes), dtype=np.float64))
+            result[is_extra] = InterpolationMode.LINEAR.value
+        return result
+
     def add_keyframe_data(
             self, keyframe: float,
             bone_state:
@@ -237,6 +401,38 @@ class ObjectKeyframesInfo:
         timeline = self.timelines.setdefault(timelines_key, Timeline())
         timeline.add_keyframe(rounded_keyframe, interpolation)
 
+    def add_fcurves_keyframes(
+            self, fcurves: Iterable[FCurveKeyframes], prec: int=1):
+        '''
+        Adds the keyframes of multiple F-curves to this keyframe info. Works
+        like :meth:`add_keyframe_data` but every distinct keyframe number is
+        rounded only once and the timelines of the bones are sorted once.
+
+        :param fcurves: the keyframes of the F-curves.
+        :param prec: the precision for rounding the keyframe numbers.
+        '''
+        grouped: Dict[
+            tuple[str, TransformationType] | None,
+            List[FCurveKeyframes]] = {}
+        for fcurve in fcurves:
+            grouped.setdefault(fcurve.owner, []).append(fcurve)
+        for owner, owner_fcurves in grouped.items():
+            frames = np.concatenate([f.frames for f in owner_fcurves])
+            if len(frames) == 0:
+                continue
+            unique_frames, inverse = np.unique(frames, return_inverse=True)
+            # The built-in round() is used to get exactly the same results
+            # as add_keyframe_data
+            rounded = [round(frame, prec) for frame in unique_frames.tolist()]
+            self.keyframes.update(rounded)
+            if owner is None:
+                continue
+            interpolations = np.concatenate(
+                [f.interpolations for f in owner_fcurves])
+            timeline = self.timelines.setdefault(owner, Timeline())
+            timeline.add_keyframes(
+                np.array(rounded)[inverse.ravel()], interpolations)
+
     def _init_keyframes_and_timelines(self, obj: Object):
         '''
         Lists keyframe numbers of the animation from keyframes of NLA tracks and
@@ -261,10 +457,8 @@ class ObjectKeyframesInfo:
         if obj.animation_data is None:
             return
         if obj.animation_data.action is not None:  # type: ignore
-            keyframes_and_bone_states = self._get_keyframes_and_bone_states(
-                obj.animation_data.action, obj.animation_data.action_slot)
-            for keyframe, bone_data in keyframes_and_bone_states:
-                self.add_keyframe_data(keyframe, bone_data)
+            self.add_fcurves_keyframes(self._get_fcurves_keyframes(
+                obj.animation_data.action, obj.animation_data.action_slot))
         if obj.animation_data.nla_tracks is None:  # type: ignore
             return
         for nla_track in obj.animation_data.nla_tracks:
@@ -275,150 +469,586 @@ class ObjectKeyframesInfo:
                     continue
                 if strip.action is None:
                     continue
-                strip_action_keyframes = self._get_keyframes_and_bone_states(
+                strip_fcurves = self._get_fcurves_keyframes(
                     strip.action, strip.action_slot)
                 # Scale/strip the action data with the strip
                 # transformations
-                offset =  strip.frame_start
-                limit_down =  strip.action_frame_start
-                limit_up =  strip.action_frame_end
-                scale =  strip.scale
-                cycle_length = limit_up - limit_down
-                scaled_cycle_length = cycle_length * scale
-                repeat =  strip.repeat
-                for (keyframe, bone_state) in sorted(
-                        strip_action_keyframes, key=lambda x: x[0]):
-                    if keyframe < limit_down or keyframe > limit_up:
-                        continue
-                    transformed_keyframe_base = keyframe * scale
-                    for i in range(math.ceil(repeat)):
-                        transformed_keyframe = (
-                            (i * scaled_cycle_length) +
-                            transformed_keyframe_base
-                        )
-                        if transformed_keyframe/scaled_cycle_length > repeat:
-                            # Can happen when we've got for example 4th
-                            # repeat but we only need 3.5
-                            break
-                        transformed_keyframe = min(
-                            transformed_keyframe + offset, strip.frame_end)
-                        self.add_keyframe_data(transformed_keyframe, bone_state)
-
-    def _get_keyframes_and_bone_states(
+                transformed_fcurves: List[FCurveKeyframes] = []
+                for fcurve in strip_fcurves:
+                    frames, source_indices = _transform_strip_frames(
+                        fcurve.frames, strip.frame_start,
+                        strip.action_frame_start, strip.action_frame_end,
+                        strip.scale, strip.repeat, strip.frame_end)
+                    transformed_fcurves.append(FCurveKeyframes(
+                        frames, fcurve.interpolations[source_indices],
+                        fcurve.owner))
+                self.add_fcurves_keyframes(transformed_fcurves)
+
+    def _get_fcurves_keyframes(
             self,
             action: Action | None,
             slot: ActionSlot | None
-    ) -> List[TimeNameTypeInterpolation]:
+    ) -> List[FCurveKeyframes]:
         '''
-        Helper function for _get_keyframes(). Gets set of keyframes and bone
-        states from an action.
-
-        The result is a dictionary with keyframes (floats) as keys and lists
-        of tuples with bone name, transformation type and interpolation mode
-        as values.
-
-        The floats used as keys are rounded so there shouldn't be any
-        issues with keys that are very close to each other.
+        Helper function for _init_keyframes_and_timelines(). Reads the
+        keyframe numbers and the interpolation modes of the F-curves of an
+        action. The data of every F-curve is read with :code:`foreach_get`
+        and its data path is parsed once.
         '''
-        # Pattern to extract bone names and the purpose of the fcurve from
-        # its name.
-        pattern = re.compile(
-            r'pose\.bones\[(?:\'|")([^\]]+)(?:\'|")\]\.([a-zA-Z0-9_]+)')
-        result: List[TimeNameTypeInterpolation] = []
+        result: List[FCurveKeyframes] = []
         channelbag = anim_utils.action_get_channelbag_for_slot(action, slot)
         if channelbag is None:
             return result
         for fcurve in channelbag.fcurves:
-            if fcurve.keyframe_points is None:  # type: ignore
+            keyframe_points = fcurve.keyframe_points
+            if keyframe_points is None:  # type: ignore
                 continue
-            keyframe_owner_bone: tuple[str, TransformationType] | None = None
-            match = re.match(pattern, fcurve.data_path)
-            if match is not None:
-                bone_name = match.group(1)
-                purpose = match.group(2)
-                if purpose == 'location':
-                    keyframe_owner_bone = (bone_name, TransformationType.LOCATION)
-                elif "rotation" in purpose: # rotation_euler, rotation_quaternion
-                    keyframe_owner_bone = (bone_name, TransformationType.ROTATION)
-                elif purpose == 'scale':
-                    keyframe_owner_bone = (bone_name, TransformationType.SCALE)
-            for keyframe_point in fcurve.keyframe_points:
-                # keyframe_point.interpolation can be: 'LINEAR' 'BEZIER' or
-                # 'CONSTANT'
-                if keyframe_owner_bone is not None:
-                    interpolation = InterpolationMode.LINEAR
+            n = len(keyframe_points)
+            co = np.empty(n * 2, dtype=np.float32)
+            keyframe_points.foreach_get('co', co)  # pyright: ignore[reportUnknownMemberType]
+            interpolations = np.full(
+                n, InterpolationMode.LINEAR.value, dtype=np.uint8)
+            try:
+                # The values of keyframe_point.interpolation: 0 - 'CONSTANT',
+                # 1 - 'LINEAR', 2 - 'BEZIER' and the easing modes
+                blender_interpolations = np.empty(n, dtype=np.int32)
+                keyframe_points.foreach_get(  # pyright: ignore[reportUnknownMemberType]
+                    'interpolation', blender_interpolations)
+                interpolations[blender_interpolations == 0] = (
+                    InterpolationMode.STEP.value)
+                interpolations[blender_interpolations == 2] = (
+                    InterpolationMode.SMOOTH.value)
+            except TypeError:
+                # Reading enums with foreach_get isn't supported by all
+                # versions of Blender
+                for i, keyframe_point in enumerate(keyframe_points):
                     if keyframe_point.interpolation == 'CONSTANT':
-                        interpolation = InterpolationMode.STEP
+                        interpolations[i] = InterpolationMode.STEP.value
                     elif keyframe_point.interpolation == 'BEZIER':
-                        interpolation = InterpolationMode.SMOOTH
-                    # Create a properly structured tuple that matches TimeNameTypeInterpolation
-                    bone_name, transform_type = keyframe_owner_bone
-                    result.append(
-                        (keyframe_point.co[0], (bone_name, transform_type, interpolation)))
-                else:
-                    result.append((keyframe_point.co[0], None))
+                        interpolations[i] = InterpolationMode.SMOOTH.value
+            result.append(FCurveKeyframes(
+                co[0::2].astype(np.float64), interpolations,
+                _get_fcurve_owner(fcurve.data_path)))
         return result
 
 
+def _get_bones(object_properties: McblendObjectGroup) -> List[McblendObject]:
+    '''
+    Returns the list of the bones from the group of mcblend objects in the
+    order used for storing them in :class:`PoseTable`.
 
-class PoseBone(NamedTuple):
-    '''Properties of a pose of single bone.'''
-    name: str
+    :param object_properties: group of mcblend objects.
+    '''
+    return [
+        objprop for objprop in object_properties.values()
+        if objprop.mctype == MCObjType.BONE]
+
+class StaticBones(NamedTuple):
+    '''
+    The bones that don't move during the animation (see
+    :func:`get_moving_bones`) and their transformations. The transformations
+    are copied to every pose instead of sampling them.
+    '''
+    mask: npt.NDArray[np.bool_]
+    '''Whether the bone is static, in the order of the bones of the table.'''
     location: NumpyTable
+    '''The locations of the bones with shape (bones, 3).'''
     rotation: NumpyTable
+    '''The rotations of the bones with shape (bones, 3).'''
     scale: NumpyTable
-    parent_name: Optional[str] = None
-    location_interpolation: InterpolationMode = InterpolationMode.LINEAR
-    rotation_interpolation: InterpolationMode = InterpolationMode.LINEAR
-    scale_interpolation: InterpolationMode = InterpolationMode.LINEAR
-
-class Pose:
-    '''A pose in a frame of animation.'''
-    def __init__(self) -> None:
-        self.pose_bones: Dict[str, PoseBone] = {}
-        '''dict of bones in a pose keyed by the name of the bones'''
-
-    def load_poses(
+    '''The scales of the bones with shape (bones, 3).'''
+
+class PoseTable:
+    '''
+    Poses of the bones from the frames of the animation. The transformations
+    are stored in contiguous arrays with shape (frames, bones, 3) and the
+    interpolation modes in arrays with shape (frames, bones) with the values
+    of :class:`InterpolationMode`.
+
+    :param bone_names: the names of the bones in the order of the arrays.
+    :param parent_names: the names of the parents of the bones (or None).
+    :param dtype: the data type of the arrays with the transformations.
+    '''
+    def __init__(
+            self, bone_names: Sequence[str] = (),
+            parent_names: Sequence[Optional[str]] = (),
+            dtype: type = np.float64):
+        self.bone_names: List[str] = list(bone_names)
+        '''the names of the bones in the order of the arrays'''
+        self.parent_names: List[Optional[str]] = list(parent_names)
+        '''the names of the parents of the bones'''
+        self.bone_indices: Dict[str, int] = {
+            name: i for i, name in enumerate(self.bone_names)}
+        '''the indices of the bones in the arrays keyed by their names'''
+        self.keyframes: List[float] = []
+        '''the keyframes of the poses in order of the arrays'''
+        n = len(self.bone_names)
+        self._location = np.empty((0, n, 3), dtype=dtype)
+        self._rotation = np.empty((0, n, 3), dtype=dtype)
+        self._scale = np.empty((0, n, 3), dtype=dtype)
+        self._location_interpolation = np.empty((0, n), dtype=np.uint8)
+        self._rotation_interpolation = np.empty((0, n), dtype=np.uint8)
+        self._scale_interpolation = np.empty((0, n), dtype=np.uint8)
+
+    @staticmethod
+    def from_object_properties(
+            object_properties: McblendObjectGroup,
+            dtype: type = np.float64) -> PoseTable:
+        '''
+        Creates an empty :class:`PoseTable` for the bones of the group of
+        mcblend objects.
+
+        :param object_properties: group of mcblend objects.
+        :param dtype: the data type of the arrays with the transformations.
+        '''
+        bones = _get_bones(object_properties)
+        return PoseTable(
+            [objprop.obj_name for objprop in bones],
+            [
+                None if objprop.parent is None else objprop.parent.obj_name
+                for objprop in bones
+            ],
+            dtype=dtype)
+
+    def __len__(self) -> int:
+        return len(self.keyframes)
+
+    @property
+    def location(self) -> NumpyTable:
+        '''The locations of the bones with shape (frames, bones, 3).'''
+        return self._location[:len(self)]
+
+    @property
+    def rotation(self) -> NumpyTable:
+        '''The rotations of the bones with shape (frames, bones, 3).'''
+        return self._rotation[:len(self)]
+
+    @property
+    def scale(self) -> NumpyTable:
+        '''The scales of the bones with shape (frames, bones, 3).'''
+        return self._scale[:len(self)]
+
+    @property
+    def location_interpolation(self) -> InterpolationTable:
+        '''The location interpolation modes with shape (frames, bones).'''
+        return self._location_interpolation[:len(self)]
+
+    @property
+    def rotation_interpolation(self) -> InterpolationTable:
+        '''The rotation interpolation modes with shape (frames, bones).'''
+        return self._rotation_interpolation[:len(self)]
+
+    @property
+    def scale_interpolation(self) -> InterpolationTable:
+        '''The scale interpolation modes with shape (frames, bones).'''
+        return self._scale_interpolation[:len(self)]
+
+    def _reserve(self, size: int):
+        '''
+        Makes sure that the arrays can store at least the given number of
+        frames. The capacity of the arrays is doubled when it's too small to
+        avoid reallocation on every added frame.
+        '''
+        capacity = self._location.shape[0]
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 16)
+        def grow(arr: npt.NDArray[Any]) -> npt.NDArray[Any]:
+            result = np.empty((capacity,) + arr.shape[1:], dtype=arr.dtype)
+            result[:len(self)] = arr[:len(self)]
+            return result
+        self._location = grow(self._location)
+        self._rotation = grow(self._rotation)
+        self._scale = grow(self._scale)
+        self._location_interpolation = grow(self._location_interpolation)
+        self._rotation_interpolation = grow(self._rotation_interpolation)
+        self._scale_interpolation = grow(self._scale_interpolation)
+
+    def add_pose(
+            self, keyframe: float, location: NumpyTable, rotation: NumpyTable,
+            scale: NumpyTable,
+            location_interpolation: InterpolationTable | None = None,
+            rotation_interpolation: InterpolationTable | None = None,
+            scale_interpolation: InterpolationTable | None = None):
+        '''
+        Adds a pose to the end of the table.
+
+        :param keyframe: the keyframe of the pose.
+        :param location: the locations of the bones with shape (bones, 3).
+        :param rotation: the rotations of the bones with shape (bones, 3).
+        :param scale: the scales of the bones with shape (bones, 3).
+        :param location_interpolation: optional - the location interpolation
+            modes of the bones (linear by default).
+        :param rotation_interpolation: optional - the rotation interpolation
+            modes of the bones (linear by default).
+        :param scale_interpolation: optional - the scale interpolation modes
+            of the bones (linear by default).
+        '''
+        i = len(self)
+        self._reserve(i + 1)
+        self._location[i] = location
+        self._rotation[i] = rotation
+        self._scale[i] = scale
+        linear = InterpolationMode.LINEAR.value
+        self._location_interpolation[i] = (
+            linear if location_interpolation is None
+            else location_interpolation)
+        self._rotation_interpolation[i] = (
+            linear if rotation_interpolation is None
+            else rotation_interpolation)
+        self._scale_interpolation[i] = (
+            linear if scale_interpolation is None
+            else scale_interpolation)
+        self.keyframes.append(keyframe)
+
+    def truncate(self, size: int):
+        '''
+        Removes the poses from the end of the table, leaving only the given
+        number of poses.
+
+        :param size: the number of the poses to keep.
+        '''
+        del self.keyframes[size:]
+
+    def take(self, indices: npt.NDArray[np.intp]) -> PoseTable:
+        '''
+        Returns a new table with the poses from the given indices (in the
+        order of the indices).
+
+        :param indices: the indices of the poses.
+        '''
+        result = PoseTable(
+            self.bone_names, self.parent_names, dtype=self._location.dtype)
+        result.keyframes = [self.keyframes[i] for i in indices.tolist()]
+        result._location = self.location[indices]
+        result._rotation = self.rotation[indices]
+        result._scale = self.scale[indices]
+        result._location_interpolation = self.location_interpolation[indices]
+        result._rotation_interpolation = self.rotation_interpolation[indices]
+        result._scale_interpolation = self.scale_interpolation[indices]
+        return result
+
+    def load_pose(
             self, object_properties: McblendObjectGroup,
-            bone_states: ObjectKeyframesInfo | None = None,
-            keyframe: float = 0.0):
+            interpolations: Tuple[
+                InterpolationTable, InterpolationTable,
+                InterpolationTable] | None = None,
+            keyframe: float = 0.0,
+            sampler: BulkPoseSampler | None = None,
+            pose_matrices: NumpyTable | None = None,
+            static_bones: StaticBones | None = None):
         '''
-        Builds :class:`Pose` object from object properties.
+        Adds the current pose of the bones from object properties to the
+        table.
 
         :param object_properties: group of mcblend objects.
+        :param interpolations: optional - the values of the location,
+            rotation and scale interpolation modes of the bones (see
+            :meth:`ObjectKeyframesInfo.get_bone_states`). Linear by default.
+        :param keyframe: the keyframe of the pose.
+        :param sampler: optional - the :class:`BulkPoseSampler` created for
+            the object_properties. If provided, the transformations of all
+            of the bones are calculated at once instead of reading them
+            bone by bone.
+        :param pose_matrices: optional - the pose matrices of the armature
+            passed to the sampler instead of using the current pose (see
+            :meth:`BulkPoseSampler.sample`). Requires the sampler.
+        :param static_bones: optional - the bones that don't move during the
+            animation. Their transformations are copied from this object
+            instead of sampling them.
         '''
-        for objprop in object_properties.values():
-            if objprop.mctype == MCObjType.BONE:
+        n = len(self.bone_names)
+        if static_bones is None:
+            locations, rotations, scales = (
+                np.zeros((n, 3)), np.zeros((n, 3)), np.zeros((n, 3)))
+            sampled = np.arange(n)
+        else:
+            locations, rotations, scales = (
+                static_bones.location.copy(), static_bones.rotation.copy(),
+                static_bones.scale.copy())
+            sampled = np.flatnonzero(~static_bones.mask)
+        if sampler is not None:
+            (
+                locations[sampled], rotations[sampled], scales[sampled]
+            ) = sampler.sample(pose_matrices, sampled)
+        else:
+            bones = _get_bones(object_properties)
+            for i in sampled.tolist():
+                objprop = bones[i]
                 # Scale
                 local_matrix = objprop.get_local_matrix(
                     objprop.parent, normalize=False)
-                scale = np.array(local_matrix.to_scale())[[0, 2, 1]]
+                scales[i] = np.array(local_matrix.to_scale())[[0, 2, 1]]
                 # Location
                 location = np.array(local_matrix.to_translation())
-                location = location[[0, 2, 1]] * MINECRAFT_SCALE_FACTOR
+                locations[i] = location[[0, 2, 1]] * MINECRAFT_SCALE_FACTOR
                 # Rotation
-                rotation = objprop.get_mcrotation(objprop.parent)
-                if objprop.parent is not None:
-                    parent_name=objprop.parent.obj_name
-                else:
-                    parent_name=None
-                location_interpolation_mode = InterpolationMode.LINEAR
-                rotation_interpolation_mode = InterpolationMode.LINEAR
-                scale_interpolation_mode = InterpolationMode.LINEAR
-                if bone_states is not None:
-                    location_interpolation_mode = bone_states.get_bone_state(
-                        objprop.obj_name, TransformationType.LOCATION, keyframe)
-                    rotation_interpolation_mode = bone_states.get_bone_state(
-                        objprop.obj_name, TransformationType.ROTATION, keyframe)
-                    scale_interpolation_mode = bone_states.get_bone_state(
-                        objprop.obj_name, TransformationType.SCALE, keyframe)
-                self.pose_bones[objprop.obj_name] = PoseBone(
-                    name=objprop.obj_name, location=location, scale=scale,
-                    rotation=rotation, parent_name=parent_name,
-                    location_interpolation=location_interpolation_mode,
-                    rotation_interpolation=rotation_interpolation_mode,
-                    scale_interpolation=scale_interpolation_mode,
-                )
+                rotations[i] = objprop.get_mcrotation(objprop.parent)
+        location_interpolation = None
+        rotation_interpolation = None
+        scale_interpolation = None
+        if interpolations is not None:
+            location_interpolation, rotation_interpolation, \
+                scale_interpolation = interpolations
+        self.add_pose(
+            keyframe, locations, rotations, scales,
+            location_interpolation, rotation_interpolation,
+            scale_interpolation)
+
+def _matrix_to_mceuler(matrices: NumpyTable) -> NumpyTable:
+    '''
+    Converts an array of 3x3 rotation matrices (shape: (n, 3, 3), with
+    normalized columns) to the Minecraft rotations in degrees. This is a
+    vectorized version of :code:`Matrix.to_euler('XZY')` from mathutils
+    (including the choice between the two possible solutions) followed by
+    the axis conversion used in :meth:`McblendObject.get_mcrotation`.
+
+    :param matrices: the rotation matrices.
+    :returns: array with shape (n, 3) with the rotations.
+    '''
+    # Blender uses column-major matrices, the indices below are already
+    # converted to the row-major notation used by numpy.
+    m = matrices
+    cy = np.hypot(m[:, 0, 0], m[:, 2, 0])
+    # Euler angles in order X, Y, Z (not yet negated)
+    eul1 = np.stack([
+        np.arctan2(m[:, 1, 2], m[:, 1, 1]),
+        np.arctan2(m[:, 2, 0], m[:, 0, 0]),
+        np.arctan2(-m[:, 1, 0], cy)
+    ], axis=1)
+    eul2 = np.stack([
+        np.arctan2(-m[:, 1, 2], -m[:, 1, 1]),
+        np.arctan2(-m[:, 2, 0], -m[:, 0, 0]),
+        np.arctan2(-m[:, 1, 0], -cy)
+    ], axis=1)
+    # Gimbal lock - both solutions are the same
+    locked = cy <= 16.0 * np.finfo(np.float32).eps
+    if np.any(locked):
+        eul1[locked, 0] = np.arctan2(-m[locked, 2, 1], m[locked, 2, 2])
+        eul1[locked, 1] = 0.0
+        eul2[locked] = eul1[locked]
+    # The XZY order has odd parity
+    eul1 = -eul1
+    eul2 = -eul2
+    # Pick the solution with smaller rotations
+    use_eul2 = np.abs(eul1).sum(axis=1) > np.abs(eul2).sum(axis=1)
+    euler = np.where(use_eul2[:, np.newaxis], eul2, eul1)
+    result: NumpyTable = euler[:, [0, 2, 1]] * np.array([1, -1, 1])
+    return result * 180/math.pi
+
+class BulkPoseSampler:
+    '''
+    Samples the poses of all bones from a :class:`McblendObjectGroup` at once.
+    The matrices of the pose bones are read with a single
+    :code:`foreach_get` call and the local transformations of the bones are
+    calculated with NumPy for the whole rig instead of using mathutils for
+    every bone separately.
+
+    The bones with transformations that can't be handled this way (scaled to
+    zero on some axis) are calculated using the same methods as in
+    :meth:`PoseTable.load_pose`.
+
+    :param object_properties: group of mcblend objects.
+    '''
+    def __init__(self, object_properties: McblendObjectGroup):
+        self.bones: List[McblendObject] = _get_bones(object_properties)
+        '''The bones sampled by this object in order of the sampled arrays.'''
+        self.world_origin = object_properties.world_origin
+        self.armature: Optional[Object] = None
+        if len(self.bones) == 0:
+            self.pose_bone_indices = np.zeros(0, dtype=np.int64)
+            self.parent_indices = np.zeros(0, dtype=np.int64)
+            return
+        # All bones of McblendObjectGroup belong to the same armature
+        self.armature = self.bones[0].thisobj
+        pose_bone_indices = {
+            pose_bone.name: i
+            for i, pose_bone in enumerate(self.armature.pose.bones)}
+        bone_indices = {
+            objprop.thisobj_id: i for i, objprop in enumerate(self.bones)}
+        self.pose_bone_indices = np.array([
+            pose_bone_indices[objprop.thisobj_id.bone_name]
+            for objprop in self.bones
+        ], dtype=np.int64)
+        '''Indices of the sampled bones in the armature.pose.bones.'''
+        self.parent_indices = np.array([
+            -1 if objprop.parentobj_id is None
+            or objprop.parentobj_id not in bone_indices
+            else bone_indices[objprop.parentobj_id]
+            for objprop in self.bones
+        ], dtype=np.int64)
+        '''Indices of the parents of the bones in self.bones (or -1).'''
+
+    def get_world_matrices(
+            self, pose_matrices: NumpyTable | None = None,
+            indices: npt.NDArray[np.intp] | None = None) -> NumpyTable:
+        '''
+        Returns the array with shape (n, 4, 4) with the world matrices (the
+        equivalent of :code:`McblendObject.obj_matrix_world`) of the bones.
+
+        :param pose_matrices: optional - the pose matrices of all of the
+            bones of the armature (in order of :code:`armature.pose.bones`)
+            to use instead of the current pose matrices of the armature.
+        :param indices: optional - the indices of the bones (in
+            :code:`self.bones`) to return. All bones by default.
+        '''
+        if indices is None:
+            indices = np.arange(len(self.bones))
+        if self.armature is None:
+            return np.zeros((len(indices), 4, 4))
+        if pose_matrices is None:
+            pose_bones = self.armature.pose.bones
+            buffer = np.empty(len(pose_bones) * 16, dtype=np.float32)
+            pose_bones.foreach_get(
+                'matrix', buffer)  # pyright: ignore[reportArgumentType]
+            # Blender stores the matrices in column-major order
+            pose_matrices = buffer.reshape(-1, 4, 4).transpose(
+                0, 2, 1).astype(np.float64)
+        armature_matrix = np.array(self.armature.matrix_world)
+        if self.world_origin is not None:
+            armature_matrix = (
+                np.array(self.world_origin.matrix_world.inverted()) @
+                armature_matrix)
+        return armature_matrix @ pose_matrices[self.pose_bone_indices[indices]]
+
+    def sample(
+            self, pose_matrices: NumpyTable | None = None,
+            indices: npt.NDArray[np.intp] | None = None
+        ) -> Tuple[NumpyTable, NumpyTable, NumpyTable]:
+        '''
+        Samples the current pose of the bones.
+
+        :param pose_matrices: optional - the pose matrices of all of the
+            bones of the armature (e.g. from :class:`FCurvePoseEvaluator`)
+            to use instead of the current pose of the armature.
+        :param indices: optional - the indices of the bones (in
+            :code:`self.bones`) to sample. Only the world matrices of these
+            bones and their parents are calculated. All bones by default.
+        :returns: three arrays with shape (n, 3) with the locations,
+            rotations and scales of the bones (in the order of
+            :code:`self.bones` or the indices) in the same format as the
+            values stored in :class:`PoseTable`.
+        '''
+        if indices is None:
+            indices = np.arange(len(self.bones))
+        parent_indices = self.parent_indices[indices]
+        has_parent = parent_indices >= 0
+        # The matrices of the sampled bones and their parents
+        required = np.union1d(indices, parent_indices[has_parent])
+        all_world = np.zeros((len(self.bones), 4, 4))
+        all_world[required] = self.get_world_matrices(pose_matrices, required)
+        world = all_world[indices]
+        parent_world = np.where(
+            has_parent[:, np.newaxis, np.newaxis],
+            all_world[parent_indices], np.eye(4))
+        # The same condition as in McblendObject.get_mcrotation
+        epsilon = 0.00001
+        near_zero_scale = np.zeros(len(self.bones), dtype=np.bool_)
+        near_zero_scale[required] = np.any(
+            np.linalg.norm(all_world[required, :3, :3], axis=1) < epsilon,
+            axis=1)
+        fallback = near_zero_scale[indices] | (
+            has_parent & near_zero_scale[parent_indices])
+        vectorized = ~fallback
+
+        local = world.copy()
+        local[vectorized] = (
+            np.linalg.inv(parent_world[vectorized]) @ world[vectorized])
+        local_scale = np.linalg.norm(local[:, :3, :3], axis=1)
+
+        locations = local[:, :3, 3][:, [0, 2, 1]] * MINECRAFT_SCALE_FACTOR
+        scales = local_scale[:, [0, 2, 1]]
+        rotations = np.zeros((len(indices), 3))
+        if np.any(vectorized):
+            rotations[vectorized] = _matrix_to_mceuler(
+                local[vectorized, :3, :3] /
+                local_scale[vectorized, np.newaxis, :])
+        # The same operations as in McblendObject.get_local_matrix and
+        # McblendObject.get_mcrotation
+        for i in np.flatnonzero(fallback):
+            child_matrix = Matrix(world[i].tolist())
+            if has_parent[i]:
+                parent_matrix = Matrix(parent_world[i].tolist())
+                local_matrix = parent_matrix.inverted_safe() @ child_matrix
+                euler = get_local_rotation(child_matrix, parent_matrix)
+            else:
+                local_matrix = child_matrix
+                euler = child_matrix.to_euler('XZY')
+            scales[i] = np.array(local_matrix.to_scale())[[0, 2, 1]]
+            locations[i] = np.array(
+                local_matrix.to_translation())[[0, 2, 1]] * MINECRAFT_SCALE_FACTOR
+            rotations[i] = np.array(
+                euler)[[0, 2, 1]] * np.array([1, -1, 1]) * 180/math.pi
+        return locations, rotations, scales
+
+def _get_linear_deviation(
+        poses: PoseTable, start: int, end: int, sample: int) -> float:
+    '''
+    Returns the largest deviation of a sampled pose from the linear
+    interpolation between two other poses from the same table. The
+    positions are measured in Minecraft units, the rotations in degrees
+    (both euler solutions of the sampled rotation are checked) and the
+    scales in percents. The transformations with step interpolation at the
+    start pose are ignored because they don't change until the end pose.
+
+    :param poses: the table with the poses.
+    :param start: the index of the pose at the start of the interpolation.
+    :param end: the index of the pose at the end of the interpolation.
+    :param sample: the index of the sampled pose (between the start and the
+        end).
+    :returns: the largest deviation.
+    '''
+    keyframes = poses.keyframes
+    factor = (
+        (keyframes[sample] - keyframes[start]) /
+        (keyframes[end] - keyframes[start]))
+    step = InterpolationMode.STEP.value
+
+    def lerp(values: NumpyTable) -> NumpyTable:
+        return values[start] + (values[end] - values[start]) * factor
+
+    deviations: List[NumpyTable] = []
+    # Position
+    deviation = np.abs(poses.location[sample] - lerp(poses.location))
+    deviations.append(
+        deviation[poses.location_interpolation[start] != step])
+    # Rotation
+    rotation = poses.rotation
+    end_rotation = rotation[end] - 360.0 * _wrap_rotation_offsets(
+        rotation[end] - rotation[start])
+    expected = rotation[start] + (end_rotation - rotation[start]) * factor
+    sampled = rotation[sample]
+    rotation_deviation = np.full(len(sampled), np.inf)
+    for solution in (
+            sampled, (sampled + 180.0) * np.array([1, -1, 1])):
+        difference = solution - expected
+        difference -= 360.0 * _wrap_rotation_offsets(difference)
+        rotation_deviation = np.minimum(
+            rotation_deviation, np.abs(difference).max(axis=1))
+    deviations.append(
+        rotation_deviation[poses.rotation_interpolation[start] != step])
+    # Scale
+    deviation = np.abs(poses.scale[sample] - lerp(poses.scale)) * 100.0
+    deviations.append(deviation[poses.scale_interpolation[start] != step])
+    return max((float(d.max()) for d in deviations if d.size > 0), default=0.0)
+
+def get_animation_file_dict(
+        old_json: Optional[Dict[str, Any]]=None) -> Dict[str, Any]:
+    '''
+    Returns the JSON dict of the animation file to write the exported
+    animations into. If the old_json is a valid animation file it's
+    returned, otherwise a new, empty animation file is created.
+
+    :param old_json: The original animation file to write into.
+    :returns: JSON dict with Minecraft animation file.
+    '''
+    result: Dict[str, Any] = {"format_version": "1.8.0", "animations": {}}
+    try:
+        if isinstance(old_json['animations'], dict):  # type: ignore
+            result = old_json  # type: ignore
+    except (TypeError, LookupError):
+        pass
+    return result
 
 @dataclass
 class AnimationExport:
@@ -434,16 +1064,38 @@ class AnimationExport:
     :param fps: The FPS setting of the scene.
     :param effect_events: The events of the animation from
         MCBLEND_EventProperties.
-    :param original_pose: Optional - the base pose of the animated object.
-        The pose is empty by default after object creation until it's loaded.
+    :param original_pose: Optional - the base pose of the animated object
+        (a :class:`PoseTable` with a single pose). The table is empty by
+        default after object creation until it's loaded.
     :param single_frame: Optional - whether the animation should be exported as
         a single frame pose (True) or as whole animation. False by default.
-    :param poses: Optional - poses of the animation (keyframes) keyed by the
-        number of the frame. This dictionary is empty by default after the
-        creation and it gets populated on loading the poses.
+    :param poses: Optional - :class:`PoseTable` with the poses of the
+        animation (keyframes) in the order of the frames. This table is empty
+        by default after the creation and it gets populated on loading the
+        poses.
     :param forced_interpolation: Optional - force all keyframes to use a specific
         interpolation mode: InterpolationMode.LINEAR, InterpolationMode.SMOOTH,
         InterpolationMode.STEP, or InterpolationMode.AUTO (default).
+    :param bulk_pose_sampling: Optional - whether the poses should be sampled
+        with :class:`BulkPoseSampler` (all bones at once) instead of reading
+        the transformations bone by bone. False by default.
+    :param adaptive_sampling_error: Optional - the maximum deviation of the
+        sampled poses from the linear interpolation of their neighbors (see
+        :func:`_get_linear_deviation`). If greater than 0, additional
+        subframes are sampled between the keyframes where the deviation is
+        larger. 0 by default (disabled).
+    :param adaptive_sampling_min_step: Optional - the smallest distance
+        between the frames added by the adaptive sampling. 0.25 by default.
+    :param static_bones: Optional - the :class:`StaticBones` which don't
+        move during the animation. The table is created on loading the poses.
+        The transformations of these bones aren't sampled and the bones are
+        skipped in the exported animation if it skips the rest poses. None
+        by default (all bones are sampled).
+    :param optimizer: Optional - the :class:`AnimationOptimizer` used for
+        removing the keyframes that can be interpolated from their neighbors.
+        The keyframes are reduced on the arrays with the values of the
+        channels, before creating their JSON dicts. None by default (no
+        optimization).
     '''
     name: str
     length: float
@@ -452,89 +1104,183 @@ class AnimationExport:
     override_previous_animation: bool
     fps: float
     effect_events: Dict[str, Tuple[List[Dict[Any, Any]], List[Dict[Any, Any]]]]
-    original_pose: Pose = field(default_factory=Pose)
+    original_pose: PoseTable = field(default_factory=PoseTable)
     single_frame: bool = field(default_factory=bool)  # bool() = False
-    poses: Dict[float, Pose] = field(default_factory=dict)
+    poses: PoseTable = field(default_factory=PoseTable)
     sound_effects: Dict[int, List[Dict[Any, Any]]] = field(default_factory=dict)
     particle_effects: Dict[int, List[Dict[Any, Any]]] = field(default_factory=dict)
     forced_interpolation: InterpolationMode = field(
         default=InterpolationMode.AUTO)
     warnings: List[str] = field(default_factory=list)
     frame_slice_pattern: str = field(default="")
+    bulk_pose_sampling: bool = field(default_factory=bool)  # bool() = False
+    adaptive_sampling_error: float = 0.0
+    adaptive_sampling_min_step: float = 0.25
+    static_bones: Optional[StaticBones] = None
+    optimizer: Optional[AnimationOptimizer] = None
 
     def load_poses_and_bone_states(
             self, object_properties: McblendObjectGroup,
             context: Context
         ):
         '''
-        Populates the poses dictionary of this object.
+        Populates the poses table of this object.
 
         :param object_properties: group of mcblend objects.
         :param context: the context of running the operator.
         '''
-        original_frame = context.scene.frame_current
-        bpy.ops.screen.animation_cancel()  # pyright: ignore[reportUnknownMemberType]
-        try:
-            context.scene.frame_set(0)
-            self.original_pose.load_poses(object_properties)
-            if self.single_frame:
-                context.scene.frame_set(original_frame)
-                pose = Pose()
-                keyframe = float(original_frame)
-                pose.load_poses(object_properties)
-
-                # The frame value in the dictionary key doesn't really matter
-                self.poses[keyframe] = pose
-            else:
-                # Add frames from frame slice pattern
-                frame_start = context.scene.frame_start
-                frame_end = context.scene.frame_end
-                extra_frames: set[int] = set()
-                if self.frame_slice_pattern != "":
-                    extra_frames, range_counts = get_frames_from_frame_ranges(
-                        self.frame_slice_pattern, frame_start, frame_end)
-                    for range_str, count in range_counts.items():
-                        if count == 0:
-                            self.warnings.append(
-                                f"Frame range '{range_str}' did not add any "
-                                "frames to the animation."
-                            )
-                bone_states = ObjectKeyframesInfo(
-                    context.object,
-                    forced_interpolation=self.forced_interpolation,
-                    extra_frames=extra_frames
-                )
-                for keyframe in sorted(bone_states.keyframes):
-                    if (
-                        keyframe < frame_start or
-                        keyframe > frame_end
-                    ):
-                        continue  # skip frames out of range
-
-                    # Converting to float before divmod() operation is because
-                    # divmod() behaves differently for Decimal and float for
-                    # negative numbers:
-                    # divmod(Decimal(-4.5), 1) -> (Decimal(-4), Decimal(-0.5))
-                    # divmod(-4.5, 1) -> (5, -0.5)
-                    float_keyframe = float(keyframe)
-                    frame, subframe = divmod(float_keyframe, 1)
-                    context.scene.frame_set(int(frame), subframe=subframe)
-                    curr_pose = Pose()
-
-                    curr_pose.load_poses(
-                        object_properties, bone_states, keyframe)
-                    self.poses[keyframe] = curr_pose
-                # Load sound effects and particle effects
-                for timeline_marker in context.scene.timeline_markers:
-                    if timeline_marker.name not in self.effect_events:
-                        continue
-                    sound, particle = self.effect_events[timeline_marker.name]
-                    if len(sound) > 0:
-                        self.sound_effects[timeline_marker.frame] = sound
-                    if len(particle) > 0:
-                        self.particle_effects[timeline_marker.frame] = particle
-        finally:
-            context.scene.frame_set(original_frame)
+        load_poses_of_animations([(self, object_properties)], context)
+
+    def _get_keyframes(
+            self, armature: Object | None, bone_names: Sequence[str],
+            context: Context) -> Tuple[List[float], Tuple[
+                InterpolationTable, InterpolationTable, InterpolationTable]]:
+        '''
+        Returns the keyframes of the animation of the armature (from the
+        F-curves and the frame slice pattern, within the frame range of the
+        scene) and the interpolation modes of the bones at these keyframes.
+
+        :param armature: the animated armature.
+        :param bone_names: the names of the bones in the order of the
+            poses table.
+        :param context: the context of running the operator.
+        :returns: the sorted keyframes and the location, rotation and scale
+            interpolation modes with shape (keyframes, bones).
+        '''
+        # Add frames from frame slice pattern
+        frame_start = context.scene.frame_start
+        frame_end = context.scene.frame_end
+        extra_frames: set[int] = set()
+        if self.frame_slice_pattern != "":
+            extra_frames, range_counts = get_frames_from_frame_ranges(
+                self.frame_slice_pattern, frame_start, frame_end)
+            for range_str, count in range_counts.items():
+                if count == 0:
+                    self.warnings.append(
+                        f"Frame range '{range_str}' did not add any "
+                        "frames to the animation."
+                    )
+        with profile_stage('load_keyframes'):
+            bone_states = ObjectKeyframesInfo(
+                armature,
+                forced_interpolation=self.forced_interpolation,
+                extra_frames=extra_frames
+            )
+        # Skip frames out of range
+        keyframes = [
+            keyframe for keyframe in sorted(bone_states.keyframes)
+            if frame_start <= keyframe <= frame_end]
+        # The interpolation modes of all of the poses, with shape
+        # (keyframes, bones) for every transformation type
+        location_states, rotation_states, scale_states = (
+            bone_states.get_bone_states(
+                bone_names, transformation_type, keyframes)
+            for transformation_type in (
+                TransformationType.LOCATION,
+                TransformationType.ROTATION,
+                TransformationType.SCALE)
+        )
+        return keyframes, (location_states, rotation_states, scale_states)
+
+    def _load_effects(self, context: Context):
+        '''
+        Loads the sound effects and the particle effects of the animation
+        from the timeline markers of the scene.
+        '''
+        for timeline_marker in context.scene.timeline_markers:
+            if timeline_marker.name not in self.effect_events:
+                continue
+            sound, particle = self.effect_events[timeline_marker.name]
+            if len(sound) > 0:
+                self.sound_effects[timeline_marker.frame] = sound
+            if len(particle) > 0:
+                self.particle_effects[timeline_marker.frame] = particle
+
+    def _get_static_bones(
+            self, object_properties: McblendObjectGroup,
+            armature: Object | None) -> Optional[StaticBones]:
+        '''
+        Returns the :class:`StaticBones` with the bones that don't move
+        during the animation (see :func:`get_moving_bones`) and their
+        transformations from the original pose. Returns None if all of the
+        bones can move or if the animation can't be analyzed.
+
+        :param object_properties: group of mcblend objects.
+        :param armature: the animated armature.
+        '''
+        if armature is None or armature.type != 'ARMATURE':
+            return None
+        moving_bones = get_moving_bones(
+            armature, object_properties.world_origin == armature)
+        if moving_bones is None:
+            return None
+        mask = np.array([
+            objprop.thisobj_id.bone_name not in moving_bones
+            for objprop in _get_bones(object_properties)
+        ], dtype=np.bool_)
+        if not np.any(mask):
+            return None
+        return StaticBones(
+            mask, self.original_pose.location[0],
+            self.original_pose.rotation[0], self.original_pose.scale[0])
+
+    def _sample_adaptively(
+            self,
+            load_pose: Callable[[float, Tuple[
+                InterpolationTable, InterpolationTable, InterpolationTable]],
+                None]):
+        '''
+        Adds the poses from the subframes between the loaded poses, where
+        the animation deviates from the linear interpolation by more than
+        the :code:`adaptive_sampling_error`.
+
+        Every space between two neighboring poses is tested with two
+        samples (at 1/3 and 2/3 of its length; a single sample from the
+        middle would miss the symmetric motions like the ease in and out).
+        If any of them deviates too much, both are kept and all three new
+        spaces are tested the same way. The splitting stops when the
+        samples would be closer than :code:`adaptive_sampling_min_step` or
+        would share the timestamp with their neighbors.
+
+        :param load_pose: a function that samples the pose at the given
+            frame and adds it to the end of the poses table with the given
+            interpolation modes.
+        '''
+        spaces = [(i, i + 1) for i in range(len(self.poses) - 1)]
+        while len(spaces) > 0:
+            start, end = spaces.pop()
+            start_frame = self.poses.keyframes[start]
+            end_frame = self.poses.keyframes[end]
+            step = (end_frame - start_frame) / 3
+            if step < self.adaptive_sampling_min_step:
+                continue
+            probes = (start_frame + step, end_frame - step)
+            timestamps = [
+                frame_to_t(frame, self.fps)
+                for frame in (start_frame, *probes, end_frame)]
+            if len(set(timestamps)) != len(timestamps):
+                continue
+            # The samples continue the interpolation of the start pose
+            interpolations = (
+                self.poses.location_interpolation[start].copy(),
+                self.poses.rotation_interpolation[start].copy(),
+                self.poses.scale_interpolation[start].copy())
+            size = len(self.poses)
+            for frame in probes:
+                load_pose(frame, interpolations)
+            samples = (size, size + 1)
+            if all(
+                    _get_linear_deviation(self.poses, start, end, sample) <=
+                    self.adaptive_sampling_error
+                    for sample in samples):
+                self.poses.truncate(size)
+                continue
+            spaces.append((start, samples[0]))
+            spaces.append((samples[0], samples[1]))
+            spaces.append((samples[1], end))
+        order = np.argsort(
+            np.array(self.poses.keyframes, dtype=np.float64), kind='stable')
+        self.poses = self.poses.take(order)
 
     def json(
             self, old_json: Optional[Dict[str, Any]]=None,
@@ -550,16 +1296,21 @@ class AnimationExport:
         :returns: JSON dict with Minecraft animation.
         '''
         # Create result dict
-        result: Dict[str, Any] = {"format_version": "1.8.0", "animations": {}}
-        try:
-            if isinstance(old_json['animations'], dict):  # type: ignore
-                result = old_json  # type: ignore
-        except (TypeError, LookupError):
-            pass
+        result = get_animation_file_dict(old_json)
+        timestamps = self._get_timestamps()
+        times = [timestamps[key_frame] for key_frame in self.poses.keyframes]
+        # The times parsed back from the timestamps are used by the optimizer
+        time_values = np.array([float(t) for t in times])
 
         bones: Dict[str, Dict[str, Any]] = {}
-        for bone_name in self.original_pose.pose_bones:
-            bone = self._json_bone(bone_name, skip_rest_poses)
+        for i, bone_name in enumerate(self.original_pose.bone_names):
+            if (
+                    skip_rest_poses and self.static_bones is not None and
+                    self.static_bones.mask[i]):
+                continue  # Always in the original pose
+            with profile_stage('json_bone'):
+                bone = self._json_bone(
+                    bone_name, skip_rest_poses, times, time_values)
             if bone != {}:  # Nothing to export
                 bones[bone_name] = bone
 
@@ -580,14 +1331,14 @@ class AnimationExport:
             if len(self.particle_effects) > 0:
                 particle_effects = {}
                 for key_frame, value in self.particle_effects.items():
-                    particle_effects[frame_to_t(key_frame, self.fps)] = value
+                    particle_effects[timestamps[key_frame]] = value
                 result["animations"][f"animation.{self.name}"][
                     'particle_effects'] = particle_effects
 
             if len(self.sound_effects) > 0:
                 sound_effects = {}
                 for key_frame, value in self.sound_effects.items():
-                    sound_effects[frame_to_t(key_frame, self.fps)] = value
+                    sound_effects[timestamps[key_frame]] = value
                 result["animations"][f"animation.{self.name}"][
                     'sound_effects'] = sound_effects
 
@@ -604,139 +1355,219 @@ class AnimationExport:
                 data['override_previous_animation'] = True
         return result
 
+    def _get_timestamps(self) -> Dict[float, str]:
+        '''
+        Returns a dictionary that maps the frames of the poses and the
+        effects of the animation to the timestamps used in the JSON file
+        (see :func:`frame_to_t`). Creating the timestamps is slow and the same
+        frames are used by all of the bones, so the table is created once
+        per export.
+        '''
+        timestamps: Dict[float, str] = {}
+        for frame in chain(
+                self.poses.keyframes, self.sound_effects,
+                self.particle_effects):
+            if frame not in timestamps:
+                timestamps[frame] = frame_to_t(frame, self.fps)
+        return timestamps
+
     def _json_bone(
-            self, bone_name: str, skip_rest_pose: bool) -> Dict[str, Any]:
+            self, bone_name: str, skip_rest_pose: bool, times: List[str],
+            time_values: NumpyTable) -> Dict[str, Any]:
         '''
         Returns optimized JSON dict with an animation of single bone.
 
         :param bone_name: the name of the bone.
         :param skip_rest_pose: whether the properties of the bone being in
             its rest pose should be skipped.
+        :param times: the timestamps of the poses (see
+            :meth:`_get_timestamps`).
+        :param time_values: the timestamps of the poses converted to floats.
         :returns: the part of animation with animation of a single bone.
         '''
-        # Slightly modified PoseBone useful in this context.
-        class _PoseData(NamedTuple):
-            time: str
-            location: List[float]
-            scale: List[float]
-            rotation: List[float]
-            location_interpolation: InterpolationMode
-            rotation_interpolation: InterpolationMode
-            scale_interpolation: InterpolationMode
-
-        poses: List[_PoseData] = []
-        prev_bone_rotation = np.zeros(3)
-
-        # Get relative PoseBone with minimized rotation
-        original_pose_bone = self.original_pose.pose_bones[bone_name]
-        parent_name = original_pose_bone.parent_name
+        # Get relative transformations with minimized rotation
+        bone_index = self.original_pose.bone_indices[bone_name]
+        original_location = self.original_pose.location[0, bone_index]
+        original_rotation = self.original_pose.rotation[0, bone_index]
+        original_scale = self.original_pose.scale[0, bone_index]
+        parent_name = self.original_pose.parent_names[bone_index]
         # Get original parent scale. Scaling the location with original
         # parent scale allows to have issue #71 fixed and also being able
         # to use scale in animations (issue #76) which was impossible to do
         # after commit 19ef865943da7fde039bba7b7f50d1fa69a140b6 (the one
         # which closed issue #71).
-        if parent_name in self.original_pose.pose_bones:
-            original_parent_pose_bone = self.original_pose.pose_bones[
-                parent_name]
-            original_parent_pose_bone_scale = original_parent_pose_bone.scale
+        if parent_name in self.original_pose.bone_indices:
+            original_parent_pose_bone_scale = self.original_pose.scale[
+                0, self.original_pose.bone_indices[parent_name]]
         else:
             original_parent_pose_bone_scale = np.ones(3)
-    
-        for key_frame, pose in self.poses.items():
-            pose_bone = pose.pose_bones[bone_name]
-            # Relative transformations to the original pose
-            location = pose_bone.location - original_pose_bone.location
-            rotation = pose_bone.rotation - original_pose_bone.rotation
-            scale = pose_bone.scale / original_pose_bone.scale
-
-            # Magic
-            location = location * original_parent_pose_bone_scale
-            rotation=_pick_closest_rotation(
-                rotation, prev_bone_rotation, original_pose_bone.rotation)
-            poses.append(
-                _PoseData(
-                    time=frame_to_t(key_frame, self.fps),
-                    location=get_vect_json(location),
-                    scale=get_vect_json(scale),
-                    rotation=get_vect_json(rotation),
-                    location_interpolation=pose_bone.location_interpolation,
-                    rotation_interpolation=pose_bone.rotation_interpolation,
-                    scale_interpolation=pose_bone.scale_interpolation,
-                )
-            )
-            # Update prev pose
-            prev_bone_rotation = rotation
+
+        # Relative transformations to the original pose
+        locations = self.poses.location[:, bone_index] - original_location
+        rotations = self.poses.rotation[:, bone_index] - original_rotation
+        scales = self.poses.scale[:, bone_index] / original_scale
+        # Magic
+        locations = locations * original_parent_pose_bone_scale
+        location_interpolations = self.poses.location_interpolation[
+            :, bone_index]
+        rotation_interpolations = self.poses.rotation_interpolation[
+            :, bone_index]
+        scale_interpolations = self.poses.scale_interpolation[:, bone_index]
+        rotations = _pick_closest_rotations(rotations, original_rotation)
 
         # No data export
-        if not poses:  # If empty return empty animation
+        if len(self.poses) == 0:  # If empty return empty animation
             return {'position': {}, 'rotation': {}, 'scale': {}}
-        
+
+        # The values are compared after rounding to the exported precision
+        # (the same as rounding in get_vect_json)
+        channels: Tuple[Tuple[
+                timeline_type, NumpyTable, InterpolationTable, float], ...] = (
+            ('position', np.round(locations, 3), location_interpolations,
+                0.0),
+            ('rotation', np.round(rotations, 3), rotation_interpolations,
+                0.0),
+            ('scale', np.round(scales, 3), scale_interpolations, 1.0),
+        )
         # Single frame pose export
         if self.single_frame:  # Returning single frame pose is easier
             result: Dict[str, Any] = {}
-            loc, rot, scl = poses[0].location, poses[0].rotation, poses[0].scale
-            # Filter rest pose positions
-            if loc != [0, 0, 0] or not skip_rest_pose:
-                result['position'] = poses[0].location
-            if rot != [0, 0, 0] or not skip_rest_pose:
-                result['rotation'] = poses[0].rotation
-            if scl != [1, 1, 1] or not skip_rest_pose:
-                result['scale'] = poses[0].scale
+            for channel_name, values, _, rest_value in channels:
+                # Filter rest pose positions
+                if not skip_rest_pose or np.any(values[0] != rest_value):
+                    result[channel_name] = get_vect_json(values[0].tolist())
             return result
-        bone: Dict[str, Any] = {  # dictionary populated with 0 timestamp frame
-            'position': {poses[0].time: poses[0].location},
-            'rotation': {poses[0].time: poses[0].rotation},
-            'scale': {poses[0].time: poses[0].scale},
-        }
-
-        # Iterate in threes (previous, current , next) remove unnecessary items
-        prev_iter, curr_iter, next_iter = tee(poses, 3)
-        iterator = zip(
-            prev_iter, islice(curr_iter, 1, None), islice(next_iter, 2, None))
-        for p, c, n in iterator:  # previous, current, next
-            if not (p.scale == c.scale == n.scale):
-                bone['scale'][c.time] = self._get_keyframe_json(
-                    p.scale, c.scale, n.scale,
-                    p.scale_interpolation,
-                    c.scale_interpolation)
-            if not (p.location == c.location == n.location):
-                bone['position'][c.time] = self._get_keyframe_json(
-                    p.location, c.location, n.location,
-                    p.location_interpolation,
-                    c.location_interpolation)
-            if not (p.rotation == c.rotation == n.rotation):
-                bone['rotation'][c.time] = self._get_keyframe_json(
-                    p.rotation, c.rotation, n.rotation,
-                    p.rotation_interpolation,
-                    c.rotation_interpolation)
-
-        # Add last element unless there is only one (in which case it's already
-        # added)
-        if len(poses) > 1:
-            bone['rotation'][poses[-1].time] = poses[-1].rotation
-            bone['position'][poses[-1].time] = poses[-1].location
-            bone['scale'][poses[-1].time] = poses[-1].scale
-        # Filter rest pose positions
-        if skip_rest_pose:
-            for v in bone['position'].values():
-                if v != [0, 0, 0]:
-                    break  # found non-rest pose item
-            else:  # this is rest pose
-                del bone['position']
-
-            for v in bone['rotation'].values():
-                if v != [0, 0, 0]:
-                    break  # found non-rest pose item
-            else:  # this is rest pose
-                del bone['rotation']
-
-            for v in bone['scale'].values():
-                if v != [1, 1, 1]:
-                    break  # found non-rest pose item
-            else:  # this is rest pose
-                del bone['scale']
+
+        # Keyframes with the same timestamps overwrite each other in the
+        # JSON dict
+        has_duplicate_times = bool(np.any(np.diff(time_values) == 0))
+        bone: Dict[str, Any] = {}
+        for channel_name, values, interpolations, rest_value in channels:
+            # Filter rest pose positions
+            if skip_rest_pose and np.all(values == rest_value):
+                continue
+            bone[channel_name] = self._json_channel(
+                bone_name, channel_name, values, interpolations, times,
+                None if has_duplicate_times else time_values)
+            if not has_duplicate_times or not isinstance(
+                    bone[channel_name], dict):
+                continue
+            timeline: Dict[str, Any] = bone[channel_name]
+            first = next(iter(timeline.values()))
+            if skip_rest_pose and all(
+                    v == [rest_value] * 3 for v in timeline.values()):
+                del bone[channel_name]
+            elif self.optimizer is not None:
+                # The overwritten keyframes can't be optimized as arrays
+                self.optimizer.optimize_bone_timeline(
+                    bone, channel_name, bone_name)
+            elif isinstance(first, list) and all(
+                    v == first for v in timeline.values()):
+                bone[channel_name] = first
         return bone
 
+    def _json_channel(
+            self, bone_name: str, channel_name: timeline_type,
+            values: NumpyTable,
+            interpolations: InterpolationTable, times: List[str],
+            time_values: Optional[NumpyTable]) -> Any:
+        '''
+        Returns the JSON dict with the keyframes of a single channel
+        (position, rotation or scale) of a bone. The keyframes between two
+        keyframes with the same value are skipped. If the animation has an
+        optimizer, the keyframes are reduced before creating the JSON dict.
+        Constant channels (within the error margin of the optimizer) are
+        exported as static values instead of dicts.
+
+        :param bone_name: the name of the bone.
+        :param channel_name: the name of the channel.
+        :param values: the values of the channel rounded to the exported
+            precision, an array with shape (n, 3).
+        :param interpolations: the interpolation modes of the keyframes.
+        :param times: the timestamps of the keyframes.
+        :param time_values: the timestamps converted to floats or None if
+            the keyframes shouldn't be reduced by the optimizer.
+        :returns: dictionary that maps the timestamps to the keyframes or
+            the static value of the channel.
+        '''
+        if np.all(values == values[0]):
+            return get_vect_json(values[0].tolist())
+        if self.optimizer is not None and time_values is not None:
+            catmullrom = np.zeros(len(values), dtype=np.bool_)
+            if self.optimizer.is_static(
+                    channel_name,
+                    Keyframes(time_values, values, values, catmullrom),
+                    bone_name):
+                return get_vect_json(values[0].tolist())
+        # Whether the keyframe has the same value as the next one
+        same_as_next = np.all(values[:-1] == values[1:], axis=1)
+        # The first and the last keyframes are always exported
+        exported = np.ones(len(values), dtype=np.bool_)
+        exported[1:-1] = ~(same_as_next[:-1] & same_as_next[1:])
+        exported_indices = np.flatnonzero(exported)
+        if (
+                self.optimizer is not None and time_values is not None and
+                len(exported_indices) >= 3):
+            exported_indices = self._reduce_keyframes(
+                bone_name, channel_name, values, interpolations, time_values,
+                exported_indices)
+        indices = exported_indices.tolist()
+
+        rows = values.tolist()
+        interpolations_list = interpolations.tolist()
+        result: Dict[str, Any] = {times[0]: get_vect_json(rows[0])}
+        for i in indices[1:-1]:
+            result[times[i]] = self._get_keyframe_json(
+                get_vect_json(rows[i-1]), get_vect_json(rows[i]),
+                get_vect_json(rows[i+1]),
+                InterpolationMode(interpolations_list[i-1]),
+                InterpolationMode(interpolations_list[i]))
+        # Add last element unless there is only one (in which case it's
+        # already added)
+        if len(rows) > 1:
+            result[times[-1]] = get_vect_json(rows[-1])
+        return result
+
+    def _reduce_keyframes(
+            self, bone_name: str, channel_name: timeline_type,
+            values: NumpyTable,
+            interpolations: InterpolationTable, time_values: NumpyTable,
+            indices: npt.NDArray[np.intp]) -> npt.NDArray[np.intp]:
+        '''
+        Returns the indices of the keyframes of a channel kept by the
+        optimizer. The optimizer sees the same curve as it would see in the
+        JSON dict of the channel.
+
+        :param bone_name: the name of the bone.
+        :param channel_name: the name of the channel.
+        :param values: the rounded values of the channel.
+        :param interpolations: the interpolation modes of the keyframes.
+        :param time_values: the timestamps of the keyframes converted to
+            floats.
+        :param indices: the indices of the keyframes exported to the JSON
+            dict.
+        :returns: the subset of the indices.
+        '''
+        assert self.optimizer is not None
+        # The "pre" and "post" values and the lerp modes of the keyframes
+        # exported as dicts (see _get_keyframe_json)
+        middle = indices[1:-1]
+        after_step = np.zeros(len(indices), dtype=np.bool_)
+        after_step[1:-1] = (
+            interpolations[middle - 1] == InterpolationMode.STEP.value)
+        catmullrom = np.zeros(len(indices), dtype=np.bool_)
+        catmullrom[1:-1] = (
+            ~after_step[1:-1] &
+            (interpolations[middle] == InterpolationMode.SMOOTH.value))
+        post = values[indices]
+        pre = post.copy()
+        pre[after_step] = values[indices[after_step] - 1]
+        keyframes = Keyframes(time_values[indices], pre, post, catmullrom)
+        with profile_stage('reduce_keyframes'):
+            kept = self.optimizer.reduce_keyframes(
+                channel_name, keyframes, bone_name)
+        return indices[kept]
+
     def _get_keyframe_json(
             self,
             previous_value: list[float],
@@ -772,3 +1603,175 @@ class AnimationExport:
         Yields warnings collected during the animation export process.
         '''
         yield from self.warnings
+
+class _PoseLoader:
+    '''
+    Loads the poses of a single :class:`AnimationExport` during the export
+    of one or more animations (see :func:`load_poses_of_animations`).
+
+    :param animation: the animation.
+    :param object_properties: group of mcblend objects of the animated
+        armature.
+    :param context: the context of running the operator.
+    '''
+    def __init__(
+            self, animation: AnimationExport,
+            object_properties: McblendObjectGroup, context: Context):
+        self.animation = animation
+        self.object_properties = object_properties
+        bones = _get_bones(object_properties)
+        self.armature: Optional[Object] = (
+            bones[0].thisobj if len(bones) > 0 else context.object)
+        '''The animated armature.'''
+        self.sampler: Optional[BulkPoseSampler] = None
+        self.evaluator: Optional[FCurvePoseEvaluator] = None
+        if animation.bulk_pose_sampling:
+            self.sampler = BulkPoseSampler(object_properties)
+            if self.sampler.armature is not None:
+                # None if the rig is too complex to evaluate its F-curves
+                # directly
+                self.evaluator = FCurvePoseEvaluator.create(
+                    self.sampler.armature, context.scene)
+        self.keyframes: List[float] = []
+        '''The keyframes of the poses of the animation.'''
+        self.interpolations: Optional[Tuple[
+            InterpolationTable, InterpolationTable, InterpolationTable]] = None
+        '''
+        The interpolation modes of the bones at the keyframes with shape
+        (keyframes, bones) or None for the single frame animations.
+        '''
+        animation.original_pose = PoseTable.from_object_properties(
+            object_properties)
+        animation.poses = PoseTable.from_object_properties(object_properties)
+
+    def get_pose_matrices(self, frame: float) -> NumpyTable | None:
+        '''
+        Evaluates the pose matrices of the armature at the given frame if
+        possible (the result is passed to the sampler). Returns None if the
+        pose must be read from the scene after setting its frame.
+        '''
+        if self.evaluator is None:
+            return None
+        with profile_stage('frame_set'):
+            return self.evaluator.evaluate(frame)
+
+    def load_pose(
+            self, table: PoseTable, keyframe: float,
+            interpolations: Optional[Tuple[
+                InterpolationTable, InterpolationTable,
+                InterpolationTable]] = None,
+            frame: Optional[float] = None):
+        '''
+        Adds the pose of the armature to the table. The frame of the scene
+        must be already set (unless the pose is evaluated from the
+        F-curves).
+
+        :param table: the table to add the pose to.
+        :param keyframe: the keyframe of the pose.
+        :param interpolations: optional - the interpolation modes of the
+            bones.
+        :param frame: optional - the frame of the scene. Same as the keyframe
+            by default.
+        '''
+        pose_matrices = self.get_pose_matrices(
+            float(keyframe) if frame is None else frame)
+        with profile_stage('load_pose'):
+            table.load_pose(
+                self.object_properties, interpolations, keyframe,
+                sampler=self.sampler, pose_matrices=pose_matrices,
+                static_bones=self.animation.static_bones)
+
+def _set_scene_frame(
+        loaders: Sequence[_PoseLoader], keyframe: float, context: Context):
+    '''
+    Sets the frame of the scene to the keyframe (including the subframe)
+    unless all of the loaders evaluate the poses from the F-curves.
+    '''
+    if all(loader.evaluator is not None for loader in loaders):
+        return
+    # Converting to float before divmod() operation is because
+    # divmod() behaves differently for Decimal and float for
+    # negative numbers:
+    # divmod(Decimal(-4.5), 1) -> (Decimal(-4), Decimal(-0.5))
+    # divmod(-4.5, 1) -> (5, -0.5)
+    frame, subframe = divmod(float(keyframe), 1)
+    with profile_stage('frame_set'):
+        context.scene.frame_set(int(frame), subframe=subframe)
+
+def load_poses_of_animations(
+        animations: Sequence[Tuple[AnimationExport, McblendObjectGroup]],
+        context: Context):
+    '''
+    Populates the poses tables of multiple animations of different armatures
+    from the same scene (see :meth:`AnimationExport.load_poses_and_bone_states`).
+    The frames are visited in a single pass over the union of the keyframes
+    of all of the animations. The frame of the scene is set once per frame
+    and the poses of all of the armatures which use that frame are sampled
+    in the same evaluation. Only the adaptive sampling visits the frames of
+    every animation separately.
+
+    :param animations: the animations and the groups of mcblend objects of
+        their armatures.
+    :param context: the context of running the operator.
+    '''
+    original_frame = context.scene.frame_current
+    loaders = [
+        _PoseLoader(animation, object_properties, context)
+        for animation, object_properties in animations]
+    bpy.ops.screen.animation_cancel()  # pyright: ignore[reportUnknownMemberType]
+    try:
+        _set_scene_frame(loaders, 0, context)
+        for loader in loaders:
+            loader.load_pose(loader.animation.original_pose, 0, frame=0)
+            loader.animation.static_bones = (
+                loader.animation._get_static_bones(  # pylint: disable=protected-access
+                    loader.object_properties, loader.armature))
+        # Maps the keyframes to the loaders that sample them
+        frame_loaders: Dict[float, List[_PoseLoader]] = {}
+        for loader in loaders:
+            animation = loader.animation
+            if animation.single_frame:
+                # The keyframe value of the pose doesn't really matter
+                loader.keyframes = [float(original_frame)]
+            else:
+                loader.keyframes, loader.interpolations = (
+                    animation._get_keyframes(  # pylint: disable=protected-access
+                        loader.armature, animation.poses.bone_names, context))
+            for keyframe in loader.keyframes:
+                frame_loaders.setdefault(keyframe, []).append(loader)
+        next_indices = {id(loader): 0 for loader in loaders}
+        for keyframe in sorted(frame_loaders):
+            keyframe_loaders = frame_loaders[keyframe]
+            _set_scene_frame(keyframe_loaders, keyframe, context)
+            for loader in keyframe_loaders:
+                i = next_indices[id(loader)]
+                next_indices[id(loader)] = i + 1
+                interpolations = None
+                if loader.interpolations is not None:
+                    interpolations = (
+                        loader.interpolations[0][i],
+                        loader.interpolations[1][i],
+                        loader.interpolations[2][i])
+                loader.load_pose(
+                    loader.animation.poses, loader.keyframes[i],
+                    interpolations)
+        for loader in loaders:
+            animation = loader.animation
+            if animation.single_frame:
+                continue
+            if animation.adaptive_sampling_error > 0.0:
+                def load_pose(
+                        keyframe: float,
+                        interpolations: Tuple[
+                            InterpolationTable, InterpolationTable,
+                            InterpolationTable],
+                        loader: _PoseLoader = loader):
+                    '''Adds the pose from the keyframe to the poses table.'''
+                    _set_scene_frame([loader], keyframe, context)
+                    loader.load_pose(
+                        loader.animation.poses, keyframe, interpolations)
+                with profile_stage('adaptive_sampling'):
+                    animation._sample_adaptively(load_pose)  # pylint: disable=protected-access
+            animation._load_effects(context)  # pylint: disable=protected-access
+    finally:
+        context.scene.frame_set(original_frame)
@@ -0,0 +1,284 @@
+'''
+Cache of the exported animations, used for skipping the export of the
+animations that didn't change since the last export.
+'''
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from bpy.types import Action, ActionSlot, AnimData, Context, Object
+from bpy_extras import anim_utils
+
+from .typed_bpy_access import get_mcblend, get_mcblend_events
+from .pose_evaluation import FCurvePoseEvaluator
+
+CACHE_FORMAT_VERSION = 5
+'''
+The version of the cache. Changing it invalidates all of the existing
+caches. It should be increased every time when the results of the
+animation export change.
+'''
+
+class CachedAnimation(NamedTuple):
+    '''Cached result of exporting an animation.'''
+    animation: Dict[str, Any]
+    '''The content of the animation ("animations" -> "animation.name").'''
+    warnings: List[str]
+    '''The warnings generated during the export.'''
+
+def get_cache_path(filepath: str) -> str:
+    '''
+    Returns the path to the cache file for the exported animation file. The
+    cache is stored in a hidden file next to the animation file.
+
+    :param filepath: the path to the animation file.
+    '''
+    directory, name = os.path.split(filepath)
+    return os.path.join(directory, f'.{name}.mcblend-cache')
+
+class AnimationCache:
+    '''
+    Cache of the exported animations stored in a file. Every animation
+    (identified by its name) has a single entry with the key describing the
+    data used for exporting it (see :func:`get_animation_cache_key`).
+
+    :param path: the path to the file with the cache. The cache is loaded
+        from that file if it exists.
+    '''
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(path, 'r', encoding='utf8') as f:
+                data = json.load(f)
+            if data['version'] == CACHE_FORMAT_VERSION:
+                self.entries = data['entries']
+        except (json.JSONDecodeError, OSError, TypeError, LookupError):
+            pass
+
+    def get(self, animation_name: str, key: str) -> Optional[CachedAnimation]:
+        '''
+        Returns the cached animation if it was exported with the same key.
+
+        :param animation_name: the name of the animation.
+        :param key: the cache key of the animation.
+        '''
+        entry = self.entries.get(animation_name)
+        if entry is None or entry['key'] != key:
+            return None
+        return CachedAnimation(
+            copy.deepcopy(entry['animation']), list(entry['warnings']))
+
+    def set(
+            self, animation_name: str, key: str, animation: Dict[str, Any],
+            warnings: List[str]):
+        '''
+        Adds or replaces the entry of the animation.
+
+        :param animation_name: the name of the animation.
+        :param key: the cache key of the animation.
+        :param animation: the exported animation.
+        :param warnings: the warnings generated during the export.
+        '''
+        self.entries[animation_name] = {
+            'key': key,
+            'animation': copy.deepcopy(animation),
+            'warnings': list(warnings),
+        }
+
+    def save(self):
+        '''Saves the cache to its file.'''
+        with open(self.path, 'w', encoding='utf8') as f:
+            json.dump(
+                {'version': CACHE_FORMAT_VERSION, 'entries': self.entries}, f)
+
+def _get_fcurves_data(
+        action: Action | None, slot: ActionSlot | None
+    ) -> Optional[List[Any]]:
+    '''
+    Returns the data of the F-curves of the action used for creating the
+    cache key or None if the F-curves can't be cached.
+    '''
+    if action is None:
+        return []
+    channelbag = anim_utils.action_get_channelbag_for_slot(action, slot)
+    if channelbag is None:
+        return []
+    result: List[Any] = []
+    for fcurve in channelbag.fcurves:
+        if len(fcurve.modifiers) > 0:
+            return None
+        result.append([
+            fcurve.data_path, fcurve.array_index, fcurve.mute,
+            fcurve.extrapolation,
+            [
+                [
+                    list(kp.co), list(kp.handle_left), list(kp.handle_right),
+                    kp.interpolation, kp.easing, kp.back, kp.amplitude,
+                    kp.period
+                ]
+                for kp in fcurve.keyframe_points
+            ]
+        ])
+    return result
+
+def _get_animation_data(anim_data: AnimData | None) -> Optional[Dict[str, Any]]:
+    '''
+    Returns the data of the action and the NLA tracks used for creating the
+    cache key or None if the animation can't be cached.
+    '''
+    if anim_data is None:
+        return {}
+    action_fcurves = _get_fcurves_data(anim_data.action, anim_data.action_slot)
+    if action_fcurves is None:
+        return None
+    tracks: List[Any] = []
+    for track in anim_data.nla_tracks:
+        strips: List[Any] = []
+        for strip in track.strips:
+            strip_fcurves = _get_fcurves_data(strip.action, strip.action_slot)
+            if strip_fcurves is None:
+                return None
+            strips.append([
+                strip.type, strip.mute, strip.frame_start, strip.frame_end,
+                strip.action_frame_start, strip.action_frame_end,
+                strip.scale, strip.repeat, strip.blend_type,
+                strip.extrapolation, strip.use_reverse, strip.blend_in,
+                strip.blend_out, strip.influence, strip.use_animated_influence,
+                strip.use_animated_time, strip_fcurves
+            ])
+        tracks.append([track.name, track.mute, track.is_solo, strips])
+    return {
+        'action': action_fcurves,
+        'action_blend_type': anim_data.action_blend_type,
+        'action_influence': anim_data.action_influence,
+        'action_extrapolation': anim_data.action_extrapolation,
+        'nla_tracks': tracks,
+    }
+
+def _get_hierarchy_data(armature: Object) -> Optional[List[Any]]:
+    '''
+    Returns the data of the offspring of the armature (the objects that
+    become the cubes and locators of the model) used for creating the cache
+    key of the animations that use the hierarchy error, or None if the
+    animation can't be cached because some of the objects are animated.
+    '''
+    result: List[Any] = []
+    offspring: List[Object] = list(armature.children)
+    while offspring:
+        obj = offspring.pop()
+        anim_data = obj.animation_data
+        if anim_data is not None and (
+                anim_data.action is not None
+                or len(anim_data.drivers) > 0
+                or len(anim_data.nla_tracks) > 0):
+            # The rest transformation of the object depends on the frame
+            return None
+        result.append([
+            obj.name, obj.type,
+            None if obj.parent is None else obj.parent.name,
+            obj.parent_type, obj.parent_bone,
+            [list(row) for row in obj.matrix_parent_inverse],
+            [list(row) for row in obj.matrix_basis],
+            # The corners of the cubes are a part of the levers of the bones
+            [list(corner) for corner in obj.bound_box]
+            if obj.type == 'MESH' else None,
+        ])
+        offspring.extend(obj.children)
+    result.sort(key=lambda item: item[0])
+    return result
+
+def get_animation_cache_key(context: Context) -> Optional[str]:
+    '''
+    Returns the cache key of the active animation of the selected armature
+    or None if the animation can't be cached. The key is a hash of the data
+    that affects the exported animation: the F-curves of the actions, the
+    setup of the NLA tracks, the frame range, the timeline markers, the
+    settings of the animation and the rest pose of the armature. The
+    animations that use the hierarchy error also depend on the objects
+    parented to the armature (see :func:`_get_hierarchy_data`).
+
+    Only the animations of the armatures with poses that depend only on
+    their own F-curves can be cached (see
+    :meth:`FCurvePoseEvaluator.create`). Otherwise, the changes in other
+    objects could change the animation without changing the key.
+
+    :param context: the context of running the operator.
+    '''
+    armature: Object | None = context.object
+    if armature is None or armature.type != 'ARMATURE':
+        return None
+    scene = context.scene
+    evaluator = FCurvePoseEvaluator.create(armature, scene)
+    if evaluator is None:
+        return None
+    animation_data = _get_animation_data(armature.animation_data)
+    if animation_data is None:
+        return None
+    model_properties = get_mcblend(armature)
+    anim_data = model_properties.animations[model_properties.active_animation]
+    # All of the simple properties of the animation, this includes the
+    # export settings
+    settings = {
+        prop.identifier: getattr(anim_data, prop.identifier)
+        for prop in anim_data.bl_rna.properties  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType, reportUnknownVariableType]
+        if prop.type in {'BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM'}
+        and getattr(prop, 'array_length', 0) == 0
+    }
+    # The values of the animated properties of the pose bones depend on the
+    # current frame
+    animated = {
+        (channel.bone_index, channel.property_name, channel.array_index)
+        for channel in evaluator.channels}
+    bones: List[Any] = []
+    for i, pose_bone in enumerate(armature.pose.bones):
+        bone = pose_bone.bone
+        static_values = [
+            [
+                None if (i, property_name, j) in animated else value
+                for j, value in enumerate(getattr(pose_bone, property_name))
+            ]
+            for property_name in (
+                'location', 'rotation_quaternion', 'rotation_euler',
+                'rotation_axis_angle', 'scale')
+        ]
+        bones.append([
+            pose_bone.name,
+            None if bone.parent is None else bone.parent.name,
+            [list(row) for row in bone.matrix_local], bone.length,
+            bone.use_connect,
+            pose_bone.rotation_mode, static_values
+        ])
+    hierarchy: Optional[List[Any]] = None
+    if anim_data.use_hierarchy_error:
+        hierarchy = _get_hierarchy_data(armature)
+        if hierarchy is None:
+            return None
+    render = scene.render
+    data = {
+        'version': CACHE_FORMAT_VERSION,
+        'settings': settings,
+        'model_origin': model_properties.model_origin,
+        'frame_range': [
+            scene.frame_start, scene.frame_end,
+            # The exported frame of the single frame animations
+            scene.frame_current if anim_data.single_frame else None
+        ],
+        'fps': [render.fps, render.fps_base],
+        'frame_map': [render.frame_map_old, render.frame_map_new],
+        'markers': [
+            [marker.name, marker.frame] for marker in scene.timeline_markers],
+        'events': [
+            [event.name, event.get_effects_dict()]
+            for event in get_mcblend_events(scene)],
+        'matrix_world': [list(row) for row in armature.matrix_world],
+        'bones': bones,
+        'hierarchy': hierarchy,
+        'animation_data': animation_data,
+    }
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True).encode('utf8')).hexdigest()
@@ -3,9 +3,161 @@ Functions related to optimizing animations.
 '''
 from __future__ import annotations
 
-from typing import Any, Generator, TypeGuard, Literal, Dict, Optional, List
+import math
+
+from typing import (
+    Any, Callable, Generator, Hashable, TypeGuard, TypeVar, Literal, Dict,
+    NamedTuple, Optional, List)
+
+import numpy as np
+import numpy.typing as npt
 
 timeline_type = Literal["rotation", "position", "scale"]
+optimization_strategy_type = Literal["GREEDY", "DOUGLAS_PEUCKER"]
+_Key = TypeVar("_Key", bound=Hashable)
+
+ERROR_MARGIN_SEARCH_ITERATIONS = 10
+"""
+The number of the steps of :func:`find_error_margin`. The search narrows the
+range of the error margins by half in every step.
+"""
+
+MAX_TOLERANCE_SCALE = 20.0
+"""
+The largest factor of the error settings used by the search of the error
+margin for a size budget (see :func:`scale_tolerance`).
+"""
+
+CATMULLROM_SAMPLES = 4
+"""
+The number of equal parts of every keyframe segment compared by the optimizer
+when the timeline has catmull-rom keyframes. Linear segments are compared
+only at the keyframes because the differences between two piecewise linear
+curves are the largest at their vertices.
+"""
+
+
+def _multiply_quaternions(
+        a: npt.NDArray[np.float64],
+        b: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """
+    Multiply two arrays of quaternions (w, x, y, z) with shape (n, 4).
+    """
+    aw, ax, ay, az = a[:, 0], a[:, 1], a[:, 2], a[:, 3]
+    bw, bx, by, bz = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    return np.stack([
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ], axis=1)
+
+
+def euler_to_quaternions(
+        rotations: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """
+    Convert Minecraft rotations in degrees to quaternions (w, x, y, z) in
+    the Blender coordinate system. This is the inverse of the conversion
+    used by the exporter (the XZY Euler order of Blender with swapped and
+    negated axes).
+
+    :param rotations: The rotations, an array with shape (n, 3).
+    :returns: The quaternions, an array with shape (n, 4).
+    """
+    half = np.radians(rotations) / 2
+    zeros = np.zeros(len(rotations))
+    # Blender X, Z and Y axes, in the order of applying them
+    qx = np.stack(
+        [np.cos(half[:, 0]), np.sin(half[:, 0]), zeros, zeros], axis=1)
+    qz = np.stack(
+        [np.cos(half[:, 1]), zeros, zeros, -np.sin(half[:, 1])], axis=1)
+    qy = np.stack(
+        [np.cos(half[:, 2]), zeros, np.sin(half[:, 2]), zeros], axis=1)
+    return _multiply_quaternions(qy, _multiply_quaternions(qz, qx))
+
+
+def get_rotation_angles(
+        a: npt.NDArray[np.float64],
+        b: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """
+    Calculate the angles between pairs of Minecraft rotations. Unlike the
+    distance between the Euler angles, the angle doesn't depend on the
+    representation of the rotations.
+
+    :param a: The first rotations in degrees, an array with shape (n, 3).
+    :param b: The second rotations in degrees, an array with shape (n, 3).
+    :returns: The angles in degrees.
+    """
+    dot = np.abs(np.sum(
+        euler_to_quaternions(a) * euler_to_quaternions(b), axis=1))
+    return np.degrees(2 * np.arccos(np.minimum(dot, 1.0)))
+
+
+class ErrorTolerance(NamedTuple):
+    """
+    The maximum allowed error of the optimized keyframes of a timeline.
+    """
+    relative: float = 0.05
+    """
+    The maximum error as a ratio of movement distance (see
+    :func:`is_interpolation`).
+    """
+    absolute: float = 0.0
+    """
+    The errors with distances smaller than this value are always allowed
+    (even if the relative tolerance is 0), 0 disables the absolute
+    threshold.
+    """
+    angular: float = 0.0
+    """
+    If greater than 0, the values are Minecraft rotations in degrees and
+    the error is the angle between the original and the interpolated
+    rotation in degrees. The angular error replaces the relative and the
+    absolute thresholds.
+    """
+
+    @property
+    def limit(self) -> float:
+        """The errors must be smaller than this value."""
+        return self.angular if self.angular > 0 else self.relative
+
+    def get_errors(
+            self, values: npt.NDArray[np.float64],
+            expected: npt.NDArray[np.float64],
+            start: npt.NDArray[np.float64],
+            end: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """
+        Calculate the errors of the interpolated values compared to the
+        expected values. The errors are compared to :attr:`limit`.
+
+        :param values: The interpolated values, an array with shape (n, 3).
+        :param expected: The expected values, an array with shape (n, 3).
+        :param start: The values at the starts of the interpolated segments.
+        :param end: The values at the ends of the interpolated segments.
+        :returns: The errors, NaN for the values that can't be compared and
+            -inf for the values within the absolute threshold.
+        """
+        if self.angular > 0:
+            return get_rotation_angles(values, expected)
+        with np.errstate(invalid='ignore'):
+            # The squares are added one by one to match the results of
+            # is_interpolation exactly
+            diff = expected - values
+            distance = np.sqrt(
+                diff[:, 0] * diff[:, 0] + diff[:, 1] * diff[:, 1] +
+                diff[:, 2] * diff[:, 2])
+            movement = end - start
+            movement_distance = np.sqrt(
+                movement[:, 0] * movement[:, 0] +
+                movement[:, 1] * movement[:, 1] +
+                movement[:, 2] * movement[:, 2])
+            # Avoid division by zero
+            movement_distance = np.where(
+                movement_distance < 0.00001, 0.00001, movement_distance)
+            errors = distance / movement_distance
+            if self.absolute > 0:
+                errors = np.where(distance < self.absolute, -np.inf, errors)
+        return errors
 
 
 def walk_bone_timelines(animation_data: Dict[str, Any]) -> Generator[tuple[timeline_type, dict[str, Any]], None, None]:
@@ -15,16 +167,32 @@ def walk_bone_timelines(animation_data: Dict[str, Any]) -> Generator[tuple[timel
     :param animation_data: The animation data dictionary.
     :returns: Generator yielding tuples of (timeline_type, timeline).
     """
+    for _, timeline_type, timeline in walk_named_bone_timelines(
+            animation_data):
+        yield timeline_type, timeline
+
+
+def walk_named_bone_timelines(
+        animation_data: Dict[str, Any]
+    ) -> Generator[tuple[str, timeline_type, dict[str, Any]], None, None]:
+    """
+    Walk through all timelines in a single animation, together with the
+    names of their bones.
+
+    :param animation_data: The animation data dictionary.
+    :returns: Generator yielding tuples of (bone_name, timeline_type,
+        timeline).
+    """
     if "bones" not in animation_data:
         return
 
-    for bone in animation_data["bones"].values():
+    for bone_name, bone in animation_data["bones"].items():
         if "rotation" in bone and isinstance(bone["rotation"], dict):
-            yield "rotation", bone["rotation"]
+            yield bone_name, "rotation", bone["rotation"]
         if "position" in bone and isinstance(bone["position"], dict):
-            yield "position", bone["position"]
+            yield bone_name, "position", bone["position"]
         if "scale" in bone and isinstance(bone["scale"], dict):
-            yield "scale", bone["scale"]
+            yield bone_name, "scale", bone["scale"]
 
 
 def walk_timeline_keys(timeline: dict[str, Any]) -> Generator[str, None, None]:
@@ -113,20 +281,827 @@ def is_interpolation(
     return deviation < error_margin
 
 
+MIN_LEVER_LENGTH = 1.0
+"""
+The lever length used for the bones without descendants (one pixel), see
+:func:`get_hierarchy_tolerances`.
+"""
+
+
+def get_hierarchy_tolerances(
+        lever_length: float, max_displacement: float
+    ) -> Dict[timeline_type, ErrorTolerance]:
+    """
+    Return the tolerances of the timelines of a bone that limit the
+    displacement of its descendants. A position error moves all of the
+    descendants by the same distance. A rotation error moves them by at
+    most 2 * lever_length * sin(angle / 2) and a scale error by at most
+    lever_length * error. Bones with long levers (close to the root of the
+    hierarchy) get strict tolerances and short bones get loose ones.
+
+    The limit applies to the error of a single bone. The errors of the
+    ancestors of a descendant add up, so the caller should split the
+    displacement between the bones of the chain (see
+    :func:`get_chain_lengths`).
+
+    :param lever_length: The largest distance from the pivot of the bone to
+        its descendants in Minecraft units.
+    :param max_displacement: The maximum allowed displacement of the
+        descendants in Minecraft units.
+    :returns: The tolerances of the timeline types.
+    """
+    lever_length = max(lever_length, MIN_LEVER_LENGTH)
+    angle = math.degrees(
+        2 * math.asin(min(1.0, max_displacement / (2 * lever_length))))
+    return {
+        "position": ErrorTolerance(0.0, absolute=max_displacement),
+        "rotation": ErrorTolerance(0.0, angular=angle),
+        "scale": ErrorTolerance(
+            0.0, absolute=max_displacement / lever_length),
+    }
+
+
+def get_lever_lengths(
+        pivots: Dict[_Key, npt.NDArray[np.float64]],
+        parents: Dict[_Key, Optional[_Key]],
+        points: Optional[Dict[_Key, npt.NDArray[np.float64]]] = None
+    ) -> Dict[_Key, float]:
+    """
+    Return the lever lengths of the objects of a hierarchy - the largest
+    distances from their pivots to the pivots and the points (e.g. the
+    corners of the cubes) of their descendants and to their own points.
+    The lever lengths are used by :func:`get_hierarchy_tolerances`.
+
+    :param pivots: The world-space pivots of the objects keyed by their
+        identifiers.
+    :param parents: The identifiers of the parents of the objects (None for
+        the roots). The parents that aren't in the pivots are ignored.
+    :param points: Optional - the world-space points of the objects, arrays
+        with shape (n, 3), keyed by their identifiers.
+    :returns: The lever lengths keyed by the identifiers of the objects (0
+        for the objects without descendants and points).
+    """
+    if points is None:
+        points = {}
+    lever_lengths = {key: 0.0 for key in pivots}
+    for key, pivot in pivots.items():
+        key_points = pivot.reshape(1, 3)
+        if key in points and len(points[key]) > 0:
+            key_points = np.concatenate([key_points, points[key]])
+            lever_lengths[key] = float(
+                np.linalg.norm(points[key] - pivot, axis=1).max())
+        visited = {key}
+        parent = parents.get(key)
+        # The loop stops at cycles, which are impossible in Blender but
+        # could be created by invalid input
+        while parent in pivots and parent not in visited:
+            visited.add(parent)
+            distance = float(
+                np.linalg.norm(key_points - pivots[parent], axis=1).max())
+            if distance > lever_lengths[parent]:
+                lever_lengths[parent] = distance
+            parent = parents.get(parent)
+    return lever_lengths
+
+
+def get_chain_lengths(
+        parents: Dict[_Key, Optional[_Key]]) -> Dict[_Key, int]:
+    """
+    Return the number of the objects of the longest chain from a root to a
+    leaf of the hierarchy that goes through every object. Splitting the
+    maximum displacement of :func:`get_hierarchy_tolerances` by the chain
+    lengths keeps the sum of the errors of the ancestors of every
+    descendant under the maximum displacement.
+
+    :param parents: The identifiers of the parents of the objects (None for
+        the roots). The parents that aren't in the keys are ignored.
+    :returns: The chain lengths keyed by the identifiers of the objects.
+    """
+    depths: Dict[_Key, int] = {}
+    heights = {key: 0 for key in parents}
+    for key in parents:
+        visited = {key}
+        height = 0
+        parent = parents[key]
+        while parent in parents and parent not in visited:
+            visited.add(parent)
+            height += 1
+            if height > heights[parent]:
+                heights[parent] = height
+            parent = parents[parent]
+        depths[key] = height + 1
+    return {key: depths[key] + heights[key] for key in parents}
+
+
+def scale_tolerance(
+        tolerance: ErrorTolerance, scale: float) -> ErrorTolerance:
+    """
+    Return the tolerance with all of its thresholds multiplied by the same
+    factor. Used for searching the error settings that meet a size budget.
+    The relative tolerance is limited to 1 and the angular tolerance to 180
+    degrees.
+
+    :param tolerance: The tolerance.
+    :param scale: The factor of the thresholds.
+    :returns: The scaled tolerance.
+    """
+    return ErrorTolerance(
+        min(tolerance.relative * scale, 1.0),
+        absolute=tolerance.absolute * scale,
+        angular=min(tolerance.angular * scale, 180.0))
+
+
+def get_bones_hierarchy_tolerances(
+        lever_lengths: Dict[str, float], chain_lengths: Dict[str, int],
+        max_displacement: float
+    ) -> Dict[str, Dict[timeline_type, ErrorTolerance]]:
+    """
+    Return the tolerances of the timelines of the bones that limit the
+    displacement of their descendants (see :func:`get_hierarchy_tolerances`).
+    The maximum displacement is split between the bones of the longest
+    chain that goes through every bone (see :func:`get_chain_lengths`).
+
+    :param lever_lengths: The lever lengths of the bones keyed by their
+        names (see :func:`get_lever_lengths`).
+    :param chain_lengths: The chain lengths of the bones keyed by their
+        names.
+    :param max_displacement: The maximum allowed displacement of the
+        descendants in Minecraft units.
+    :returns: The tolerances of the timeline types keyed by the names of the
+        bones.
+    """
+    return {
+        name: get_hierarchy_tolerances(
+            lever_length, max_displacement / chain_lengths[name])
+        for name, lever_length in lever_lengths.items()
+    }
+
+
+def get_interpolation_errors(
+        times: npt.NDArray[np.float64], values: npt.NDArray[np.float64],
+        tolerance: ErrorTolerance = ErrorTolerance()
+    ) -> npt.NDArray[np.float64]:
+    """
+    Calculate the errors of interpolating every interior keyframe of a
+    timeline from its neighbors. With the default tolerance, the error is
+    calculated the same way as in :func:`is_interpolation`.
+
+    :param times: The times of the keyframes sorted in ascending order.
+    :param values: The values of the keyframes, an array with shape (n, 3).
+        Keyframes which aren't vectors should use NaN values.
+    :param tolerance: The tolerance that defines the error.
+    :returns: Array with the errors of the keyframes from 1 to n-2. The
+        error of the keyframes which can't be interpolated is NaN.
+    """
+    prev, curr, next = values[:-2], values[1:-1], values[2:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_ratio = (times[1:-1] - times[:-2]) / (times[2:] - times[:-2])
+        alternative_curr = prev + t_ratio[:, np.newaxis] * (next - prev)
+    return tolerance.get_errors(alternative_curr, curr, prev, next)
+
+
+def pick_every_other(candidates: npt.NDArray[np.bool_]) -> npt.NDArray[np.bool_]:
+    """
+    Select the candidates the same way as walking through them and picking
+    every candidate whose predecessor wasn't picked. In every run of
+    consecutive candidates, the 1st, 3rd, 5th... candidate is picked.
+
+    :param candidates: The mask of the candidates.
+    :returns: The mask of the picked candidates.
+    """
+    indices = np.arange(len(candidates))
+    # The index of the last non-candidate before every element (or -1)
+    run_starts = np.maximum.accumulate(np.where(candidates, -1, indices))
+    position_in_run = indices - run_starts - 1
+    return candidates & (position_in_run % 2 == 0)
+
+
+def reduce_keyframes_greedy(
+        times: npt.NDArray[np.float64], values: npt.NDArray[np.float64],
+        tolerance: ErrorTolerance) -> npt.NDArray[np.intp]:
+    """
+    Find the keyframes of a timeline that can't be interpolated from their
+    neighbors. Every pass checks all of the remaining keyframes at once. In
+    every pass, the keyframes are checked against their neighbors from the
+    beginning of the pass and the neighbor of a removed keyframe is never
+    removed in the same pass. The passes are repeated until nothing can be
+    removed.
+
+    :param times: The times of the keyframes sorted in ascending order.
+    :param values: The values of the keyframes, an array with shape (n, 3).
+        Keyframes which aren't vectors should use NaN values.
+    :param tolerance: The maximum allowed error.
+    :returns: The indices of the kept keyframes in ascending order.
+    """
+    remaining = np.arange(len(times))
+    while len(remaining) >= 3:
+        errors = get_interpolation_errors(
+            times[remaining], values[remaining], tolerance)
+        with np.errstate(invalid='ignore'):
+            candidates = errors < tolerance.limit
+        removed = pick_every_other(candidates)
+        if not removed.any():
+            break
+        keep = np.ones(len(remaining), dtype=np.bool_)
+        keep[1:-1] = ~removed
+        remaining = remaining[keep]
+    return remaining
+
+
+def reduce_keyframes_douglas_peucker(
+        times: npt.NDArray[np.float64], values: npt.NDArray[np.float64],
+        tolerance: ErrorTolerance) -> npt.NDArray[np.intp]:
+    """
+    Find the keyframes of a timeline that have to be kept using the
+    Douglas-Peucker algorithm. Starting with a segment between the first and
+    the last keyframe, every segment is checked against all of the original
+    keyframes inside it. If all of them can be interpolated from the ends of
+    the segment, they're removed, otherwise the segment is split at the
+    keyframe with the largest error. Unlike :func:`reduce_keyframes_greedy`,
+    the error of every removed keyframe is measured against the final curve,
+    so it can't accumulate over multiple passes.
+
+    The keyframes which aren't vectors and their neighbors are always kept.
+
+    :param times: The times of the keyframes sorted in ascending order.
+    :param values: The values of the keyframes, an array with shape (n, 3).
+        Keyframes which aren't vectors should use NaN values.
+    :param tolerance: The maximum allowed error.
+    :returns: The indices of the kept keyframes in ascending order.
+    """
+    n = len(times)
+    if n < 3:
+        return np.arange(n)
+    kept = np.zeros(n, dtype=np.bool_)
+    kept[[0, -1]] = True
+    # The values of the keyframes which aren't vectors are NaN rows
+    not_vector = np.isnan(values[:, 0])
+    kept |= not_vector
+    kept[:-1] |= not_vector[1:]
+    kept[1:] |= not_vector[:-1]
+    fixed = np.flatnonzero(kept).tolist()
+    segments = [
+        (start, end) for start, end in zip(fixed[:-1], fixed[1:])
+        if end - start > 1]
+    while len(segments) > 0:
+        start, end = segments.pop()
+        errors = get_segment_errors(times, values, start, end, tolerance)
+        # Duplicate times (NaN) force splitting the segment
+        errors[np.isnan(errors)] = np.inf
+        split = int(np.argmax(errors))
+        if errors[split] < tolerance.limit:
+            continue
+        split += start + 1
+        kept[split] = True
+        if split - start > 1:
+            segments.append((start, split))
+        if end - split > 1:
+            segments.append((split, end))
+    return np.flatnonzero(kept)
+
+
+def optimize_timeline(timeline: dict[str, Any], error_margin: float) -> int:
+    """
+    Remove the keyframes of a timeline that can be interpolated from their
+    neighbors (see :func:`reduce_keyframes_greedy` and
+    :func:`reduce_curve_keyframes`). The timeline is parsed into arrays
+    once.
+
+    :param timeline: The timeline dictionary (modified in place).
+    :param error_margin: The maximum allowed error as a ratio of movement
+        distance.
+    :returns: The number of removed keyframes.
+    """
+    return _reduce_timeline(
+        timeline, ErrorTolerance(error_margin), "GREEDY")
+
+
+def douglas_peucker_timeline(
+        timeline: dict[str, Any], error_margin: float) -> int:
+    """
+    Remove the keyframes of a timeline using the Douglas-Peucker algorithm
+    (see :func:`reduce_keyframes_douglas_peucker` and
+    :func:`reduce_curve_keyframes`).
+
+    :param timeline: The timeline dictionary (modified in place).
+    :param error_margin: The maximum allowed error as a ratio of movement
+        distance.
+    :returns: The number of removed keyframes.
+    """
+    return _reduce_timeline(
+        timeline, ErrorTolerance(error_margin), "DOUGLAS_PEUCKER")
+
+
+def _reduce_timeline(
+        timeline: dict[str, Any], tolerance: ErrorTolerance,
+        strategy: optimization_strategy_type) -> int:
+    """
+    Remove the keyframes of a timeline using given strategy (see
+    :func:`reduce_keyframes`).
+
+    :param timeline: The timeline dictionary (modified in place).
+    :param tolerance: The maximum allowed error.
+    :param strategy: The keyframe reduction algorithm.
+    :returns: The number of removed keyframes.
+    """
+    if len(timeline) < 3:
+        return 0
+    keyframes = parse_keyframes(timeline)
+    order = np.argsort(keyframes.times, kind='stable')
+    kept = reduce_keyframes(keyframes.take(order), tolerance, strategy)
+    return remove_keys(timeline, order[kept])
+
+
+def get_segment_errors(
+        times: npt.NDArray[np.float64], values: npt.NDArray[np.float64],
+        start: int, end: int,
+        tolerance: ErrorTolerance = ErrorTolerance()
+    ) -> npt.NDArray[np.float64]:
+    """
+    Calculate the errors of interpolating the keyframes inside a segment of
+    a timeline from the keyframes at the ends of the segment. With the
+    default tolerance, the error is defined the same way as in
+    :func:`is_interpolation`.
+
+    :param times: The times of the keyframes sorted in ascending order.
+    :param values: The values of the keyframes, an array with shape (n, 3).
+    :param start: The index of the first keyframe of the segment.
+    :param end: The index of the last keyframe of the segment.
+    :param tolerance: The tolerance that defines the error.
+    :returns: Array with the errors of the keyframes from start+1 to end-1.
+    """
+    prev, next = values[start:start+1], values[end:end+1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_ratio = (times[start+1:end] - times[start]) / (
+            times[end] - times[start])
+        alternative = prev + t_ratio[:, np.newaxis] * (next - prev)
+    return tolerance.get_errors(
+        alternative, values[start+1:end], prev, next)
+
+
+class Keyframes(NamedTuple):
+    """
+    The keyframes of a timeline stored in arrays. The arrays describe the
+    curve evaluated by Bedrock. The segment between two keyframes starts at
+    the "post" value of the first keyframe and ends at the "pre" value of
+    the second one. The segment is a catmull-rom spline if the keyframe at
+    its start uses the "catmullrom" lerp mode, otherwise it's linear.
+
+    Keyframes which can't be evaluated (e.g. Molang expressions) have NaN
+    values.
+    """
+    times: npt.NDArray[np.float64]
+    """The times of the keyframes."""
+    pre: npt.NDArray[np.float64]
+    """The values before the keyframes, an array with shape (n, 3)."""
+    post: npt.NDArray[np.float64]
+    """The values after the keyframes, an array with shape (n, 3)."""
+    catmullrom: npt.NDArray[np.bool_]
+    """Whether the segments starting at the keyframes are catmull-rom."""
+
+    def take(self, indices: npt.NDArray[np.intp]) -> Keyframes:
+        """
+        Return the keyframes with given indices.
+
+        :param indices: The indices of the keyframes.
+        """
+        return Keyframes(
+            self.times[indices], self.pre[indices], self.post[indices],
+            self.catmullrom[indices])
+
+
+def parse_keyframes(timeline: dict[str, Any]) -> Keyframes:
+    """
+    Parse the timeline into :class:`Keyframes` (in the order of the keys in
+    the dictionary). The "pre" and "post" values of the keyframes default to
+    each other.
+
+    :param timeline: The timeline dictionary.
+    :returns: The keyframes of the timeline.
+    """
+    n = len(timeline)
+    times = np.array([float(k) for k in timeline.keys()])
+    pre = np.full((n, 3), np.nan)
+    post = np.full((n, 3), np.nan)
+    catmullrom = np.zeros(n, dtype=np.bool_)
+    for i, v in enumerate(timeline.values()):
+        if isinstance(v, dict):
+            post_value: Any = v.get("post", v.get("pre"))  # type: ignore
+            pre_value: Any = v.get("pre", post_value)  # type: ignore
+            if is_vector(pre_value) and is_vector(post_value):
+                pre[i] = pre_value
+                post[i] = post_value
+                catmullrom[i] = v.get("lerp_mode") == "catmullrom"  # type: ignore
+        elif is_vector(v):
+            pre[i] = v
+            post[i] = v
+    return Keyframes(times, pre, post, catmullrom)
+
+
+def remove_keys(
+        timeline: dict[str, Any], kept_indices: npt.NDArray[np.intp]) -> int:
+    """
+    Remove the keys of the timeline except the ones with given indices (in
+    the order of the keys in the dictionary).
+
+    :param timeline: The timeline dictionary (modified in place).
+    :param kept_indices: The indices of the keys to keep.
+    :returns: The number of removed keys.
+    """
+    kept = np.zeros(len(timeline), dtype=np.bool_)
+    kept[kept_indices] = True
+    removed_keys = [
+        k for k, is_kept in zip(timeline.keys(), kept.tolist())
+        if not is_kept]
+    for k in removed_keys:
+        del timeline[k]
+    return len(removed_keys)
+
+
+def reduce_keyframes(
+        keyframes: Keyframes, tolerance: ErrorTolerance,
+        strategy: optimization_strategy_type = "GREEDY"
+    ) -> npt.NDArray[np.intp]:
+    """
+    Find the keyframes of a timeline that have to be kept.
+
+    Timelines with only linear keyframes without discontinuities use
+    :func:`reduce_keyframes_greedy` or
+    :func:`reduce_keyframes_douglas_peucker` depending on the strategy.
+    Other timelines (catmull-rom keyframes, "pre" and "post" values) use
+    :func:`reduce_curve_keyframes`.
+
+    :param keyframes: The keyframes sorted by time.
+    :param tolerance: The maximum allowed error.
+    :param strategy: The keyframe reduction algorithm.
+    :returns: The indices of the kept keyframes in ascending order.
+    """
+    is_linear = (
+        not keyframes.catmullrom.any() and
+        np.array_equal(keyframes.pre, keyframes.post, equal_nan=True))
+    if not is_linear:
+        return reduce_curve_keyframes(keyframes, tolerance, strategy)
+    if strategy == "DOUGLAS_PEUCKER":
+        return reduce_keyframes_douglas_peucker(
+            keyframes.times, keyframes.post, tolerance)
+    return reduce_keyframes_greedy(
+        keyframes.times, keyframes.post, tolerance)
+
+
+def is_static(keyframes: Keyframes, tolerance: ErrorTolerance) -> bool:
+    """
+    Check if a timeline can be replaced with a static value (the "post"
+    value of its first keyframe). Bedrock uses the static value at all
+    times, so every "pre" and "post" value of the timeline must be within
+    the tolerance of it.
+
+    :param keyframes: The keyframes of the timeline.
+    :param tolerance: The maximum allowed error.
+    :returns: Whether the timeline is constant.
+    """
+    values = np.concatenate([keyframes.pre, keyframes.post])
+    if len(values) == 0 or np.isnan(values).any():
+        return False
+    if np.all(values == keyframes.post[0]):
+        return True
+    static = np.broadcast_to(keyframes.post[0], values.shape)
+    errors = tolerance.get_errors(static, values, static, static)
+    return bool(np.all(errors < tolerance.limit))
+
+
+def evaluate_segments(
+        keyframes: Keyframes, start: npt.NDArray[np.intp],
+        end: npt.NDArray[np.intp], previous: npt.NDArray[np.intp],
+        next: npt.NDArray[np.intp], alpha: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+    """
+    Evaluate the curve of the keyframes the same way as Bedrock does. Every
+    evaluated point is described by the keyframes of its segment and the
+    position in the segment.
+
+    :param keyframes: The keyframes.
+    :param start: The keyframes at the starts of the segments.
+    :param end: The keyframes at the ends of the segments.
+    :param previous: The keyframes before the starts of the segments, used
+        by the catmull-rom segments. Equal to start for the first segment.
+    :param next: The keyframes after the ends of the segments, used by the
+        catmull-rom segments. Equal to end for the last segment.
+    :param alpha: The positions of the points in the segments (0-1).
+    :returns: The values of the points, an array with shape (n, 3).
+    """
+    p0, p1 = keyframes.post[previous], keyframes.post[start]
+    p2, p3 = keyframes.pre[end], keyframes.pre[next]
+    a = alpha[:, np.newaxis]
+    linear = p1 + a * (p2 - p1)
+    smooth = 0.5 * (
+        2 * p1 + (p2 - p0) * a + (2 * p0 - 5 * p1 + 4 * p2 - p3) * a * a +
+        (3 * p1 - p0 - 3 * p2 + p3) * a * a * a)
+    return np.where(
+        keyframes.catmullrom[start][:, np.newaxis], smooth, linear)
+
+
+class _CurveSamples(NamedTuple):
+    """
+    The points of the original curve of the keyframes compared to the
+    curves with removed keyframes.
+    """
+    segments: npt.NDArray[np.intp]
+    """The indices of the keyframes at the starts of the segments."""
+    alpha: npt.NDArray[np.float64]
+    """The positions of the points in the segments."""
+    times: npt.NDArray[np.float64]
+    """The times of the points."""
+    values: npt.NDArray[np.float64]
+    """The values of the points."""
+
+    def take(self, mask: npt.NDArray[np.bool_]) -> _CurveSamples:
+        """Return the samples selected by the mask."""
+        return _CurveSamples(
+            self.segments[mask], self.alpha[mask], self.times[mask],
+            self.values[mask])
+
+
+def _get_curve_samples(keyframes: Keyframes) -> _CurveSamples:
+    """
+    Sample the curve of the keyframes. Every segment is sampled at both of
+    its ends (so both sides of the discontinuities are compared) and, if
+    the timeline has catmull-rom keyframes, at :data:`CATMULLROM_SAMPLES`
+    equal parts.
+    """
+    n = len(keyframes.times)
+    parts = CATMULLROM_SAMPLES if keyframes.catmullrom[:-1].any() else 1
+    segments = np.repeat(np.arange(n - 1), parts + 1)
+    alpha = np.tile(np.linspace(0.0, 1.0, parts + 1), n - 1)
+    times = (
+        (1 - alpha) * keyframes.times[segments] +
+        alpha * keyframes.times[segments + 1])
+    values = evaluate_segments(
+        keyframes, segments, segments + 1, np.maximum(segments - 1, 0),
+        np.minimum(segments + 2, n - 1), alpha)
+    return _CurveSamples(segments, alpha, times, values)
+
+
+def _get_sample_errors(
+        keyframes: Keyframes, samples: _CurveSamples,
+        kept_indices: npt.NDArray[np.intp], start: npt.NDArray[np.intp],
+        end: npt.NDArray[np.intp], previous: npt.NDArray[np.intp],
+        next: npt.NDArray[np.intp],
+        tolerance: ErrorTolerance) -> npt.NDArray[np.float64]:
+    """
+    Calculate the errors of the curve made of the kept keyframes at the
+    sampled points (see :meth:`ErrorTolerance.get_errors`). The segments are
+    given as positions in the kept_indices array.
+    """
+    start, end = kept_indices[start], kept_indices[end]
+    previous, next = kept_indices[previous], kept_indices[next]
+    start_times, end_times = keyframes.times[start], keyframes.times[end]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = np.where(
+            end_times > start_times,
+            (samples.times - start_times) / (end_times - start_times),
+            samples.alpha)
+    values = evaluate_segments(keyframes, start, end, previous, next, alpha)
+    return tolerance.get_errors(
+        values, samples.values, keyframes.post[start], keyframes.pre[end])
+
+
+def _get_fixed_keyframes(keyframes: Keyframes) -> npt.NDArray[np.bool_]:
+    """
+    Return the mask of the keyframes that can't be removed: the first and
+    the last keyframe, the keyframes which can't be evaluated and the
+    keyframes with duplicate times.
+    """
+    fixed = np.isnan(keyframes.pre[:, 0]) | np.isnan(keyframes.post[:, 0])
+    fixed[[0, -1]] = True
+    duplicate_times = keyframes.times[1:] == keyframes.times[:-1]
+    fixed[1:] |= duplicate_times
+    fixed[:-1] |= duplicate_times
+    return fixed
+
+
+def reduce_curve_keyframes(
+        keyframes: Keyframes, tolerance: ErrorTolerance,
+        strategy: optimization_strategy_type = "GREEDY"
+    ) -> npt.NDArray[np.intp]:
+    """
+    Find the keyframes of a timeline with catmull-rom keyframes or
+    discontinuities ("pre" and "post" values) that have to be kept. The
+    curve without the removed keyframes is compared to the original curve
+    at the sampled points (see :data:`CATMULLROM_SAMPLES`), so the error
+    of the result always stays under the error margin.
+
+    The "GREEDY" strategy removes the keyframes in passes. Every pass
+    removes the keyframes whose removal alone doesn't exceed the error
+    margin, skipping the keyframes close enough to the already removed ones
+    to affect the same segments. The "DOUGLAS_PEUCKER" strategy starts with
+    the first and the last keyframe and keeps adding the keyframes closest
+    to the largest error of every segment which exceeds the error margin.
+    Adding keyframes changes the shape of the neighboring catmull-rom
+    segments, so the result is cleaned up with the "GREEDY" passes.
+
+    :param keyframes: The keyframes sorted by time.
+    :param tolerance: The maximum allowed error.
+    :param strategy: The keyframe reduction algorithm.
+    :returns: The indices of the kept keyframes in ascending order.
+    """
+    if len(keyframes.times) < 3:
+        return np.arange(len(keyframes.times))
+    samples = _get_curve_samples(keyframes)
+    fixed = _get_fixed_keyframes(keyframes)
+    kept = np.ones(len(keyframes.times), dtype=np.bool_)
+    if strategy == "DOUGLAS_PEUCKER":
+        kept = _refine_curve_keyframes(keyframes, samples, fixed, tolerance)
+    return _reduce_curve_keyframes_greedy(
+        keyframes, samples, fixed, tolerance, kept)
+
+
+def _reduce_curve_keyframes_greedy(
+        keyframes: Keyframes, samples: _CurveSamples,
+        fixed: npt.NDArray[np.bool_], tolerance: ErrorTolerance,
+        kept: npt.NDArray[np.bool_]) -> npt.NDArray[np.intp]:
+    """
+    The "GREEDY" strategy of :func:`reduce_curve_keyframes`. Removes the
+    keyframes from the kept mask (modified in place).
+    """
+    # Removing a keyframe changes the control points of the catmull-rom
+    # segments next to the merged segment
+    spacing = 4 if keyframes.catmullrom.any() else 2
+    while True:
+        kept_indices = np.flatnonzero(kept)
+        last = len(kept_indices) - 1
+        if last < 2:
+            break
+        rank = np.cumsum(kept)[samples.segments] - 1
+        removal_errors = np.where(fixed[kept_indices], np.inf, -np.inf)
+        # Removing a keyframe affects the segment before it, the segment
+        # after it and their neighbors
+        for offset in (-1, 0, 1, 2):
+            removed = rank + offset
+            mask = (removed >= 1) & (removed <= last - 1)
+            r, removed = rank[mask], removed[mask]
+            start = np.where(removed == r, r - 1, r)
+            end = np.where(removed == r + 1, r + 2, r + 1)
+            previous = start - 1
+            previous = np.where(previous == removed, previous - 1, previous)
+            previous = np.where(previous < 0, start, previous)
+            next = end + 1
+            next = np.where(next == removed, next + 1, next)
+            next = np.where(next > last, end, next)
+            errors = _get_sample_errors(
+                keyframes, samples.take(mask), kept_indices, start, end,
+                previous, next, tolerance)
+            # NaN errors (keyframes that can't be evaluated) block the
+            # removal
+            with np.errstate(invalid='ignore'):
+                np.maximum.at(removal_errors, removed, errors)
+        with np.errstate(invalid='ignore'):
+            candidates = np.flatnonzero(removal_errors < tolerance.limit)
+        picked: List[int] = []
+        for i in candidates.tolist():
+            if len(picked) == 0 or i - picked[-1] >= spacing:
+                picked.append(i)
+        if len(picked) == 0:
+            break
+        kept[kept_indices[picked]] = False
+    return np.flatnonzero(kept)
+
+
+def _refine_curve_keyframes(
+        keyframes: Keyframes, samples: _CurveSamples,
+        fixed: npt.NDArray[np.bool_],
+        tolerance: ErrorTolerance) -> npt.NDArray[np.bool_]:
+    """
+    The first stage of the "DOUGLAS_PEUCKER" strategy of
+    :func:`reduce_curve_keyframes`. Returns the mask of the kept keyframes.
+    """
+    n = len(keyframes.times)
+    kept = fixed.copy()
+    segments = samples.segments
+    while True:
+        kept_indices = np.flatnonzero(kept)
+        last = len(kept_indices) - 1
+        rank = np.cumsum(kept)[segments] - 1
+        errors = _get_sample_errors(
+            keyframes, samples, kept_indices, rank, rank + 1,
+            np.maximum(rank - 1, 0), np.minimum(rank + 2, last), tolerance)
+        errors[np.isnan(errors)] = np.inf
+        # The candidate for every sample is the removed keyframe closest to
+        # it: one of the ends of its original segment or, if both of them
+        # are kept, the neighbors that change the catmull-rom segment
+        near = np.where(samples.alpha < 0.5, segments, segments + 1)
+        far = np.where(samples.alpha < 0.5, segments + 1, segments)
+        before = np.maximum(segments - 1, 0)
+        after = np.minimum(segments + 2, n - 1)
+        candidate = np.where(
+            ~kept[near], near, np.where(
+                ~kept[far], far, np.where(
+                    ~kept[before], before, np.where(
+                        ~kept[after], after, -1))))
+        violating = ~(errors < tolerance.limit) & (candidate >= 0)
+        if not violating.any():
+            break
+        # Add the candidate of the sample with the largest error in every
+        # segment
+        rank, errors = rank[violating], errors[violating]
+        candidate = candidate[violating]
+        order = np.lexsort((-errors, rank))
+        first = np.ones(len(order), dtype=np.bool_)
+        first[1:] = rank[order][1:] != rank[order][:-1]
+        kept[candidate[order][first]] = True
+    return kept
+
+
+def count_keyframes(animation_data: Dict[str, Any]) -> int:
+    """
+    Count the keyframes of a single animation. Static values count as
+    single keyframes.
+
+    :param animation_data: The animation data dictionary.
+    :returns: The number of keyframes.
+    """
+    result = 0
+    for bone in animation_data.get("bones", {}).values():
+        for timeline_type in ("rotation", "position", "scale"):
+            if timeline_type not in bone:
+                continue
+            timeline = bone[timeline_type]
+            result += len(timeline) if isinstance(timeline, dict) else 1
+    return result
+
+
+def find_error_margin(
+        get_size: Callable[[float], int], target: int,
+        max_error_margin: float = 1.0,
+        iterations: int = ERROR_MARGIN_SEARCH_ITERATIONS) -> float:
+    """
+    Binary search the smallest error margin for which the size of the
+    optimized animation (e.g. the number of keyframes) is at most the
+    target. The size is assumed to decrease with the error margin. The
+    searched value can also be a factor of all of the error settings (see
+    :func:`scale_tolerance` and :const:`MAX_TOLERANCE_SCALE`).
+
+    :param get_size: Function that optimizes the animation with given error
+        margin and returns its size.
+    :param target: The maximum allowed size.
+    :param max_error_margin: The largest error margin to consider.
+    :param iterations: The number of the steps of the search.
+    :returns: The error margin or max_error_margin if even the largest
+        error margin doesn't meet the target.
+    """
+    if get_size(0.0) <= target:
+        return 0.0
+    low, high = 0.0, max_error_margin
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        if get_size(middle) <= target:
+            high = middle
+        else:
+            low = middle
+    return high
+
+
 class AnimationOptimizer:
     """
     Class for optimizing animations by removing redundant keyframes.
     """
-    def __init__(self, error_margin: float = 0.05, animation_name: Optional[str] = None):
+    def __init__(
+            self, error_margin: float = 0.05,
+            animation_name: Optional[str] = None,
+            strategy: optimization_strategy_type = "GREEDY",
+            tolerances: Optional[Dict[timeline_type, ErrorTolerance]] = None,
+            bone_tolerances: Optional[
+                Dict[str, Dict[timeline_type, ErrorTolerance]]] = None):
         """
         Initialize the AnimationOptimizer with a specified error margin.
 
         :param error_margin: The maximum allowed error as a ratio (0-1).
         :param animation_name: If provided, only the specified animation will be optimized.
                               If None, all animations in the file will be optimized.
+        :param strategy: The keyframe reduction algorithm. "GREEDY" removes
+            keyframes that can be interpolated from their neighbors
+            (:func:`optimize_timeline`), "DOUGLAS_PEUCKER" keeps the error of
+            every removed keyframe under the error margin
+            (:func:`douglas_peucker_timeline`).
+        :param tolerances: Optional - the tolerances of the timeline types.
+            The timeline types without a tolerance use the error margin as
+            the relative tolerance.
+        :param bone_tolerances: Optional - the tolerances of the timelines of
+            specific bones (see :func:`get_hierarchy_tolerances`). They
+            replace the tolerances of the timeline types for these bones.
         """
         self.error_margin = error_margin
+        self.tolerances: Dict[timeline_type, ErrorTolerance] = {
+            "rotation": ErrorTolerance(error_margin),
+            "position": ErrorTolerance(error_margin),
+            "scale": ErrorTolerance(error_margin),
+        }
+        if tolerances is not None:
+            self.tolerances.update(tolerances)
+        self.bone_tolerances: Dict[
+            str, Dict[timeline_type, ErrorTolerance]] = (
+                {} if bone_tolerances is None else bone_tolerances)
         self.animation_name = animation_name
+        self.strategy: optimization_strategy_type = strategy
         self.total_removed = {
             "rotation": 0,
             "position": 0,
@@ -173,32 +1148,96 @@ class AnimationOptimizer:
         :param animation_data: Dictionary containing a single animation's data.
         """
 
-        for timeline_type, timeline in walk_bone_timelines(animation_data):
-            reduced = True
-            while reduced:
-                reduced = False
-                timeline_keys = list(walk_timeline_keys(timeline))
-                if len(timeline_keys) < 3:
-                    continue
-                to_remove = []
-                skip = False  # Used for skipping when the predecessor was removed
-                for i in range(1, len(timeline_keys) - 1):
-                    if skip:
-                        skip = False
-                        continue
-                    prev_key = timeline_keys[i-1]
-                    curr_key = timeline_keys[i]
-                    next_key = timeline_keys[i+1]
-                    if is_interpolation(
-                            prev_key, timeline[prev_key],
-                            curr_key, timeline[curr_key],
-                            next_key, timeline[next_key],
-                            self.error_margin):
-                        to_remove.append(curr_key)
-                        skip = True
-                for key in to_remove:
-                    del timeline[key]
-                self.total_removed[timeline_type] += len(to_remove)
-                if len(to_remove) > 0:
-                    reduced = True
+        for bone_name, timeline_type, _ in list(walk_named_bone_timelines(
+                animation_data)):
+            self.optimize_bone_timeline(
+                animation_data["bones"][bone_name], timeline_type, bone_name)
         return animation_data
+
+    def get_tolerance(
+            self, timeline_type: timeline_type,
+            bone_name: Optional[str] = None) -> ErrorTolerance:
+        """
+        Get the tolerance of a timeline.
+
+        :param timeline_type: The type of the timeline.
+        :param bone_name: Optional - the name of the bone of the timeline.
+        """
+        if bone_name is not None and bone_name in self.bone_tolerances:
+            return self.bone_tolerances[bone_name][timeline_type]
+        return self.tolerances[timeline_type]
+
+    def optimize_timeline(
+            self, timeline_type: timeline_type, timeline: dict[str, Any],
+            bone_name: Optional[str] = None):
+        """
+        Optimize a single timeline by removing redundant keyframes.
+
+        :param timeline_type: The type of the timeline.
+        :param timeline: The timeline dictionary (modified in place).
+        :param bone_name: Optional - the name of the bone of the timeline.
+        """
+        removed = _reduce_timeline(
+            timeline, self.get_tolerance(timeline_type, bone_name),
+            self.strategy)
+        self.total_removed[timeline_type] += removed
+
+    def optimize_bone_timeline(
+            self, bone: dict[str, Any], timeline_type: timeline_type,
+            bone_name: Optional[str] = None):
+        """
+        Optimize a timeline of a bone. Constant timelines (see
+        :func:`is_static`) are replaced with their static values, other
+        timelines are optimized with :meth:`optimize_timeline`.
+
+        :param bone: The bone dictionary (modified in place).
+        :param timeline_type: The type of the timeline.
+        :param bone_name: Optional - the name of the bone.
+        """
+        timeline: dict[str, Any] = bone[timeline_type]
+        if len(timeline) > 0 and self.is_static(
+                timeline_type, parse_keyframes(timeline), bone_name):
+            value = next(iter(timeline.values()))
+            if isinstance(value, dict):
+                value = value.get("post", value.get("pre"))  # type: ignore
+            bone[timeline_type] = value
+            return
+        self.optimize_timeline(timeline_type, timeline, bone_name)
+
+    def is_static(
+            self, timeline_type: timeline_type, keyframes: Keyframes,
+            bone_name: Optional[str] = None) -> bool:
+        """
+        Check if a timeline can be replaced with the "post" value of its
+        first keyframe (see :func:`is_static`). The replaced keyframes are
+        counted as removed.
+
+        :param timeline_type: The type of the timeline.
+        :param keyframes: The keyframes of the timeline.
+        :param bone_name: Optional - the name of the bone of the timeline.
+        :returns: Whether the timeline is constant.
+        """
+        if not is_static(
+                keyframes, self.get_tolerance(timeline_type, bone_name)):
+            return False
+        self.total_removed[timeline_type] += len(keyframes.times) - 1
+        return True
+
+    def reduce_keyframes(
+            self, timeline_type: timeline_type, keyframes: Keyframes,
+            bone_name: Optional[str] = None) -> npt.NDArray[np.intp]:
+        """
+        Find the keyframes of a timeline that have to be kept. Works like
+        :meth:`optimize_timeline` but on a timeline which is already parsed
+        into arrays.
+
+        :param timeline_type: The type of the timeline.
+        :param keyframes: The keyframes sorted by time.
+        :param bone_name: Optional - the name of the bone of the timeline.
+        :returns: The indices of the kept keyframes in ascending order.
+        """
+        kept = reduce_keyframes(
+            keyframes, self.get_tolerance(timeline_type, bone_name),
+            self.strategy)
+        self.total_removed[timeline_type] += len(keyframes.times) - len(kept)
+        return kept
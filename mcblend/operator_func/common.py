@@ -77,6 +77,47 @@ class ObjectId(NamedTuple):
     name: str
     bone_name: str
 
+def get_local_rotation(child_matrix: Matrix, parent_matrix: Matrix) -> Euler:
+    '''
+    Returns Euler rotation of a child matrix in relation to parent matrix
+    '''
+    # The transformations with 0 scale return better results when
+    # calculated differently. This is an ugly patch that fixes the
+    # test cases. I don't know if it actually makes things better
+    # in every situation, but at the same time I don't really know why
+    # these two solutions aren't equivalent.
+    child_scale = child_matrix.to_scale()
+    parent_scale = parent_matrix.to_scale()
+    epsilon = 0.00001
+    is_near_zero_scale = (
+        abs(child_scale.x) < epsilon or
+        abs(child_scale.y) < epsilon or
+        abs(child_scale.z) < epsilon or
+        abs(parent_scale.x) < epsilon or
+        abs(parent_scale.y) < epsilon or
+        abs(parent_scale.z) < epsilon
+    )
+    if is_near_zero_scale:
+        child_q = child_matrix.to_quaternion()
+        parent_q = parent_matrix.inverted_safe().to_quaternion()
+        return (parent_q @ child_q).to_euler('XZY')
+    return (parent_matrix.inverted_safe() @ child_matrix).to_euler('XZY')
+
+class ObjectTransforms(NamedTuple):
+    '''
+    Transformations of a :class:`McblendObject` in a single frame cached by
+    :class:`McblendObjectGroup`. The matrices shouldn't be modified.
+    '''
+    world_matrix: Matrix
+    '''The equivalent of :code:`McblendObject.obj_matrix_world`.'''
+    normalized_matrix: Matrix
+    '''The world_matrix with normalized rotation and scale.'''
+    pivot: Vector
+    '''
+    The pivot point of the object in Blender coordinates (see
+    :code:`McblendObject.mcpivot`).
+    '''
+
 class McblendObject:
     '''
     A class that wraps Blender objects (meshes, empties and bones) and
@@ -220,18 +261,7 @@ class McblendObject:
         The copy of the translation matrix (matrix_world) of the blender
         wrapped inside this object.
         '''
-        this_obj_matrix_world = self.thisobj.matrix_world.copy()
-        if self.group.world_origin is not None:
-            this_obj_matrix_world = (
-                self.group.world_origin.matrix_world.inverted() @
-                this_obj_matrix_world
-            )
-        if self.thisobj.type == 'ARMATURE':
-            return (
-                this_obj_matrix_world @
-                self.thisobj.pose.bones[self.thisobj_id.bone_name].matrix.copy()
-            )
-        return this_obj_matrix_world
+        return self.group.get_transforms(self.thisobj_id).world_matrix.copy()
 
     @property
     def mcube_size(self) -> NumpyTable:
@@ -256,26 +286,8 @@ class McblendObject:
         '''
         The pivot point of Minecraft object exported using this object.
         '''
-        def local_crds(
-                parent: McblendObject, child: McblendObject
-            ) -> Vector:
-            '''Local coordinates of child matrix inside parent matrix'''
-            # Applying normalize() function to matrix world of parent and child
-            # suppose to fix some errors with scaling but tests doesn't show any
-            # difference.
-            # It does fix the issue #62 so PLEASE don't change it again!
-            return child.get_local_matrix(
-                parent, normalize=True).to_translation()
-
-        def _get_mcpivot(objprop: McblendObject) -> Vector:
-            if objprop.parent is not None:
-                result = local_crds(objprop.parent, objprop)
-                result = result + _get_mcpivot(objprop.parent)
-            else:
-                result = objprop.obj_matrix_world.to_translation()
-            return result
-
-        return np.array(_get_mcpivot(self).xzy)
+        # The pivot is calculated in McblendObjectGroup.get_transforms
+        return np.array(self.group.get_transforms(self.thisobj_id).pivot.xzy)
 
     def get_local_matrix(
             self, other: Optional[McblendObject] = None, normalize: bool = False
@@ -291,17 +303,20 @@ class McblendObject:
             (see github issue #62 and #71)
         :returns: translation matrix of this object.
         '''
+        c_transforms = self.group.get_transforms(self.thisobj_id)
         if other is not None:
-            p_matrix = other.obj_matrix_world
+            p_transforms = self.group.get_transforms(other.thisobj_id)
+            p_matrix = (
+                p_transforms.normalized_matrix if normalize
+                else p_transforms.world_matrix)
         else:
             p_matrix = (
                 # pylint: disable=no-value-for-parameter
                 Matrix()
             )
-        c_matrix = self.obj_matrix_world
-        if normalize:
-            p_matrix.normalize()
-            c_matrix.normalize()
+        c_matrix = (
+            c_transforms.normalized_matrix if normalize
+            else c_transforms.world_matrix)
         # The inver_safe() function is used to avoid errors when the parent
         # matrix is scaled to zero on some axis (which makes it non-invertible)
         # It's not perfect becuase the child transformations will be incorrect
@@ -322,40 +337,14 @@ class McblendObject:
         :returns: numpy array with the rotation of this object in Minecraft
             format.
         '''
-        def local_rotation(
-                child_matrix: Matrix, parent_matrix: Matrix
-            ) -> Euler:
-            '''
-            Returns Euler rotation of a child matrix in relation to parent matrix
-            '''
-            # The transformations with 0 scale return better results when
-            # calculated differently. This is an ugly patch that fixes the
-            # test cases. I don't know if it actually makes things better
-            # in every situation, but at the same time I don't really know why
-            # these two solutions aren't equivalent.
-            child_scale = child_matrix.to_scale()
-            parent_scale = parent_matrix.to_scale()
-            epsilon = 0.00001
-            is_near_zero_scale = (
-                abs(child_scale.x) < epsilon or
-                abs(child_scale.y) < epsilon or
-                abs(child_scale.z) < epsilon or
-                abs(parent_scale.x) < epsilon or
-                abs(parent_scale.y) < epsilon or
-                abs(parent_scale.z) < epsilon
-            )
-            if is_near_zero_scale:
-                child_q = child_matrix.to_quaternion()
-                parent_q = parent_matrix.inverted_safe().to_quaternion()
-                return (parent_q @ child_q).to_euler('XZY')
-            return (parent_matrix.inverted_safe() @ child_matrix).to_euler('XZY')
-
+        world_matrix = self.group.get_transforms(self.thisobj_id).world_matrix
         if other is not None:
-            result_euler = local_rotation(
-                self.obj_matrix_world, other.obj_matrix_world
+            result_euler = get_local_rotation(
+                world_matrix,
+                self.group.get_transforms(other.thisobj_id).world_matrix
             )
         else:
-            result_euler = self.obj_matrix_world.to_euler('XZY')
+            result_euler = world_matrix.to_euler('XZY')
         result: NumpyTable = np.array(result_euler)[[0, 2, 1]]
         result = result * np.array([1, -1, 1])
         result = result * 180/math.pi  # type: ignore
@@ -805,8 +794,71 @@ class McblendObjectGroup:
         self.data = {}
         '''the content of the group.'''
         self.world_origin = world_origin
+        self._transforms_cache: dict[ObjectId, ObjectTransforms] = {}
+        self._transforms_cache_frame: tuple[int, float] | None = None
+        self._world_origin_inverted: Matrix | None = None
         self._load_objects(armature)
 
+    def clear_transforms_cache(self):
+        '''
+        Clears the cache used by :meth:`get_transforms`. The cache is cleared
+        automatically when the frame of the scene changes. This method should
+        be used when the transformations of the objects change in other way.
+        '''
+        self._transforms_cache.clear()
+        self._transforms_cache_frame = None
+        self._world_origin_inverted = None
+
+    def get_transforms(self, key: ObjectId) -> ObjectTransforms:
+        '''
+        Returns the transformations of the object in the current frame of
+        the scene. The transformations of each object are calculated only
+        once per frame (the objects are visited in topological order - the
+        transformations of the parent are always calculated before the
+        transformations of its children).
+
+        :param key: the :class:`ObjectId` of the object.
+        '''
+        scene = bpy.context.scene
+        frame = (scene.frame_current, scene.frame_subframe)
+        if frame != self._transforms_cache_frame:
+            self.clear_transforms_cache()
+            self._transforms_cache_frame = frame
+        if key in self._transforms_cache:
+            return self._transforms_cache[key]
+        objprop = self.data[key]
+        parent_transforms: ObjectTransforms | None = None
+        # The same as McblendObject.parent
+        if objprop.parentobj_id is not None and objprop.parentobj_id in self:
+            parent_transforms = self.get_transforms(objprop.parentobj_id)
+        # World matrix
+        thisobj = objprop.thisobj
+        world_matrix = thisobj.matrix_world.copy()
+        if self.world_origin is not None:
+            if self._world_origin_inverted is None:
+                self._world_origin_inverted = (
+                    self.world_origin.matrix_world.inverted())
+            world_matrix = self._world_origin_inverted @ world_matrix
+        if thisobj.type == 'ARMATURE':
+            world_matrix = (
+                world_matrix @ thisobj.pose.bones[key.bone_name].matrix)
+        normalized_matrix = world_matrix.normalized()
+        # Pivot
+        if parent_transforms is not None:
+            # Applying normalize() function to matrix world of parent and
+            # child suppose to fix some errors with scaling but tests doesn't
+            # show any difference.
+            # It does fix the issue #62 so PLEASE don't change it again!
+            pivot = (
+                parent_transforms.normalized_matrix.inverted_safe() @
+                normalized_matrix
+            ).to_translation() + parent_transforms.pivot
+        else:
+            pivot = world_matrix.to_translation()
+        result = ObjectTransforms(world_matrix, normalized_matrix, pivot)
+        self._transforms_cache[key] = result
+        return result
+
     def get_world_origin_matrix(self):
         '''
         Returns the matrix_world of the world_origin object or rises an
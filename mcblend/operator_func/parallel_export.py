@@ -0,0 +1,139 @@
+'''
+Exporting multiple animations in parallel using background Blender processes
+(workers).
+'''
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import bpy
+from bpy.types import Context, Object
+
+from .typed_bpy_access import get_mcblend
+from .animation import get_animation_file_dict
+
+class WorkerResult(NamedTuple):
+    '''The result of exporting a single animation by a worker.'''
+    animation_index: int
+    '''The index of the animation in the animations list of the armature.'''
+    animations: Dict[str, Any]
+    '''The "animations" dict of the exported animation file.'''
+    warnings: List[str]
+    '''The warnings generated during the export.'''
+
+def merge_animation_dicts(
+        old_dict: Optional[Dict[str, Any]],
+        results: List[WorkerResult]) -> Dict[str, Any]:
+    '''
+    Merges the animations exported by the workers into a single animation
+    file. The result is the same as the result of exporting the animations
+    one by one in the order of their indices, each time writing into the
+    result of the previous export.
+
+    :param old_dict: optional - JSON dict with animation to write into.
+    :param results: the results of the workers.
+    :returns: JSON dict of Minecraft animations.
+    '''
+    result = get_animation_file_dict(old_dict)
+    for worker_result in sorted(results, key=lambda r: r.animation_index):
+        result['animations'].update(worker_result.animations)
+    return result
+
+def export_animations_in_parallel(
+        context: Context, armature: Object, animation_indices: List[int],
+        workers: int) -> List[WorkerResult]:
+    '''
+    Exports animations of the armature using multiple background Blender
+    processes. The current state of the Blender file (including unsaved
+    changes) is saved to a temporary file which is opened by the workers.
+
+    :param context: the context of running the operator.
+    :param armature: the armature with the animations.
+    :param animation_indices: the indices of the animations to export.
+    :param workers: the number of worker processes.
+    :returns: the results of exporting the animations sorted by their
+        indices.
+    '''
+    with tempfile.TemporaryDirectory(prefix='mcblend_') as tmp:
+        blend_path = os.path.join(tmp, 'source.blend')
+        bpy.ops.wm.save_as_mainfile(  # pyright: ignore[reportUnknownMemberType]
+            filepath=blend_path, copy=True, check_existing=False)
+        # Code executed by the workers after opening the file
+        python_expr = (
+            f'import importlib; importlib.import_module({__name__!r})'
+            '.run_worker()')
+        processes: List[tuple[subprocess.Popen[bytes], str, str]] = []
+        for job_id in range(workers):
+            job = animation_indices[job_id::workers]
+            if len(job) == 0:
+                continue
+            output_path = os.path.join(tmp, f'job_{job_id}.json')
+            log_path = os.path.join(tmp, f'job_{job_id}.log')
+            with open(log_path, 'w', encoding='utf8') as log:
+                process = subprocess.Popen(  # pylint: disable=consider-using-with
+                    [
+                        bpy.app.binary_path, '-b', blend_path,
+                        '--python-exit-code', '1',
+                        '--python-expr', python_expr, '--',
+                        output_path, context.scene.name, armature.name,
+                        *(str(i) for i in job)
+                    ],
+                    stdout=log, stderr=subprocess.STDOUT)
+            processes.append((process, output_path, log_path))
+        results: List[WorkerResult] = []
+        try:
+            for process, output_path, log_path in processes:
+                return_code = process.wait()
+                if return_code != 0 or not os.path.exists(output_path):
+                    with open(log_path, 'r', encoding='utf8') as log:
+                        log_tail = log.read()[-2000:]
+                    raise RuntimeError(
+                        f'Worker process failed with exit code {return_code}:'
+                        f'\n{log_tail}')
+                with open(output_path, 'r', encoding='utf8') as f:
+                    results.extend(
+                        WorkerResult(*item) for item in json.load(f))
+        finally:
+            # Don't leave the workers running after a failure
+            for process, _, _ in processes:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+    return sorted(results, key=lambda r: r.animation_index)
+
+def run_worker():
+    '''
+    The main function of the worker process. Exports the animations with
+    indices passed in the command line arguments (after "--") and saves the
+    results in a JSON file.
+
+    Arguments: output_path, scene_name, armature_name, *animation_indices
+    '''
+    # pylint: disable=import-outside-toplevel, cyclic-import
+    from ..operator import load_animation_properties
+    from . import export_animation
+
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    output_path, scene_name, armature_name = argv[:3]
+    animation_indices = [int(i) for i in argv[3:]]
+
+    context = bpy.context
+    context.window.scene = bpy.data.scenes[scene_name]
+    armature = bpy.data.objects[armature_name]
+    context.view_layer.objects.active = armature
+    mcblend_data = get_mcblend(armature)
+    results: List[WorkerResult] = []
+    for i in animation_indices:
+        animation = mcblend_data.animations[i]
+        mcblend_data.active_animation = i
+        load_animation_properties(animation, context)
+        animation_dict, warnings = export_animation(context, None)
+        results.append(WorkerResult(
+            i, animation_dict['animations'], list(warnings)))
+    with open(output_path, 'w', encoding='utf8') as f:
+        json.dump(results, f)
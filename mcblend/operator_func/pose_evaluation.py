@@ -0,0 +1,493 @@
+'''
+Evaluation of the poses of armatures directly from the F-curves of their
+animations, without changing the frame of the scene.
+'''
+from __future__ import annotations
+
+import math
+import re
+from typing import Dict, List, NamedTuple, Optional, Set, cast
+
+import numpy as np
+import numpy.typing as npt
+
+from bpy.types import Action, ActionSlot, Armature, FCurve, Object, Scene
+from bpy_extras import anim_utils
+
+from .common import NumpyTable
+
+BONE_TRANSFORMATION_PATTERN = re.compile(
+    r'pose\.bones\[(?:\'|")([^\]]+)(?:\'|")\]\.([a-zA-Z0-9_]+)')
+'''
+Pattern for extracting the name of the bone and the name of the property
+from the data path of an F-curve.
+'''
+
+POSE_BONE_PATTERN = re.compile(r'pose\.bones\[(?:\'|")([^\]]+)(?:\'|")\]')
+'''
+Pattern for extracting the name of the bone from the data path of any
+property of a pose bone (including its constraints and custom properties).
+'''
+
+_OBJECT_TRANSFORMATIONS = frozenset((
+    'location', 'rotation_euler', 'rotation_quaternion', 'rotation_axis_angle',
+    'scale', 'delta_location', 'delta_rotation_euler',
+    'delta_rotation_quaternion', 'delta_scale'))
+'''The data paths of the transformations of objects.'''
+
+_CHANNEL_SIZES: Dict[str, int] = {
+    'location': 3,
+    'rotation_quaternion': 4,
+    'rotation_euler': 3,
+    'rotation_axis_angle': 4,
+    'scale': 3,
+}
+'''The properties of the pose bones that can be evaluated from F-curves.'''
+
+_FLT_EPSILON = float(np.finfo(np.float32).eps)
+
+class _FCurveChannel(NamedTuple):
+    '''F-curve that animates a single value of a pose bone property.'''
+    fcurve: FCurve
+    bone_index: int
+    property_name: str
+    array_index: int
+
+class _StripTimeMapping(NamedTuple):
+    '''
+    The properties of an NLA strip used for converting the frame of the scene
+    to the frame of the action of the strip.
+    '''
+    frame_start: float
+    frame_end: float
+    action_frame_start: float
+    action_frame_end: float
+    scale: float
+    repeat: float
+
+    def get_action_frame(self, frame: float) -> float:
+        '''
+        Returns the frame of the action evaluated by the strip at the given
+        frame of the scene. This replicates the NLA evaluation in Blender for
+        strips with the "Hold" extrapolation which aren't reversed.
+        '''
+        # Hold extrapolation
+        frame = min(max(frame, self.frame_start), self.frame_end)
+        action_length = self.action_frame_end - self.action_frame_start
+        if abs(action_length) < _FLT_EPSILON:
+            action_length = 1.0
+        scale = abs(self.scale)
+        # Prevents snapping back to the first frame of the action at the
+        # end of the strip when the number of repeats is a whole number.
+        if (
+                abs(frame - self.frame_end) < _FLT_EPSILON and
+                abs(self.repeat - math.floor(self.repeat)) < _FLT_EPSILON):
+            return self.action_frame_end
+        return self.action_frame_start + math.fmod(
+            frame - self.frame_start, action_length * scale) / scale
+
+def _get_fcurves(action: Action, slot: ActionSlot | None) -> List[FCurve]:
+    '''Returns the F-curves of the action assigned to the slot.'''
+    channelbag = anim_utils.action_get_channelbag_for_slot(action, slot)
+    if channelbag is None:
+        return []
+    return list(channelbag.fcurves)
+
+def get_moving_bones(
+        armature: Object, relative_to_armature: bool) -> Optional[Set[str]]:
+    '''
+    Returns the names of the pose bones of the armature which can change
+    their transformations relative to their parents during the animation.
+    The root bones are compared to the world space or to the armature. The
+    result is conservative - it may contain bones that don't move, but
+    never skips a bone that does.
+
+    A bone can move if:
+
+    - it's animated with F-curves or drivers of any of its properties
+      (including the properties of its constraints) in the action or in any
+      of the NLA strips of the armature,
+    - it has constraints, or it's a part of the chain of an IK constraint,
+    - its parent can move and it doesn't inherit the full transformations of
+      the parent,
+    - it's a root bone, the armature object can move and the bones aren't
+      measured relative to the armature.
+
+    :param armature: the armature.
+    :param relative_to_armature: whether the transformations of the root
+        bones are measured relative to the armature object.
+    :returns: the names of the pose bones or None if the animation can't be
+        analyzed (all of the bones should be treated as moving).
+    '''
+    # pylint: disable=too-many-branches
+    armature_data = cast(Armature, armature.data)
+    data_animation = armature_data.animation_data
+    if data_animation is not None and (
+            data_animation.action is not None or
+            len(data_animation.drivers) > 0 or
+            len(data_animation.nla_tracks) > 0):
+        return None
+    animated: Set[str] = set()
+    object_moves = armature.parent is not None or len(armature.constraints) > 0
+    anim_data = armature.animation_data
+    if anim_data is not None:
+        fcurves: List[FCurve] = []
+        if anim_data.action is not None:
+            fcurves.extend(
+                _get_fcurves(anim_data.action, anim_data.action_slot))
+        for track in anim_data.nla_tracks:
+            for strip in track.strips:
+                if strip.type == 'META':
+                    return None
+                if strip.action is not None:
+                    fcurves.extend(
+                        _get_fcurves(strip.action, strip.action_slot))
+        data_paths = [fcurve.data_path for fcurve in fcurves] + [
+            driver.data_path for driver in anim_data.drivers]
+        for data_path in data_paths:
+            match = POSE_BONE_PATTERN.match(data_path)
+            if match is not None:
+                animated.add(match.group(1))
+            elif data_path in _OBJECT_TRANSFORMATIONS:
+                object_moves = True
+            else:
+                # Animation of other properties (e.g. the custom properties
+                # of the armature used by the drivers of other objects)
+                return None
+    pose_bones = armature.pose.bones
+    for pose_bone in pose_bones:
+        if len(pose_bone.constraints) == 0:
+            continue
+        animated.add(pose_bone.name)
+        for constraint in pose_bone.constraints:
+            if constraint.type not in ('IK', 'SPLINE_IK'):
+                continue
+            # Chain length 0 means the whole chain up to the root bone
+            chain_count: int = constraint.chain_count  # type: ignore
+            parent = pose_bone.parent
+            length = 1
+            while parent is not None and (
+                    chain_count == 0 or length < chain_count):
+                animated.add(parent.name)
+                parent = parent.parent
+                length += 1
+    moving: Dict[str, bool] = {}
+    def can_move(name: str) -> bool:
+        if name in moving:
+            return moving[name]
+        pose_bone = pose_bones[name]
+        bone = pose_bone.bone
+        if name in animated:
+            result = True
+        elif pose_bone.parent is None:
+            result = object_moves and not relative_to_armature
+        elif (
+                bone.use_inherit_rotation and
+                bone.inherit_scale == 'FULL' and
+                not bone.use_relative_parent):
+            # Moves together with the parent
+            result = False
+        else:
+            result = can_move(pose_bone.parent.name)
+        moving[name] = result
+        return result
+    return {
+        pose_bone.name for pose_bone in pose_bones
+        if can_move(pose_bone.name)}
+
+def _quaternion_to_matrix(quaternions: NumpyTable) -> NumpyTable:
+    '''
+    Converts an array of quaternions (w, x, y, z) with shape (n, 4) to an
+    array of rotation matrices with shape (n, 3, 3). The quaternions are
+    normalized first (like in Blender).
+    '''
+    length = np.linalg.norm(quaternions, axis=1)
+    valid = length > 1e-10
+    q = np.tile(np.array([1.0, 0.0, 0.0, 0.0]), (len(quaternions), 1))
+    q[valid] = quaternions[valid] / length[valid, np.newaxis]
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    return np.stack([
+        np.stack([1 - 2*(y*y + z*z), 2*(x*y - w*z), 2*(x*z + w*y)], axis=1),
+        np.stack([2*(x*y + w*z), 1 - 2*(x*x + z*z), 2*(y*z - w*x)], axis=1),
+        np.stack([2*(x*z - w*y), 2*(y*z + w*x), 1 - 2*(x*x + y*y)], axis=1),
+    ], axis=1)
+
+def _axis_angle_to_matrix(axis_angles: NumpyTable) -> NumpyTable:
+    '''
+    Converts an array of rotations in the axis-angle format
+    (angle, x, y, z) with shape (n, 4) to an array of rotation matrices with
+    shape (n, 3, 3). Rotations with zero-length axis are converted to
+    identity matrices (like in Blender).
+    '''
+    angle = axis_angles[:, 0]
+    axis = axis_angles[:, 1:]
+    length = np.linalg.norm(axis, axis=1)
+    valid = length > 1e-10
+    axis = np.where(
+        valid[:, np.newaxis], axis / np.where(valid, length, 1.0)[:, np.newaxis],
+        0.0)
+    angle = np.where(valid, angle, 0.0)
+    cos, sin = np.cos(angle), np.sin(angle)
+    x, y, z = axis[:, 0], axis[:, 1], axis[:, 2]
+    skew = np.zeros((len(axis_angles), 3, 3))
+    skew[:, 0, 1], skew[:, 0, 2] = -z, y
+    skew[:, 1, 0], skew[:, 1, 2] = z, -x
+    skew[:, 2, 0], skew[:, 2, 1] = -y, x
+    return (
+        cos[:, np.newaxis, np.newaxis] * np.eye(3) +
+        sin[:, np.newaxis, np.newaxis] * skew +
+        (1 - cos)[:, np.newaxis, np.newaxis] *
+        (axis[:, :, np.newaxis] * axis[:, np.newaxis, :]))
+
+def _euler_to_matrix(eulers: NumpyTable, order: str) -> NumpyTable:
+    '''
+    Converts an array of Euler rotations with shape (n, 3) to an array of
+    rotation matrices with shape (n, 3, 3). The order uses the same format
+    as the rotation_mode of Blender objects (e.g. 'XYZ' means that the
+    rotation around the X axis is applied first).
+    '''
+    n = len(eulers)
+    cos, sin = np.cos(eulers), np.sin(eulers)
+    axis_matrices: Dict[str, NumpyTable] = {}
+    for i, (axis, a, b) in enumerate((('X', 1, 2), ('Y', 2, 0), ('Z', 0, 1))):
+        matrix = np.zeros((n, 3, 3))
+        matrix[:, i, i] = 1.0
+        matrix[:, a, a] = cos[:, i]
+        matrix[:, b, b] = cos[:, i]
+        matrix[:, a, b] = -sin[:, i]
+        matrix[:, b, a] = sin[:, i]
+        axis_matrices[axis] = matrix
+    result = axis_matrices[order[0]]
+    for axis in order[1:]:
+        result = axis_matrices[axis] @ result
+    return result
+
+class FCurvePoseEvaluator:
+    '''
+    Calculates the pose matrices of the bones of an armature (the same as
+    :code:`PoseBone.matrix`) directly from the F-curves of its animation.
+    This is much faster than changing the frame of the scene with
+    :code:`scene.frame_set` but it's only possible for simple rigs. Use
+    :meth:`create` to get the evaluator for an armature, it returns None if
+    the pose of the armature can't be reliably evaluated this way.
+
+    :param armature: the armature.
+    :param channels: the F-curves that animate the pose bones.
+    :param strip: optional - the time mapping of the NLA strip with the
+        animation. If None the F-curves are evaluated directly at the frame
+        of the scene.
+    '''
+    def __init__(
+            self, armature: Object, channels: List[_FCurveChannel],
+            strip: Optional[_StripTimeMapping]):
+        self.channels = channels
+        self.strip = strip
+        pose_bones = armature.pose.bones
+        n = len(pose_bones)
+        pose_bone_indices = {
+            pose_bone.name: i for i, pose_bone in enumerate(pose_bones)}
+        # The values of the properties that aren't animated
+        self.static_values: Dict[str, NumpyTable] = {
+            property_name: np.array([
+                list(getattr(pose_bone, property_name))
+                for pose_bone in pose_bones
+            ], dtype=np.float64).reshape(n, size)
+            for property_name, size in _CHANNEL_SIZES.items()
+        }
+        self.rotation_modes: List[str] = [
+            pose_bone.rotation_mode for pose_bone in pose_bones]
+        self.connected = np.array([
+            pose_bone.bone.use_connect and pose_bone.bone.parent is not None
+            for pose_bone in pose_bones
+        ], dtype=bool)
+        self.parent_indices = np.array([
+            -1 if pose_bone.parent is None
+            else pose_bone_indices[pose_bone.parent.name]
+            for pose_bone in pose_bones
+        ], dtype=np.int64)
+        # The rest pose matrices of the bones relative to their parents
+        matrix_local = np.array([
+            np.array(pose_bone.bone.matrix_local) for pose_bone in pose_bones
+        ]).reshape(n, 4, 4)
+        self.rest_offsets = matrix_local.copy()
+        has_parent = self.parent_indices >= 0
+        self.rest_offsets[has_parent] = (
+            np.linalg.inv(matrix_local[self.parent_indices[has_parent]]) @
+            matrix_local[has_parent])
+        # Split the bones into the levels of the hierarchy (parents are
+        # always in the lower level than their children)
+        depth = np.zeros(n, dtype=np.int64)
+        for i in range(n):
+            parent = self.parent_indices[i]
+            while parent >= 0:
+                depth[i] += 1
+                parent = self.parent_indices[parent]
+        self.levels: List[npt.NDArray[np.intp]] = [
+            np.flatnonzero(depth == d)
+            for d in range(int(depth.max()) + 1 if n > 0 else 0)]
+
+    @staticmethod
+    def create(armature: Object, scene: Scene) -> Optional[FCurvePoseEvaluator]:
+        '''
+        Creates an evaluator for the armature if its pose can be evaluated
+        directly from the F-curves. Returns None otherwise.
+
+        The pose is evaluated from the F-curves only if the armature:
+
+        - isn't parented to other object and doesn't have constraints,
+        - doesn't use drivers and its data (the Armature) isn't animated,
+        - has no bone constraints (including IK),
+        - has bones that inherit the full transformations of their parents,
+        - is animated only with the transformations of the pose bones, either
+          with an active action or a single NLA strip (without blending).
+
+        :param armature: the armature.
+        :param scene: the scene of the animation.
+        '''
+        # pylint: disable=too-many-return-statements, too-many-branches
+        if armature.parent is not None or len(armature.constraints) > 0:
+            return None
+        armature_data = cast(Armature, armature.data)
+        if armature_data.pose_position != 'POSE':
+            return None
+        data_animation = armature_data.animation_data
+        if data_animation is not None and (
+                data_animation.action is not None or
+                len(data_animation.drivers) > 0 or
+                len(data_animation.nla_tracks) > 0):
+            return None
+        render = scene.render
+        if render.frame_map_old != render.frame_map_new:
+            return None
+        for pose_bone in armature.pose.bones:
+            if len(pose_bone.constraints) > 0:
+                return None
+            bone = pose_bone.bone
+            if not bone.use_local_location:
+                return None
+            if bone.parent is not None and (
+                    not bone.use_inherit_rotation or
+                    bone.inherit_scale != 'FULL' or
+                    bone.use_relative_parent):
+                return None
+        anim_data = armature.animation_data
+        if anim_data is None:
+            return FCurvePoseEvaluator(armature, [], None)
+        if len(anim_data.drivers) > 0 or anim_data.use_tweak_mode:
+            return None
+        if any(track.is_solo for track in anim_data.nla_tracks):
+            return None
+        strips = [
+            strip for track in anim_data.nla_tracks if not track.mute
+            for strip in track.strips]
+        fcurves: List[FCurve] = []
+        strip_mapping: Optional[_StripTimeMapping] = None
+        # When there are NLA tracks the action is evaluated like a strip
+        # which holds the values outside of the frame range of the action.
+        # It's equivalent to the direct evaluation only for F-curves with
+        # constant extrapolation.
+        constant_extrapolation_only = False
+        if anim_data.action is not None:
+            if len(strips) > 0:
+                return None
+            if len(anim_data.nla_tracks) > 0:
+                if (
+                        anim_data.action_blend_type != 'REPLACE' or
+                        anim_data.action_influence != 1.0 or
+                        anim_data.action_extrapolation != 'HOLD'):
+                    return None
+                constant_extrapolation_only = True
+            fcurves = _get_fcurves(anim_data.action, anim_data.action_slot)
+        elif len(strips) == 1:
+            strip = strips[0]
+            if (
+                    strip.type != 'CLIP' or strip.action is None or
+                    strip.mute or strip.use_reverse or
+                    strip.blend_type != 'REPLACE' or
+                    strip.extrapolation != 'HOLD' or
+                    strip.use_animated_influence or
+                    strip.use_animated_time or
+                    strip.blend_in != 0.0 or strip.blend_out != 0.0):
+                return None
+            strip_mapping = _StripTimeMapping(
+                frame_start=strip.frame_start,
+                frame_end=strip.frame_end,
+                action_frame_start=strip.action_frame_start,
+                action_frame_end=strip.action_frame_end,
+                scale=strip.scale,
+                repeat=strip.repeat)
+            fcurves = _get_fcurves(strip.action, strip.action_slot)
+        elif len(strips) > 1:
+            return None
+        pose_bone_indices = {
+            pose_bone.name: i
+            for i, pose_bone in enumerate(armature.pose.bones)}
+        channels: List[_FCurveChannel] = []
+        for fcurve in fcurves:
+            if fcurve.mute:
+                continue
+            match = BONE_TRANSFORMATION_PATTERN.fullmatch(fcurve.data_path)
+            if match is None:
+                # Animation of other properties (e.g. the location of the
+                # armature object)
+                return None
+            bone_name, property_name = match.group(1), match.group(2)
+            if property_name not in _CHANNEL_SIZES:
+                return None
+            if bone_name not in pose_bone_indices:
+                continue  # Doesn't affect anything
+            if constant_extrapolation_only and (
+                    fcurve.extrapolation != 'CONSTANT' or
+                    len(fcurve.modifiers) > 0):
+                return None
+            if fcurve.array_index >= _CHANNEL_SIZES[property_name]:
+                continue
+            channels.append(_FCurveChannel(
+                fcurve, pose_bone_indices[bone_name], property_name,
+                fcurve.array_index))
+        return FCurvePoseEvaluator(armature, channels, strip_mapping)
+
+    def evaluate(self, frame: float) -> NumpyTable:
+        '''
+        Evaluates the pose of the armature at the given frame (including the
+        subframe).
+
+        :param frame: the frame of the scene.
+        :returns: array with shape (n, 4, 4) with the pose matrices of the
+            bones in the order of :code:`armature.pose.bones`.
+        '''
+        if self.strip is not None:
+            frame = self.strip.get_action_frame(frame)
+        values = {k: v.copy() for k, v in self.static_values.items()}
+        for channel in self.channels:
+            values[channel.property_name][
+                channel.bone_index, channel.array_index
+            ] = channel.fcurve.evaluate(frame)
+        n = len(self.rotation_modes)
+        rotations = np.zeros((n, 3, 3))
+        for mode in set(self.rotation_modes):
+            mask = np.array([m == mode for m in self.rotation_modes])
+            if mode == 'QUATERNION':
+                rotations[mask] = _quaternion_to_matrix(
+                    values['rotation_quaternion'][mask])
+            elif mode == 'AXIS_ANGLE':
+                rotations[mask] = _axis_angle_to_matrix(
+                    values['rotation_axis_angle'][mask])
+            else:
+                rotations[mask] = _euler_to_matrix(
+                    values['rotation_euler'][mask], mode)
+        # The local transformations of the bones (location @ rotation @ scale)
+        channel_matrices = np.zeros((n, 4, 4))
+        channel_matrices[:, :3, :3] = (
+            rotations * values['scale'][:, np.newaxis, :])
+        # The location of the connected bones is ignored
+        channel_matrices[:, :3, 3] = np.where(
+            self.connected[:, np.newaxis], 0.0, values['location'])
+        channel_matrices[:, 3, 3] = 1.0
+        local_matrices = self.rest_offsets @ channel_matrices
+        pose_matrices = local_matrices.copy()
+        for level in self.levels[1:]:
+            pose_matrices[level] = (
+                pose_matrices[self.parent_indices[level]] @
+                local_matrices[level])
+        return pose_matrices
@@ -0,0 +1,186 @@
+'''
+Optional profiling of the stages of the operators. The profiling is enabled
+by setting the MCBLEND_PROFILE_REPORT environment variable to a path of a
+JSON file. Every profiled operation adds an entry with the wall time, the
+number of calls and the peak memory usage of its stages to that file.
+
+When the profiling is disabled, the stages don't do anything.
+'''
+from __future__ import annotations
+
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import (
+    Any, Callable, ContextManager, Dict, Iterator, List, Optional, TypeVar,
+    cast)
+
+PROFILE_REPORT_ENV = 'MCBLEND_PROFILE_REPORT'
+'''
+The name of the environment variable with the path to the profiling report.
+'''
+
+@dataclass
+class StageStats:
+    '''
+    Statistics of a single stage of the profiled operation. The statistics
+    of a stage include the stages nested in it.
+    '''
+    calls: int = 0
+    '''The number of times the stage was executed.'''
+    wall_time: float = 0.0
+    '''Total wall time of the stage in seconds.'''
+    peak_memory: int = 0
+    '''
+    The highest increase of the memory allocated by Python during a single
+    execution of the stage, in bytes.
+    '''
+
+@dataclass
+class _RunningStage:
+    '''A stage which is currently running.'''
+    name: str
+    start_time: float
+    start_memory: int
+    peak_memory: int
+
+@dataclass
+class Profiler:
+    '''
+    Collects the statistics of the stages of a single operation.
+
+    :param operation: the name of the profiled operation.
+    '''
+    operation: str
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    _stack: List[_RunningStage] = field(default_factory=list)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        '''
+        Context manager that measures the stage of the operation.
+
+        :param name: the name of the stage.
+        '''
+        # tracemalloc has a single peak counter, so the peak of the parent
+        # stage is saved before resetting it
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        if len(self._stack) > 0:
+            parent = self._stack[-1]
+            parent.peak_memory = max(parent.peak_memory, peak_memory)
+        tracemalloc.reset_peak()
+        running = _RunningStage(
+            name, time.perf_counter(), current_memory, current_memory)
+        self._stack.append(running)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            _, peak_memory = tracemalloc.get_traced_memory()
+            peak_memory = max(running.peak_memory, peak_memory)
+            if len(self._stack) > 0:
+                parent = self._stack[-1]
+                parent.peak_memory = max(parent.peak_memory, peak_memory)
+            stats = self.stages.setdefault(name, StageStats())
+            stats.calls += 1
+            stats.wall_time += time.perf_counter() - running.start_time
+            stats.peak_memory = max(
+                stats.peak_memory, peak_memory - running.start_memory)
+
+    def json(self) -> Dict[str, Any]:
+        '''Returns the JSON dict with the statistics of the operation.'''
+        return {
+            'operation': self.operation,
+            'stages': {
+                name: {
+                    'calls': stats.calls,
+                    'wall_time': stats.wall_time,
+                    'peak_memory': stats.peak_memory,
+                }
+                for name, stats in self.stages.items()
+            }
+        }
+
+_active_profiler: Optional[Profiler] = None
+
+def profile_stage(name: str) -> ContextManager[None]:
+    '''
+    Returns a context manager that measures a stage of the currently
+    profiled operation. If there is no profiled operation, the context
+    manager doesn't do anything.
+
+    :param name: the name of the stage.
+    '''
+    if _active_profiler is None:
+        return nullcontext()
+    return _active_profiler.stage(name)
+
+def _save_report(path: str, profiler: Profiler):
+    '''
+    Adds the statistics of the operation to the report file. If the file
+    doesn't exist or isn't a valid report, a new report is created.
+    '''
+    operations: List[Any] = []
+    try:
+        with open(path, 'r', encoding='utf8') as f:
+            report = json.load(f)
+        if isinstance(report['operations'], list):
+            operations = report['operations']
+    except (json.JSONDecodeError, OSError, TypeError, LookupError):
+        pass
+    operations.append(profiler.json())
+    with open(path, 'w', encoding='utf8') as f:
+        json.dump({'operations': operations}, f, indent=4)
+
+@contextmanager
+def profile_operation(name: str) -> Iterator[None]:
+    '''
+    Context manager that profiles an operation if the profiling is enabled
+    (see :data:`PROFILE_REPORT_ENV`). The whole operation is measured as a
+    stage with the name of the operation. Operations nested in other
+    operations are measured as stages.
+
+    :param name: the name of the operation.
+    '''
+    global _active_profiler  # pylint: disable=global-statement
+    report_path = os.environ.get(PROFILE_REPORT_ENV, '')
+    if report_path == '' or _active_profiler is not None:
+        with profile_stage(name):
+            yield
+        return
+    profiler = Profiler(name)
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    _active_profiler = profiler
+    try:
+        with profiler.stage(name):
+            yield
+    finally:
+        _active_profiler = None
+        if started_tracemalloc:
+            tracemalloc.stop()
+        _save_report(report_path, profiler)
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+def profiled_execute(name: str) -> Callable[[F], F]:
+    '''
+    Decorator for the execute methods of the operators that profiles every
+    call of the method as an operation (see :func:`profile_operation`). The
+    wrapper keeps the (self, context) signature because Blender validates
+    the number of arguments of the methods of the registered classes.
+
+    :param name: the name of the operation.
+    '''
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def execute(self: Any, context: Any) -> Any:
+            with profile_operation(name):
+                return func(self, context)
+        return cast(F, execute)
+    return decorator
@@ -743,7 +743,22 @@ class MCBLEND_PT_AnimationPropertiesPanel(Panel):
                     active_anim,  # type: ignore
                     "interpolation_mode",
                     text="Interpolation Mode")
+                col.prop(
+                    active_anim,  # type: ignore
+                    "pose_sampling_mode",
+                    text="Pose Sampling")
                 col.prop(active_anim, "frame_slice_pattern")
+                row = col.row()
+                row.prop(
+                    active_anim,  # type: ignore
+                    "use_adaptive_sampling", text="Adaptive Sampling")
+                if active_anim.use_adaptive_sampling:
+                    row.prop(
+                        active_anim,  # type: ignore
+                        "adaptive_sampling_error", text="")
+                    row.prop(
+                        active_anim,  # type: ignore
+                        "adaptive_sampling_min_step", text="")
                 col.prop(
                     bpy.context.scene,  # type: ignore
                     "frame_start", text="Frame start")
@@ -761,8 +776,42 @@ class MCBLEND_PT_AnimationPropertiesPanel(Panel):
                 if active_anim.optimize_animation:
                     row = box.row()
                     row.prop(
+                        active_anim,  # type: ignore
+                        "optimization_budget_mode", text="Budget")
+                    if active_anim.optimization_budget_mode != 'NONE':
+                        row.prop(
+                            active_anim,  # type: ignore
+                            "optimization_budget", text="")
+                    # With a budget, the error settings are scaled by the
+                    # search of the budget
+                    box.prop(
                         active_anim,  # type: ignore
                         "optimization_error", text="Error Margin (%)")
+                    box.prop(
+                        active_anim,  # type: ignore
+                        "optimization_strategy", text="Strategy")
+                    box.prop(
+                        active_anim,  # type: ignore
+                        "position_error_absolute", text="Position Error")
+                    box.prop(
+                        active_anim,  # type: ignore
+                        "scale_error_absolute", text="Scale Error")
+                    row = box.row()
+                    row.prop(
+                        active_anim,  # type: ignore
+                        "use_angular_rotation_error", text="Angular Rotation Error")
+                    if active_anim.use_angular_rotation_error:
+                        row.prop(
+                            active_anim,  # type: ignore
+                            "rotation_error_degrees", text="")
+                    row = box.row()
+                    row.prop(
+                        active_anim,  # type: ignore
+                        "use_hierarchy_error", text="Hierarchy Error")
+                    if active_anim.use_hierarchy_error:
+                        row.prop(
+                            active_anim,  # type: ignore
+                            "hierarchy_error_distance", text="")
 
 # "Other" operators panel
 class MCBLEND_PT_OperatorsPanel(Panel):
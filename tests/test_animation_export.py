@@ -9,9 +9,13 @@ from pathlib import Path
 import typing as tp
 
 import pytest
-from .common import blender_run_script
+from .common import blender_run_script, compare_json_files
 
 SCRIPT = Path('blender_scripts/export_animation.py').resolve()
+ARMATURES_SCRIPT = Path(
+    'blender_scripts/export_armatures_animations.py').resolve()
+CACHE_SCRIPT = Path('blender_scripts/animation_cache.py').resolve()
+BUDGET_SCRIPT = Path('blender_scripts/export_animation_budget.py').resolve()
 TMP=Path(".tmp/test_animation_export").resolve()
 EXAMPLES = Path(f'tests/data/test_animation_export').resolve()
 BLEND_PROJECT = Path('tests/data/tests_project.blend').resolve()
@@ -41,6 +45,74 @@ def make_comparison_files(scene: str) -> tp.Tuple[tp.Dict, str]:
 
     return output_dict, expected_dict  # type: ignore
 
+def export_with_pose_sampling_mode(scene: str, mode: str) -> tp.Dict:
+    '''
+    Opens blender file, selects_scene and exports animation from that using
+    given pose sampling mode.
+
+    Returns the result JSON in a dictionary.
+    '''
+    TMP.mkdir(parents=True, exist_ok=True)
+    output = TMP / f'{scene}.{mode.lower()}.animation.json'
+    blender_run_script(
+        SCRIPT.as_posix(), scene, output.as_posix(), mode,
+        blend_file_path=BLEND_PROJECT.as_posix()
+    )
+    with output.open('r') as f:
+        return json.load(f)
+
+def export_unnamed_animation_with_budget(
+        scene: str, budget: int) -> tp.Dict:
+    '''
+    Opens blender file, selects_scene and exports animation from that without
+    the animation name with given keyframe budget (0 for the default error
+    margin instead of the budget).
+
+    Returns the JSON dict of the exported animation.
+    '''
+    TMP.mkdir(parents=True, exist_ok=True)
+    output = TMP / f'{scene}.budget_{budget}.animation.json'
+    blender_run_script(
+        BUDGET_SCRIPT.as_posix(), scene, output.as_posix(), str(budget),
+        blend_file_path=BLEND_PROJECT.as_posix()
+    )
+    with output.open('r') as f:
+        return json.load(f)['animations']['animation.']
+
+def count_keyframes(animation: tp.Dict) -> int:
+    '''Counts the keyframes of the animation (static values count as one).'''
+    return sum(
+        len(timeline) if isinstance(timeline, dict) else 1
+        for bone in animation.get('bones', {}).values()
+        for timeline_type, timeline in bone.items()
+        if timeline_type in ('rotation', 'position', 'scale')
+    )
+
+def export_armatures_animations(
+        scene: str, copies: int = 0
+    ) -> tp.Tuple[tp.Dict[str, tp.Dict], tp.Dict[str, tp.Dict]]:
+    '''
+    Opens blender file, selects_scene, adds given number of copies of its
+    armatures and exports the animations of all of the armatures at once and
+    then every armature alone.
+
+    Returns two dictionaries with the result JSON dicts of both exports
+    (keyed by the names of the armatures).
+    '''
+    output = TMP / f'{scene}_armatures_{copies}'
+    (output / 'single').mkdir(parents=True, exist_ok=True)
+    blender_run_script(
+        ARMATURES_SCRIPT.as_posix(), scene, output.as_posix(), str(copies),
+        blend_file_path=BLEND_PROJECT.as_posix()
+    )
+    def load_results(directory: Path) -> tp.Dict[str, tp.Dict]:
+        results = {}
+        for path in directory.glob('*.animation.json'):
+            with path.open('r') as f:
+                results[path.name[:-len('.animation.json')]] = json.load(f)
+        return results
+    return load_results(output), load_results(output / 'single')
+
 # PYTEST FUNCTIONS
 SCENES = [
     # 'armature_transformation_test',  # TODO - investigate unexpected results
@@ -72,3 +144,75 @@ def scene(request):
 def test_animation_export(scene):
     result_dict, expected_result = make_comparison_files(scene)
     assert result_dict == expected_result
+
+def test_bulk_pose_sampling(scene):
+    # The bulk sampling (and evaluating F-curves without changing the frame
+    # of the scene for simple rigs) should give the same results as reading
+    # the poses bone by bone.
+    precise = export_with_pose_sampling_mode(scene, 'PRECISE')
+    bulk = export_with_pose_sampling_mode(scene, 'BULK')
+    # The comparison only checks the keys of the first argument, so it's
+    # done in both directions to catch the extra keyframes and bones
+    compare_json_files(precise, bulk, atol=0.002)
+    compare_json_files(bulk, precise, atol=0.002)
+
+@pytest.mark.parametrize('copies', [0, 2])
+def test_export_armatures_animations(scene, copies):
+    # Exporting the animations of all armatures of the scene in a single
+    # pass should give the same result for every armature as exporting its
+    # animation alone
+    results, single_results = export_armatures_animations(scene, copies)
+    assert len(single_results) > 0
+    assert results.keys() == single_results.keys()
+    for name, result in results.items():
+        assert result == single_results[name]
+    # The tested armature keeps its expected result
+    _, expected_result = make_comparison_files(scene)
+    assert expected_result in results.values()
+
+def test_unnamed_animation_budget():
+    # The animations without names are optimized after the export (with all
+    # of the other animations of the file). The budget must be met by that
+    # result, so it can't exceed the size reached with the default error
+    # margin when that size is used as the budget.
+    optimized = export_unnamed_animation_with_budget(
+        'animation_optimization', 0)
+    budget = count_keyframes(optimized)
+    result = export_unnamed_animation_with_budget(
+        'animation_optimization', budget)
+    assert count_keyframes(result) <= budget
+
+def test_cache_key_depends_on_child_objects():
+    # The animations exported with the hierarchy error depend on the objects
+    # parented to the bones, moving them must invalidate the cache
+    TMP.mkdir(parents=True, exist_ok=True)
+    output = TMP / 'cache.animation.json'
+    keys_path = TMP / 'cache_keys.json'
+    blender_run_script(
+        CACHE_SCRIPT.as_posix(), 'ArmatureAnimation', output.as_posix(),
+        keys_path.as_posix(), blend_file_path=BLEND_PROJECT.as_posix()
+    )
+    with keys_path.open('r') as f:
+        keys_before, keys_after = json.load(f)
+    assert len(keys_before) == 1
+    assert len(keys_after) == 1
+    assert keys_before != keys_after
+
+def test_profile_report(monkeypatch):
+    # The profiling report is written when the MCBLEND_PROFILE_REPORT
+    # environment variable is set
+    TMP.mkdir(parents=True, exist_ok=True)
+    report_path = TMP / 'profile_report.json'
+    monkeypatch.setenv('MCBLEND_PROFILE_REPORT', report_path.as_posix())
+    make_comparison_files('ArmatureAnimation')
+    with report_path.open('r') as f:
+        report = json.load(f)
+    operation = report['operations'][-1]
+    assert operation['operation'] == 'export_animation'
+    stages = operation['stages']
+    for stage in (
+            'export_animation', 'load_poses', 'frame_set', 'animation_json',
+            'json_bone', 'json_dump'):
+        assert stages[stage]['calls'] > 0
+        assert stages[stage]['wall_time'] >= 0
+        assert stages[stage]['peak_memory'] >= 0
@@ -0,0 +1,597 @@
+'''
+Tests and a benchmark for the animation optimizer. The optimizer doesn't use
+Blender, so these tests run without it.
+
+Run the benchmark with:
+```
+python -m pytest tests/test_animation_optimization.py -s
+```
+'''
+import bisect
+import copy
+import importlib.util
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+# The module is loaded directly from the file because importing the mcblend
+# package requires Blender
+MODULE_PATH = Path(
+    'mcblend/operator_func/animation_optimization.py').resolve()
+_spec = importlib.util.spec_from_file_location(
+    'animation_optimization', MODULE_PATH)
+assert _spec is not None and _spec.loader is not None
+animation_optimization = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(animation_optimization)
+
+DATA_DIRS = [
+    Path('tests/data/test_animation_export').resolve(),
+    Path('tests/data/test_batch_export').resolve(),
+]
+OPTIMIZATION_DATA = Path(
+    'tests/data/test_animation_export/animation_optimization.animation.json'
+).resolve()
+
+def reference_optimize_timeline(
+        timeline: Dict[str, Any], error_margin: float) -> int:
+    '''
+    The original implementation of the optimizer (one keyframe at a time)
+    used as the reference for the results of optimize_timeline.
+    '''
+    removed = 0
+    reduced = True
+    while reduced:
+        reduced = False
+        timeline_keys = list(
+            animation_optimization.walk_timeline_keys(timeline))
+        if len(timeline_keys) < 3:
+            continue
+        to_remove = []
+        skip = False
+        for i in range(1, len(timeline_keys) - 1):
+            if skip:
+                skip = False
+                continue
+            prev_key = timeline_keys[i-1]
+            curr_key = timeline_keys[i]
+            next_key = timeline_keys[i+1]
+            if animation_optimization.is_interpolation(
+                    prev_key, timeline[prev_key],
+                    curr_key, timeline[curr_key],
+                    next_key, timeline[next_key],
+                    error_margin):
+                to_remove.append(curr_key)
+                skip = True
+        for key in to_remove:
+            del timeline[key]
+        removed += len(to_remove)
+        if len(to_remove) > 0:
+            reduced = True
+    return removed
+
+def load_timelines(linear: bool = True) -> List[Dict[str, Any]]:
+    '''
+    Loads the timelines from the test data. If linear is True, only the
+    timelines without the keyframes with "pre" and "post" values are
+    loaded, otherwise only the timelines with such keyframes.
+    '''
+    timelines: List[Dict[str, Any]] = []
+    for data_dir in DATA_DIRS:
+        for path in sorted(data_dir.glob('*.json')):
+            with path.open('r') as f:
+                data = json.load(f)
+            for animation in data['animations'].values():
+                for _, timeline in animation_optimization.walk_bone_timelines(
+                        animation):
+                    has_dicts = any(
+                        isinstance(v, dict) for v in timeline.values())
+                    if has_dicts != linear:
+                        timelines.append(timeline)
+    return timelines
+
+def densify_timeline(
+        timeline: Dict[str, Any], fps: float, repeats: int,
+        rng: np.random.Generator) -> Dict[str, Any]:
+    '''
+    Creates a long timeline by sampling the linear interpolation of the
+    timeline with given FPS and repeating it. A small noise is added to the
+    values so that not all of the keyframes are removed in the first pass.
+    '''
+    keys = sorted(timeline.keys(), key=float)
+    times = np.array([float(k) for k in keys])
+    values = np.array([
+        timeline[k] if isinstance(timeline[k], list) else timeline[k]['post']
+        for k in keys], dtype=np.float64)
+    length = times[-1]
+    sample_times = np.arange(0, length * repeats, 1 / fps)
+    local_times = np.mod(sample_times, length)
+    samples = np.stack([
+        np.interp(local_times, times, values[:, i]) for i in range(3)], axis=1)
+    samples += rng.normal(0, 0.01, samples.shape)
+    return {
+        str(round(t, 4)): [round(v, 3) for v in row]
+        for t, row in zip(sample_times.tolist(), samples.tolist())
+    }
+
+def random_timeline(n: int, rng: np.random.Generator) -> Dict[str, Any]:
+    '''Creates a random timeline with some Molang keyframes.'''
+    times = np.cumsum(rng.uniform(0.01, 0.2, n))
+    values = np.cumsum(rng.normal(0, 1, (n, 3)), axis=0)
+    # Some linear segments
+    linear = rng.random(n) < 0.5
+    values[1:][linear[1:]] = values[:-1][linear[1:]] + 0.5
+    timeline: Dict[str, Any] = {}
+    for t, row in zip(times.tolist(), np.round(values, 3).tolist()):
+        if rng.random() < 0.05:
+            timeline[str(round(t, 4))] = ["math.sin(query.anim_time)", 0, 0]
+        else:
+            timeline[str(round(t, 4))] = [
+                int(v) if v == int(v) else v for v in row]
+    return timeline
+
+@pytest.mark.parametrize('error_margin', [0.0, 0.01, 0.05, 0.2])
+def test_same_keyframes_as_reference_on_test_data(error_margin):
+    for timeline in load_timelines():
+        expected = copy.deepcopy(timeline)
+        result = copy.deepcopy(timeline)
+        expected_removed = reference_optimize_timeline(expected, error_margin)
+        removed = animation_optimization.optimize_timeline(
+            result, error_margin)
+        assert removed == expected_removed
+        assert list(result.items()) == list(expected.items())
+
+@pytest.mark.parametrize('error_margin', [0.01, 0.05, 0.2])
+def test_same_keyframes_as_reference_on_random_data(error_margin):
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        timeline = random_timeline(int(rng.integers(0, 60)), rng)
+        expected = copy.deepcopy(timeline)
+        result = copy.deepcopy(timeline)
+        expected_removed = reference_optimize_timeline(expected, error_margin)
+        removed = animation_optimization.optimize_timeline(
+            result, error_margin)
+        assert removed == expected_removed
+        assert list(result.items()) == list(expected.items())
+
+def get_max_error(
+        original: Dict[str, Any], optimized: Dict[str, Any]) -> float:
+    '''
+    Returns the largest error of interpolating the removed keyframes of the
+    original timeline from the keyframes of the optimized timeline.
+    '''
+    kept = sorted(optimized.keys(), key=float)
+    kept_times = [float(k) for k in kept]
+    max_error = 0.0
+    for key, value in original.items():
+        if key in optimized:
+            continue
+        time_ = float(key)
+        i = int(np.searchsorted(kept_times, time_))
+        prev, next = np.array(optimized[kept[i-1]]), np.array(optimized[kept[i]])
+        ratio = (time_ - kept_times[i-1]) / (kept_times[i] - kept_times[i-1])
+        alternative = prev + ratio * (next - prev)
+        error = np.linalg.norm(np.array(value) - alternative) / max(
+            np.linalg.norm(next - prev), 0.00001)
+        max_error = max(max_error, float(error))
+    return max_error
+
+@pytest.mark.parametrize('error_margin', [0.01, 0.05, 0.2])
+def test_douglas_peucker_error_bound(error_margin):
+    rng = np.random.default_rng(1)
+    timelines = load_timelines() + [
+        random_timeline(int(rng.integers(0, 60)), rng) for _ in range(200)]
+    for timeline in timelines:
+        optimized = copy.deepcopy(timeline)
+        removed = animation_optimization.douglas_peucker_timeline(
+            optimized, error_margin)
+        assert removed == len(timeline) - len(optimized)
+        # The keyframes which aren't vectors are never removed
+        for key, value in timeline.items():
+            if not animation_optimization.is_vector(value):
+                assert key in optimized
+        assert get_max_error(timeline, optimized) < error_margin
+
+def test_benchmark():
+    with OPTIMIZATION_DATA.open('r') as f:
+        data = json.load(f)
+    rng = np.random.default_rng(0)
+    timelines = [
+        densify_timeline(timeline, 60, 20, rng)
+        for animation in data['animations'].values()
+        for _, timeline in animation_optimization.walk_bone_timelines(
+            animation)
+        if len(timeline) > 1
+    ]
+    original_timelines = copy.deepcopy(timelines)
+    reference_timelines = copy.deepcopy(timelines)
+
+    start = time.perf_counter()
+    for timeline in reference_timelines:
+        reference_optimize_timeline(timeline, 0.05)
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for timeline in timelines:
+        animation_optimization.optimize_timeline(timeline, 0.05)
+    numpy_time = time.perf_counter() - start
+
+    dp_timelines = copy.deepcopy(original_timelines)
+    start = time.perf_counter()
+    for timeline in dp_timelines:
+        animation_optimization.douglas_peucker_timeline(timeline, 0.05)
+    dp_time = time.perf_counter() - start
+
+    keys = sum(len(t) for t in timelines)
+    dp_keys = sum(len(t) for t in dp_timelines)
+    print(
+        f'\nOptimized {len(timelines)} timelines: '
+        f'reference {reference_time:.3f}s, numpy {numpy_time:.3f}s '
+        f'({keys} keyframes left), Douglas-Peucker {dp_time:.3f}s '
+        f'({dp_keys} keyframes left)')
+    assert timelines == reference_timelines
+
+def random_curve_timeline(
+        n: int, rng: np.random.Generator) -> Dict[str, Any]:
+    '''
+    Creates a random timeline with linear, step and catmull-rom keyframes,
+    the same way as they're exported by Mcblend.
+    '''
+    times = np.cumsum(rng.uniform(0.01, 0.2, n))
+    velocity = rng.normal(0, 1, (n, 3))
+    # Long parts with the same velocity
+    velocity[rng.random(n) < 0.8] = 0
+    values = np.round(
+        np.cumsum(np.cumsum(velocity, axis=0), axis=0) +
+        rng.normal(0, 0.01, (n, 3)), 3).tolist()
+    # 0 - step, 1 - linear, 2 - smooth (runs of the same interpolation)
+    interpolations = np.repeat(rng.integers(0, 3, n), 4)[:n].tolist()
+    timeline: Dict[str, Any] = {}
+    for i, t in enumerate(times.tolist()):
+        key = str(round(t, 4))
+        if i in (0, n - 1):
+            timeline[key] = values[i]
+        elif rng.random() < 0.02:
+            timeline[key] = ["math.sin(query.anim_time)", 0, 0]
+        elif interpolations[i - 1] == 0:
+            timeline[key] = {"pre": values[i - 1], "post": values[i]}
+        elif interpolations[i] == 2 and interpolations[i - 1] == 2:
+            timeline[key] = {"post": values[i], "lerp_mode": "catmullrom"}
+        elif interpolations[i] == 2:
+            timeline[key] = {
+                "pre": values[i], "post": values[i],
+                "lerp_mode": "catmullrom"}
+        else:
+            timeline[key] = values[i]
+    return timeline
+
+def evaluate_curve(
+        timeline: Dict[str, Any], time_: float, left: bool
+    ) -> Tuple[np.ndarray, float]:
+    '''
+    Evaluates the timeline the same way as Bedrock. The left argument
+    decides which side of a keyframe is evaluated at the time of the
+    keyframe. Returns the value and the distance between the ends of the
+    evaluated segment.
+    '''
+    keys = sorted(timeline.keys(), key=float)
+    times = [float(k) for k in keys]
+    pre = [np.array(timeline[k].get('pre', timeline[k]['post']))
+        if isinstance(timeline[k], dict) else np.array(timeline[k])
+        for k in keys]
+    post = [np.array(timeline[k]['post'])
+        if isinstance(timeline[k], dict) else np.array(timeline[k])
+        for k in keys]
+    if left:
+        i = bisect.bisect_left(times, time_) - 1
+    else:
+        i = bisect.bisect_right(times, time_) - 1
+    i = min(max(i, 0), len(keys) - 2)
+    a = (time_ - times[i]) / (times[i + 1] - times[i])
+    p0, p1 = post[max(i - 1, 0)], post[i]
+    p2, p3 = pre[i + 1], pre[min(i + 2, len(keys) - 1)]
+    value = timeline[keys[i]]
+    if isinstance(value, dict) and value.get('lerp_mode') == 'catmullrom':
+        result = 0.5 * (
+            2 * p1 + (p2 - p0) * a + (2 * p0 - 5 * p1 + 4 * p2 - p3) * a**2 +
+            (3 * p1 - p0 - 3 * p2 + p3) * a**3)
+    else:
+        result = p1 + a * (p2 - p1)
+    return result, float(np.linalg.norm(p2 - p1))
+
+def get_max_curve_error(
+        original: Dict[str, Any], optimized: Dict[str, Any]) -> float:
+    '''
+    Returns the largest error of the curve of the optimized timeline
+    compared to the original curve, at the points compared by the
+    optimizer.
+    '''
+    keys = sorted(original.keys(), key=float)
+    parts = 1
+    if any(
+            isinstance(original[k], dict) and
+            original[k].get('lerp_mode') == 'catmullrom' for k in keys[:-1]):
+        parts = animation_optimization.CATMULLROM_SAMPLES
+    max_error = 0.0
+    for start, end in zip(keys[:-1], keys[1:]):
+        for alpha in np.linspace(0, 1, parts + 1).tolist():
+            time_ = (1 - alpha) * float(start) + alpha * float(end)
+            left = alpha > 0.5
+            expected, _ = evaluate_curve(original, time_, left)
+            value, movement = evaluate_curve(optimized, time_, left)
+            error = np.linalg.norm(value - expected) / max(movement, 0.00001)
+            max_error = max(max_error, float(error))
+    return max_error
+
+def is_evaluated(value: Any) -> bool:
+    '''Checks if the optimizer can evaluate the keyframe.'''
+    if isinstance(value, dict):
+        return all(
+            animation_optimization.is_vector(v)
+            for k, v in value.items() if k in ('pre', 'post'))
+    return animation_optimization.is_vector(value)
+
+@pytest.mark.parametrize('strategy', ['GREEDY', 'DOUGLAS_PEUCKER'])
+@pytest.mark.parametrize('error_margin', [0.01, 0.05, 0.2])
+def test_curve_error_bound(strategy, error_margin):
+    rng = np.random.default_rng(2)
+    timelines = load_timelines(linear=False) + [
+        random_curve_timeline(int(rng.integers(3, 80)), rng)
+        for _ in range(200)]
+    removed = 0
+    for timeline in timelines:
+        optimized = copy.deepcopy(timeline)
+        optimizer = animation_optimization.AnimationOptimizer(
+            error_margin, strategy=strategy)
+        optimizer.optimize_timeline('position', optimized)
+        removed += len(timeline) - len(optimized)
+        assert optimizer.total_removed['position'] == (
+            len(timeline) - len(optimized))
+        # The kept keyframes are unchanged
+        for key, value in optimized.items():
+            assert timeline[key] == value
+        for key in timeline.keys():
+            if not is_evaluated(timeline[key]):
+                assert key in optimized
+        if all(is_evaluated(v) for v in timeline.values()):
+            assert get_max_curve_error(timeline, optimized) < (
+                error_margin + 1e-9)
+    # The keyframes with "pre" and "post" values are optimized too
+    assert removed > 0
+
+def test_rotation_angles():
+    a = np.array([[0, 0, 0], [0, 90, 0], [30, 45, 60], [90, 0, 0]], float)
+    b = np.array([[10, 0, 0], [0, -270, 0], [30, 45, 60], [0, 0, 0]], float)
+    angles = animation_optimization.get_rotation_angles(a, b)
+    assert np.allclose(angles, [10, 0, 0, 90], atol=1e-6)
+
+@pytest.mark.parametrize('strategy', ['GREEDY', 'DOUGLAS_PEUCKER'])
+def test_angular_rotation_error(strategy):
+    rng = np.random.default_rng(3)
+    # Slow rotation with noise smaller than the angular threshold
+    times = np.arange(200) / 20
+    rotations = np.stack([
+        np.sin(times) * 3, times * 0.5, np.zeros_like(times)], axis=1)
+    rotations += rng.normal(0, 0.02, rotations.shape)
+    timeline = {
+        str(round(t, 4)): np.round(r, 3).tolist()
+        for t, r in zip(times.tolist(), rotations)}
+    relative = copy.deepcopy(timeline)
+    animation_optimization.AnimationOptimizer(
+        0.05, strategy=strategy).optimize_timeline('rotation', relative)
+    angular = copy.deepcopy(timeline)
+    tolerance = animation_optimization.ErrorTolerance(0.05, angular=1.0)
+    optimizer = animation_optimization.AnimationOptimizer(
+        0.05, strategy=strategy, tolerances={'rotation': tolerance})
+    optimizer.optimize_timeline('rotation', angular)
+    assert len(angular) < len(relative)
+    if strategy == 'DOUGLAS_PEUCKER':
+        kept = sorted(angular.keys(), key=float)
+        kept_times = [float(k) for k in kept]
+        kept_values = np.array([angular[k] for k in kept])
+        original_times = [float(k) for k in timeline.keys()]
+        interpolated = np.stack([
+            np.interp(original_times, kept_times, kept_values[:, i])
+            for i in range(3)], axis=1)
+        angles = animation_optimization.get_rotation_angles(
+            interpolated, np.array(list(timeline.values())))
+        assert angles.max() < 1.0
+
+def test_absolute_error():
+    # Small movements are removed with the absolute threshold even if
+    # their relative error is large
+    timeline = {
+        str(i / 10): [0, 0.001 * (i % 2), 0] for i in range(20)}
+    relative = copy.deepcopy(timeline)
+    animation_optimization.AnimationOptimizer(0.05).optimize_timeline(
+        'position', relative)
+    assert len(relative) == len(timeline)
+    absolute = copy.deepcopy(timeline)
+    optimizer = animation_optimization.AnimationOptimizer(0.05, tolerances={
+        'position': animation_optimization.ErrorTolerance(0.05, absolute=0.01)
+    })
+    optimizer.optimize_timeline('position', absolute)
+    assert len(absolute) == 2
+
+def test_lever_lengths():
+    pivots = {
+        'root': np.array([0.0, 0.0, 0.0]),
+        'arm': np.array([0.0, 10.0, 0.0]),
+        'hand': np.array([0.0, 10.0, 8.0]),
+        'finger': np.array([0.0, 10.0, 9.0]),
+    }
+    parents = {
+        'root': None, 'arm': 'root', 'hand': 'arm', 'finger': 'hand'}
+    lever_lengths = animation_optimization.get_lever_lengths(pivots, parents)
+    assert lever_lengths['root'] == pytest.approx((10 ** 2 + 9 ** 2) ** 0.5)
+    assert lever_lengths['arm'] == pytest.approx(9.0)
+    assert lever_lengths['hand'] == pytest.approx(1.0)
+    assert lever_lengths['finger'] == 0.0
+
+def test_lever_lengths_with_points():
+    # A long cube with the pivot at the pivot of the bone limits the
+    # rotation of the bone with its corners
+    pivots = {
+        'bone': np.array([0.0, 0.0, 0.0]),
+        'cube': np.array([0.0, 0.0, 0.0]),
+    }
+    parents = {'bone': None, 'cube': 'bone'}
+    points = {'cube': np.array([
+        [x, y, z] for x in (-1.0, 1.0) for y in (0.0, 12.0)
+        for z in (-1.0, 1.0)])}
+    assert animation_optimization.get_lever_lengths(
+        pivots, parents)['bone'] == 0.0
+    lever_lengths = animation_optimization.get_lever_lengths(
+        pivots, parents, points)
+    tip = (12 ** 2 + 1 + 1) ** 0.5
+    assert lever_lengths['bone'] == pytest.approx(tip)
+    assert lever_lengths['cube'] == pytest.approx(tip)
+    # The tolerance keeps the displacement of the tip of the cube under the
+    # limit, unlike the fallback lever of the bones without descendants
+    tolerance = animation_optimization.get_hierarchy_tolerances(
+        lever_lengths['bone'], 0.1)['rotation']
+    fallback = animation_optimization.get_hierarchy_tolerances(
+        0.0, 0.1)['rotation']
+    assert tolerance.angular < fallback.angular
+    assert 2 * tip * np.sin(np.radians(tolerance.angular) / 2) == (
+        pytest.approx(0.1))
+    assert 2 * tip * np.sin(np.radians(fallback.angular) / 2) > 1.0
+
+def test_chain_lengths():
+    parents = {
+        'root': None, 'spine': 'root', 'arm': 'spine', 'hand': 'arm',
+        'leg': 'root'}
+    assert animation_optimization.get_chain_lengths(parents) == {
+        'root': 4, 'spine': 4, 'arm': 4, 'hand': 4, 'leg': 2}
+
+def test_hierarchy_error():
+    # The same rotation noise is removed from a short bone and kept on a
+    # bone that moves distant descendants
+    rng = np.random.default_rng(5)
+    times = np.arange(100) / 20
+    rotations = np.stack([
+        times * 10, np.zeros_like(times), np.zeros_like(times)], axis=1)
+    rotations += rng.normal(0, 0.1, rotations.shape)
+    timeline = {
+        str(round(t, 4)): np.round(r, 3).tolist()
+        for t, r in zip(times.tolist(), rotations)}
+    optimizer = animation_optimization.AnimationOptimizer(
+        0.05, bone_tolerances={
+            'root': animation_optimization.get_hierarchy_tolerances(
+                100.0, 0.1),
+            'finger': animation_optimization.get_hierarchy_tolerances(
+                0.0, 0.1),
+        })
+    root = copy.deepcopy(timeline)
+    optimizer.optimize_timeline('rotation', root, 'root')
+    finger = copy.deepcopy(timeline)
+    optimizer.optimize_timeline('rotation', finger, 'finger')
+    assert len(finger) < len(root)
+    # The displacement of the descendants stays under the limit
+    kept = sorted(root.keys(), key=float)
+    kept_values = np.array([root[k] for k in kept])
+    interpolated = np.stack([
+        np.interp(times, [float(k) for k in kept], kept_values[:, i])
+        for i in range(3)], axis=1)
+    angles = np.radians(animation_optimization.get_rotation_angles(
+        interpolated, np.array(list(timeline.values()))))
+    assert (2 * 100.0 * np.sin(angles / 2)).max() < 0.1
+
+def _noisy_rotation_animation(bones: List[str]) -> Dict[str, Any]:
+    '''Creates an animation with the same noisy rotation of the bones.'''
+    rng = np.random.default_rng(7)
+    times = np.arange(100) / 20
+    rotations = np.stack([
+        times * 10, np.zeros_like(times), np.zeros_like(times)], axis=1)
+    rotations += rng.normal(0, 0.1, rotations.shape)
+    timeline = {
+        str(round(t, 4)): np.round(r, 3).tolist()
+        for t, r in zip(times.tolist(), rotations)}
+    return {'bones': {
+        bone: {'rotation': copy.deepcopy(timeline)} for bone in bones}}
+
+@pytest.mark.parametrize('mode', ['HIERARCHY', 'ANGULAR'])
+def test_budget_scales_tolerances(mode):
+    # The search of the size budget must scale the tolerances that replace
+    # the error margin (hierarchy and angular), otherwise the size doesn't
+    # depend on the searched value
+    animation = _noisy_rotation_animation(['root', 'arm', 'hand'])
+    lever_lengths = {'root': 40.0, 'arm': 20.0, 'hand': 5.0}
+    chain_lengths = {'root': 3, 'arm': 3, 'hand': 3}
+    def create_optimizer(scale: float):
+        if mode == 'HIERARCHY':
+            return animation_optimization.AnimationOptimizer(
+                0.0, bone_tolerances=(
+                    animation_optimization.get_bones_hierarchy_tolerances(
+                        lever_lengths, chain_lengths, 0.05 * scale)))
+        tolerance = animation_optimization.scale_tolerance(
+            animation_optimization.ErrorTolerance(0.05, angular=0.1), scale)
+        return animation_optimization.AnimationOptimizer(
+            tolerance.relative, tolerances={'rotation': tolerance})
+    def get_size(scale: float) -> int:
+        optimized = copy.deepcopy(animation)
+        create_optimizer(scale)._optimize_single_animation(optimized)
+        return animation_optimization.count_keyframes(optimized)
+    original = animation_optimization.count_keyframes(animation)
+    largest = get_size(animation_optimization.MAX_TOLERANCE_SCALE)
+    assert get_size(1.0) > largest
+    target = (get_size(1.0) + largest) // 2
+    scale = animation_optimization.find_error_margin(
+        get_size, target,
+        max_error_margin=animation_optimization.MAX_TOLERANCE_SCALE)
+    assert 1.0 < scale < animation_optimization.MAX_TOLERANCE_SCALE
+    assert get_size(scale) <= target < original
+
+def test_scale_tolerance():
+    tolerance = animation_optimization.scale_tolerance(
+        animation_optimization.ErrorTolerance(
+            0.2, absolute=0.5, angular=30.0), 10.0)
+    assert tolerance.relative == 1.0
+    assert tolerance.absolute == pytest.approx(5.0)
+    assert tolerance.angular == 180.0
+
+def test_static_timelines():
+    animation = {'animations': {'animation.test': {'bones': {'bone': {
+        'position': {'0': [0, 1, 0], '1': [0, 1, 0], '2': [0, 1, 0]},
+        'rotation': {
+            '0': [0, 0, 0], '1': {'pre': [0, 0, 0], 'post': [0, 0, 0.001]},
+            '2': [0, 0, 0.001]},
+        'scale': {'0': [1, 1, 1], '1': [1, 1, 1], '2': [2, 1, 1]},
+    }}}}}
+    optimizer = animation_optimization.AnimationOptimizer(0.05, tolerances={
+        'rotation': animation_optimization.ErrorTolerance(
+            0.05, angular=0.01)})
+    result = optimizer.optimize_animation(copy.deepcopy(animation))
+    bone = result['animations']['animation.test']['bones']['bone']
+    assert bone['position'] == [0, 1, 0]
+    # The jump is smaller than the angular tolerance
+    assert bone['rotation'] == [0, 0, 0]
+    assert isinstance(bone['scale'], dict)
+    assert optimizer.total_removed['position'] == 2
+    assert optimizer.total_removed['rotation'] == 2
+
+def test_find_error_margin():
+    animation = {'bones': {
+        str(i): {'position': timeline} for i, timeline in enumerate(
+            load_timelines() + load_timelines(False))}}
+    sizes: Dict[float, int] = {}
+    def get_size(error_margin: float) -> int:
+        optimized = copy.deepcopy(animation)
+        animation_optimization.AnimationOptimizer(
+            error_margin)._optimize_single_animation(optimized)
+        sizes[error_margin] = animation_optimization.count_keyframes(
+            optimized)
+        return sizes[error_margin]
+    original = animation_optimization.count_keyframes(animation)
+    target = (original + get_size(1.0)) // 2
+    error_margin = animation_optimization.find_error_margin(get_size, target)
+    assert 0.0 < error_margin < 1.0
+    assert sizes[error_margin] <= target
+    # Too small targets use the largest error margin
+    assert animation_optimization.find_error_margin(get_size, 0) == 1.0
+    # The target is met without the optimization
+    assert animation_optimization.find_error_margin(
+        get_size, original) == 0.0
@@ -17,21 +17,24 @@ TMP: Path = Path('.tmp/test_batch_export').resolve()
 DATA_DIR: Path = Path('tests/data/test_batch_export').resolve()
 BLEND_PROJECT: Path = Path('tests/data/test_batch_export.blend').resolve()
 
-def _prepare_target_file(source_file: str) -> Path:
+def _prepare_target_file(
+        source_file: str,
+        target_file: str = 'batch_export.animation.json') -> Path:
     '''Copy base file to TMP'''
     TMP.mkdir(parents=True, exist_ok=True)
     src = DATA_DIR / source_file
-    dst = TMP / 'batch_export.animation.json'
+    dst = TMP / target_file
     shutil.copyfile(src, dst)
     return dst
 
 
-def _run_blender(scene: str, target: Path) -> None:
+def _run_blender(scene: str, target: Path, workers: int = 1) -> None:
     '''Run batch export in privoded scene and save to target file'''
     blender_run_script(
         SCRIPT.as_posix(),
         scene,
         target.as_posix(),
+        str(workers),
         blend_file_path=BLEND_PROJECT.as_posix(),
     )
 
@@ -67,3 +70,16 @@ def test_batch_export(scene):
         expected_dict = json.load(f)
 
     assert result_dict == expected_dict
+
+def test_parallel_batch_export(scene):
+    '''The parallel export must produce exactly the same file.'''
+    serial_path = _prepare_target_file(
+        scene['source'], 'serial.animation.json')
+    parallel_path = _prepare_target_file(
+        scene['source'], 'parallel.animation.json')
+    _run_blender(scene['name'], serial_path)
+    _run_blender(scene['name'], parallel_path, workers=2)
+
+    assert (
+        parallel_path.read_text(encoding='utf8') ==
+        serial_path.read_text(encoding='utf8'))
@@ -0,0 +1,65 @@
+'''
+Tests for the blender_scripts/optimize_animations.py script. The script
+doesn't use Blender, so these tests run without it.
+'''
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT_PATH = Path('blender_scripts/optimize_animations.py').resolve()
+ANIMATION_DATA = Path(
+    'tests/data/test_animation_export/BattleMech.animation.json'
+).resolve()
+
+def count_keyframes(data):
+    result = 0
+    for animation in data['animations'].values():
+        for bone in animation.get('bones', {}).values():
+            for timeline in bone.values():
+                if isinstance(timeline, dict):
+                    result += len(timeline)
+    return result
+
+@pytest.fixture
+def rp_path(tmp_path: Path) -> Path:
+    animations = tmp_path / 'rp/animations'
+    (animations / 'nested').mkdir(parents=True)
+    shutil.copy(ANIMATION_DATA, animations / 'a.animation.json')
+    shutil.copy(ANIMATION_DATA, animations / 'nested/b.animation.json')
+    (animations / 'broken.animation.json').write_text('{')
+    return tmp_path / 'rp'
+
+def run_script(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(SCRIPT_PATH), *args], capture_output=True,
+        text=True, check=False)
+
+def test_optimize_animations(rp_path: Path):
+    with ANIMATION_DATA.open('r') as f:
+        original = count_keyframes(json.load(f))
+    result = run_script(str(rp_path), '--workers', '2')
+    # The broken file is reported and the other files are still optimized
+    assert result.returncode == 1
+    assert 'broken.animation.json: ERROR' in result.stdout
+    for path in (
+            rp_path / 'animations/a.animation.json',
+            rp_path / 'animations/nested/b.animation.json'):
+        with path.open('r') as f:
+            optimized = count_keyframes(json.load(f))
+        assert optimized < original
+        assert f'{original} -> {optimized} keyframes' in result.stdout
+    # No temporary files are left
+    assert sorted(
+        p.name for p in (rp_path / 'animations').rglob('*') if p.is_file()
+    ) == ['a.animation.json', 'b.animation.json', 'broken.animation.json']
+
+def test_optimize_animations_dry_run(rp_path: Path):
+    path = rp_path / 'animations/a.animation.json'
+    original = path.read_bytes()
+    result = run_script(str(rp_path), '--dry-run')
+    assert 'keyframes saved' in result.stdout
+    assert path.read_bytes() == original